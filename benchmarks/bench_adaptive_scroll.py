@@ -0,0 +1,57 @@
+import os
+import sys
+import shutil
+import tempfile
+import threading
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import bench_comment_tabs as stub
+from bench_comment_tabs import ThreadingHTTPServer, StubHandler, run_crawler
+
+# ==============================================================================
+# CẤU HÌNH BENCHMARK (Dùng lại stub server của bench_comment_tabs, 1 tab)
+# ==============================================================================
+stub.NUM_POSTS = 6
+LATENCIES = [0.05, 0.3, 1.0]    # Độ trễ API comment (giây): trang nhanh -> chậm
+
+# Nhịp cũ (sleep cố định) trên cùng stub page: chờ tải 4s + (MAX_RETRIES=3 lượt hụt + 1 lượt đầu) x 3s/lượt
+LEGACY_SECONDS_PER_POST = 4 + (3 + 1) * 3
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    work_dir = tempfile.mkdtemp(prefix='bench_scroll_')
+
+    results = []
+    try:
+        for latency in LATENCIES:
+            stub.SERVER_LATENCY = latency
+            elapsed, rows = run_crawler(base_url, work_dir, max_tabs=1)
+
+            # Golden output: cuộn theo sự kiện vẫn phải bắt đủ comment, gắn đúng bài
+            wrong = [r for r in rows if not r['original_text'].endswith(f"của {r['post_id']}")]
+            if wrong or len(rows) != stub.NUM_POSTS * 2 * stub.COMMENTS_PER_POST:
+                print(f"❌ Độ trễ {latency}s: bắt được {len(rows)} comment, {len(wrong)} gắn sai bài")
+                sys.exit(1)
+            results.append((latency, elapsed / stub.NUM_POSTS))
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("=" * 56)
+    print(f"📊 [BENCH] Nhịp cuộn theo sự kiện: {stub.NUM_POSTS} bài/lượt (stub server, 1 tab)")
+    print("=" * 56)
+    print(f"{'độ trễ API (s)':>14} | {'s/bài':>6} | {'sleep cố định (s/bài)':>21} | {'x':>5}")
+    for latency, per_post in results:
+        print(f"{latency:>14.2f} | {per_post:>6.2f} | {LEGACY_SECONDS_PER_POST:>21.1f} | "
+              f"{LEGACY_SECONDS_PER_POST / per_post:>5.1f}")
+    print("✅ Bắt đủ comment ở mọi độ trễ.")
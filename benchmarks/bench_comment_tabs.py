@@ -0,0 +1,129 @@
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import asyncio
+import tempfile
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.crawler import get_comments, browser_session
+from src.crawler.get_comments import FacebookCommentCrawler
+
+# ==============================================================================
+# CẤU HÌNH BENCHMARK (Stub server giả lập bài viết Facebook, chạy cùng máy)
+# ==============================================================================
+NUM_POSTS = 16
+COMMENTS_PER_POST = 5
+TAB_CONFIGS = [1, 2, 4, 8]
+SERVER_LATENCY = 0.3        # Độ trễ mỗi request API comment (giây), giả lập mạng
+
+browser_session.HEADLESS = True
+
+POST_HTML = """<html><body>
+<div role="article" aria-label="Comment 1">...</div>
+<div role="article" aria-label="Comment 2">...</div>
+<script>
+  // 2 lượt XHR như Facebook: trang đầu + trang tiếp theo khi cuộn
+  fetch('/api/comments?post={post_id}&page=0');
+  setTimeout(() => fetch('/api/comments?post={post_id}&page=1'), 200);
+</script>
+</body></html>"""
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.startswith('/post/'):
+            body = POST_HTML.replace('{post_id}', url.path.rsplit('/', 1)[-1]).encode('utf-8')
+            content_type = 'text/html; charset=utf-8'
+        elif url.path == '/api/comments':
+            time.sleep(SERVER_LATENCY)
+            query = parse_qs(url.query)
+            post_id, page = query['post'][0], int(query['page'][0])
+            comments = [{
+                '__typename': 'Comment',
+                'id': f"{post_id}{page}{i}",
+                'body': {'text': f"comment {page}-{i} của {post_id}"},
+                'author': {'id': f"{i}", 'name': f"user {i}"},
+                'created_time': 1700000000 + i,
+            } for i in range(COMMENTS_PER_POST)]
+            body = ('for (;;);' + json.dumps({'data': {'comments': comments}}, ensure_ascii=False)).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def run_crawler(base_url, work_dir, max_tabs):
+    input_path = os.path.join(work_dir, 'posts_detail.csv')
+    with open(input_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['post_id', 'post_link'])
+        for i in range(NUM_POSTS):
+            writer.writerow([f"POST_{i + 1:03d}", f"{base_url}/post/POST_{i + 1:03d}"])
+
+    get_comments.INPUT_POSTS_FILE = input_path
+    get_comments.OUTPUT_COMMENTS_FILE = os.path.join(work_dir, f"comments_{max_tabs}.csv")
+    crawler = FacebookCommentCrawler(max_tabs=max_tabs)
+    crawler.user_data_dir = os.path.join(work_dir, f"profile_{max_tabs}")
+
+    start = time.perf_counter()
+    asyncio.run(crawler.run())
+    elapsed = time.perf_counter() - start
+
+    with open(crawler.output_path, encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    return elapsed, rows
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    work_dir = tempfile.mkdtemp(prefix='bench_tabs_')
+
+    results = []
+    try:
+        for max_tabs in TAB_CONFIGS:
+            elapsed, rows = run_crawler(base_url, work_dir, max_tabs)
+
+            # Golden output: mọi comment phải gắn đúng post_id của bài sinh ra nó, không thiếu không thừa
+            wrong = [r for r in rows if not r['original_text'].endswith(f"của {r['post_id']}")]
+            captured = sorted((r['post_id'], r['original_text']) for r in rows)
+            if wrong or len(captured) != NUM_POSTS * 2 * COMMENTS_PER_POST:
+                print(f"❌ {max_tabs} tab: {len(wrong)} comment gắn sai post_id, bắt được {len(captured)} comment")
+                sys.exit(1)
+            results.append((max_tabs, elapsed))
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("=" * 48)
+    print(f"📊 [BENCH] Cào comment: {NUM_POSTS} bài (stub server)")
+    print("=" * 48)
+    print(f"{'tab':>4} | {'thời gian (s)':>13} | {'x':>5}")
+    t_serial = results[0][1]
+    for max_tabs, elapsed in results:
+        print(f"{max_tabs:>4} | {elapsed:>13.2f} | {t_serial / elapsed:>5.2f}")
+    print("✅ Mọi comment gắn đúng post_id.")
@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import pandas as pd
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.data_merger import DataMerger
+
+# ==============================================================================
+# CẤU HÌNH BENCHMARK
+# ==============================================================================
+SIZES = [10_000, 20_000, 40_000, 80_000]   # Số reaction của 1 bài viết "hot"
+COMMENT_RATIO = 0.2                        # Số comment = 20% số reaction
+NUM_POSTS = 5
+REACTION_TYPES = ["Thích", "Yêu thích", "Haha", "Phẫn nộ", "Buồn", "Wow"]
+
+
+def generate_crawler_files(folder, n_reactions, seed=42):
+    """Sinh bộ 3 file crawler giả lập với n_reactions reaction"""
+    rnd = random.Random(seed)
+    n_comments = int(n_reactions * COMMENT_RATIO)
+    n_users = n_reactions
+
+    pd.DataFrame({
+        'post_id': [f"POST_{i+1:03d}" for i in range(NUM_POSTS)],
+        'user_id': 'FB_admin',
+        'social_user': 'Page',
+        'context_content': [f"Nội dung bài {i+1}" for i in range(NUM_POSTS)],
+        'post_link': [f"https://www.facebook.com/page/posts/{i+1}" for i in range(NUM_POSTS)],
+        'post_fb_id': list(range(NUM_POSTS))
+    }).to_csv(os.path.join(folder, 'posts.csv'), index=False, encoding='utf-8-sig')
+
+    pd.DataFrame({
+        'comment_id': [f"COM_{i+1:03d}" for i in range(n_comments)],
+        'source_channel': 'Facebook',
+        'post_id': [f"POST_{rnd.randint(1, NUM_POSTS):03d}" for _ in range(n_comments)],
+        'timestamp': '2024-01-01 10:00:00',
+        'user_id': [f"FB_{rnd.randint(1, n_users)}" for _ in range(n_comments)],
+        'social_user': 'User',
+        'original_text': 'app dùng ok nhưng rút chậm',
+        'comment_fb_id': list(range(n_comments))
+    }).to_csv(os.path.join(folder, 'comments.csv'), index=False, encoding='utf-8-sig')
+
+    pd.DataFrame({
+        'reaction_id': [f"REAC_{i+1:03d}" for i in range(n_reactions)],
+        'post_id': [f"POST_{rnd.randint(1, NUM_POSTS):03d}" for _ in range(n_reactions)],
+        'user_id': [f"FB_{rnd.randint(1, n_users)}" for _ in range(n_reactions)],
+        'social_user': 'User',
+        'reaction_type': [rnd.choice(REACTION_TYPES) for _ in range(n_reactions)],
+        'reaction_fb_id': list(range(n_reactions))
+    }).to_csv(os.path.join(folder, 'reactions.csv'), index=False, encoding='utf-8-sig')
+
+
+def bench_merge(n_reactions):
+    with tempfile.TemporaryDirectory() as folder:
+        generate_crawler_files(folder, n_reactions)
+
+        merger = DataMerger()
+        merger.posts_path = os.path.join(folder, 'posts.csv')
+        merger.comments_path = os.path.join(folder, 'comments.csv')
+        merger.reactions_path = os.path.join(folder, 'reactions.csv')
+        merger.output_path = os.path.join(folder, 'raw_fb_data.csv')
+        merger.state_path = os.path.join(folder, 'merge_state.json')
+        merger.posts_dim_path = os.path.join(folder, 'posts_dim.csv')
+
+        start = time.perf_counter()
+        merger.run_merge()
+        return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    results = []
+    for n in SIZES:
+        results.append((n, bench_merge(n)))
+
+    print("\n" + "=" * 60)
+    print("📊 [BENCH] DataMerger.run_merge (hash-join)")
+    print("=" * 60)
+    print(f"{'reactions':>10} | {'comments':>9} | {'giây':>8} | {'µs/dòng':>8}")
+    for n, sec in results:
+        rows = n + int(n * COMMENT_RATIO)
+        print(f"{n:>10} | {int(n * COMMENT_RATIO):>9} | {sec:>8.3f} | {sec / rows * 1e6:>8.2f}")
+    print("👉 µs/dòng gần như không đổi khi tăng kích thước = tăng trưởng tuyến tính.")
@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+import random
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.utils import PIIMasker
+
+# ==============================================================================
+# CẤU HÌNH BENCHMARK
+# ==============================================================================
+NUM_COMMENTS = 20_000
+LENGTHS = [(1, 3), (4, 10), (11, 30)]   # Số câu ghép / comment (ngắn, vừa, dài)
+REPEAT = 3
+
+PLAIN_SENTENCES = [
+    "app dùng ổn nhưng rút tiền hơi chậm",
+    "admin ơi cho em hỏi lãi suất gói tích lũy bao nhiêu",
+    "nạp tiền mãi chưa vào ví, check giúp em với",
+    "uy tín lắm mọi người ơi 👍",
+    "tại sao hôm nay không đăng nhập được vậy ad",
+    "ib em nhé",
+]
+PII_SENTENCES = [
+    "sđt em là 0912345678 gọi lại giúp em",
+    "em chuyển 500k vào stk 1234567890123 rồi mà chưa thấy",
+    "cccd 012345678901 xác thực mãi không qua",
+    "mail của em: nguyen.van.a@gmail.com nha ad",
+    "nạp 2.500.000 vnđ từ hôm qua, mã giao dịch 123456789",
+    "số cũ 01612345678 giờ đổi sang 0987654321.",
+]
+
+
+def generate_comments(min_sent, max_sent, seed=7):
+    rnd = random.Random(seed)
+    comments = []
+    for _ in range(NUM_COMMENTS):
+        n = rnd.randint(min_sent, max_sent)
+        # ~30% câu chứa PII, còn lại là text thường (giống dữ liệu thật)
+        parts = [rnd.choice(PII_SENTENCES if rnd.random() < 0.3 else PLAIN_SENTENCES) for _ in range(n)]
+        comments.append('. '.join(parts))
+    return comments
+
+
+def best_time(func, comments):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for text in comments:
+            func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    masker = PIIMasker()
+
+    print("=" * 60)
+    print("📊 [BENCH] PIIMasker: 1 regex hợp nhất vs 5 lệnh sub tuần tự")
+    print("=" * 60)
+    print(f"{'câu/comment':>12} | {'ký tự TB':>8} | {'tuần tự (s)':>11} | {'hợp nhất (s)':>12} | {'x':>5}")
+
+    for min_sent, max_sent in LENGTHS:
+        comments = generate_comments(min_sent, max_sent)
+
+        # Golden output: bản hợp nhất phải cho kết quả y hệt bản tuần tự
+        mismatches = [t for t in comments if masker.mask(t) != masker.mask_sequential(t)]
+        if mismatches:
+            print(f"❌ Lệch kết quả ở {len(mismatches)} comment, VD: {mismatches[0]!r}")
+            sys.exit(1)
+
+        avg_len = sum(len(t) for t in comments) / len(comments)
+        t_seq = best_time(masker.mask_sequential, comments)
+        t_fused = best_time(masker.mask, comments)
+        print(f"{f'{min_sent}-{max_sent}':>12} | {avg_len:>8.0f} | {t_seq:>11.3f} | {t_fused:>12.3f} | {t_seq / t_fused:>5.2f}")
+
+    print(f"✅ Golden output khớp 100%. Số lần rơi về bản tuần tự: {masker.fallback_count}")
@@ -0,0 +1,165 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.crawler import BrowserSession, ResourceBlocker
+from src.crawler.resource_blocker import BLOCKED_RESOURCE_TYPES, BLOCKED_HOSTS
+
+# ==============================================================================
+# CẤU HÌNH BENCHMARK (Stub server giả lập 1 bài viết nặng như Facebook, chạy cùng máy)
+# ==============================================================================
+NUM_POSTS = 10
+IMAGES_PER_POST = 20
+IMAGE_BYTES = 150_000
+VIDEO_BYTES = 2_000_000
+FONT_BYTES = 80_000
+BUNDLE_BYTES = 600_000          # Bundle JS/CSS dùng chung mọi trang (như rsrc.php của Facebook), cho phép cache
+BANDWIDTH_BPS = 20_000_000      # Giả lập băng thông ~20 MB/s: file càng lớn càng lâu
+TRACKER_HOST = 'localhost'      # Script tracking nằm ở host khác (localhost vs 127.0.0.1) -> bị chặn theo host
+
+POST_HTML = """<html><head>
+<style>@font-face {{ font-family: fb; src: url('/static/font.woff2'); }} body {{ font-family: fb; }}</style>
+<link rel="stylesheet" href="/rsrc/app.css">
+<script src="/rsrc/app.js"></script>
+<script src="http://{tracker}:{port}/tracking.js"></script>
+</head><body>
+{images}
+<video src="/static/video.mp4" autoplay muted></video>
+<div role="article">bình luận</div>
+<script>fetch('/api/graphql?post={post_id}');</script>
+</body></html>"""
+
+served = Counter()      # path loại -> byte server đã gửi
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, body, content_type, kind, cache=False):
+        time.sleep(len(body) / BANDWIDTH_BPS)
+        served[kind] += len(body)
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if cache: self.send_header('Cache-Control', 'public, max-age=3600')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.startswith('/post/'):
+            post_id = url.path.rsplit('/', 1)[-1]
+            images = '\n'.join(f'<img src="/static/{post_id}_{i}.jpg">' for i in range(IMAGES_PER_POST))
+            html = POST_HTML.format(tracker=TRACKER_HOST, port=self.server.server_address[1],
+                                    images=images, post_id=post_id)
+            self.send_body(html.encode('utf-8'), 'text/html; charset=utf-8', 'document')
+        elif url.path == '/api/graphql':
+            self.send_body(json.dumps({'data': {'ok': True}}).encode('utf-8'), 'application/json', 'graphql')
+        elif url.path.endswith('.jpg'):
+            self.send_body(b'\0' * IMAGE_BYTES, 'image/jpeg', 'image')
+        elif url.path.endswith('.mp4'):
+            self.send_body(b'\0' * VIDEO_BYTES, 'video/mp4', 'media')
+        elif url.path.endswith('.woff2'):
+            self.send_body(b'\0' * FONT_BYTES, 'font/woff2', 'font')
+        elif url.path == '/rsrc/app.js':
+            self.send_body(b'/*' + b' ' * BUNDLE_BYTES + b'*/', 'application/javascript', 'bundle', cache=True)
+        elif url.path == '/rsrc/app.css':
+            self.send_body(b'/*' + b' ' * (BUNDLE_BYTES // 4) + b'*/', 'text/css', 'bundle', cache=True)
+        elif url.path.endswith('tracking.js'):
+            self.send_body(b'/* tracking */', 'application/javascript', 'tracking')
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+
+class RouteBlocker(ResourceBlocker):
+    """Cách chặn cũ (page.route bắt mọi request) - chỉ để so sánh: Playwright tắt HTTP cache của tab"""
+
+    async def handle_route(self, route):
+        resource_type = route.request.resource_type
+        if resource_type in self.resource_types or (urlparse(route.request.url).hostname or '') in self.hosts:
+            self.blocked[resource_type if resource_type in self.resource_types else 'host tracking'] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def attach(self, page):
+        await page.route("**/*", self.handle_route)
+
+
+async def crawl_posts(base_url, profile_dir, blocker):
+    graphql_hits = 0
+    async with BrowserSession(headless=True, user_data_dir=profile_dir) as session:
+        page = await session.new_page('bench', blocker)
+
+        def count_graphql(response):
+            nonlocal graphql_hits
+            if '/api/graphql' in response.url: graphql_hits += 1
+        page.on('response', count_graphql)
+
+        start = time.perf_counter()
+        for i in range(NUM_POSTS):
+            await page.goto(f"{base_url}/post/POST_{i + 1:03d}", wait_until='load')
+            await page.wait_for_load_state('networkidle')
+        elapsed = time.perf_counter() - start
+        await session.release_page(page)
+    return elapsed, graphql_hits
+
+
+def run_mode(base_url, blocker_class):
+    served.clear()
+    blocker = blocker_class('bench', BLOCKED_RESOURCE_TYPES, BLOCKED_HOSTS + [TRACKER_HOST]) if blocker_class else None
+    with tempfile.TemporaryDirectory(prefix='bench_block_') as profile_dir:
+        elapsed, graphql_hits = asyncio.run(crawl_posts(base_url, profile_dir, blocker))
+    return elapsed, graphql_hits, sum(served.values()), dict(served), blocker
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        modes = [('đầy đủ', run_mode(base_url, None)),
+                 ('page.route', run_mode(base_url, RouteBlocker)),
+                 ('CDP', run_mode(base_url, ResourceBlocker))]
+    finally:
+        server.shutdown()
+
+    # Golden output: chặn tài nguyên không được làm mất request dữ liệu (GraphQL/XHR)
+    hits = {label: result[1] for label, result in modes}
+    if set(hits.values()) != {NUM_POSTS}:
+        print(f"❌ Request GraphQL: {hits} (cần {NUM_POSTS})")
+        sys.exit(1)
+
+    # Byte đo ở phía server (byte thật sự đi qua mạng), không dựa vào Content-Length phía trình duyệt
+    full = modes[0][1]
+    print("=" * 78)
+    print(f"📊 [BENCH] Chặn tài nguyên: {NUM_POSTS} bài, mỗi bài {IMAGES_PER_POST} ảnh + 1 video + font "
+          f"+ tracking + bundle JS/CSS")
+    print("=" * 78)
+    print(f"{'chế độ':>10} | {'ms/bài':>8} | {'MB/bài':>7} | {'bundle MB':>9} | {'request chặn':>12} | "
+          f"{'tiết kiệm':>9}")
+    for label, (elapsed, _, total_bytes, by_kind, blocker) in modes:
+        blocked_count = sum(blocker.blocked.values()) if blocker else 0
+        print(f"{label:>10} | {elapsed / NUM_POSTS * 1000:>8.1f} | {total_bytes / NUM_POSTS / 1024 / 1024:>7.2f} | "
+              f"{by_kind.get('bundle', 0) / 1024 / 1024:>9.2f} | {blocked_count:>12} | "
+              f"{(1 - total_bytes / full[2]) * 100:>8.0f}%")
+    modes[2][1][4].report()
+    print("✅ Request GraphQL giữ nguyên 100%.")
@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import random
+
+import pandas as pd
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.sentiment_scorer import SentimentScorer
+
+# ==============================================================================
+# CẤU HÌNH BENCHMARK
+# ==============================================================================
+NUM_COMMENTS = 60_000
+MAX_WORKERS = int(sys.argv[1]) if len(sys.argv) > 1 else max(2, os.cpu_count() or 1)
+
+PHRASES = ["app dùng ổn", "rút tiền hơi chậm", "nạp tiền mãi chưa vào ví", "uy tín lắm [ICON_POS]",
+           "lừa đảo à [ICON_NEG]", "lãi suất gói tích lũy bao nhiêu", "xác thực ekyc lỗi hoài",
+           "ad check giúp em", "sản phẩm tốt [ICON_MONEY]", "hỗ trợ nhanh"]
+PIVOTS = [" nhưng ", " tuy nhiên ", " mỗi tội "]
+REACTIONS = ['LIKE', 'LOVE', 'HAHA', 'SAD', 'ANGRY', 'WOW', 'NONE']
+
+
+def generate_comments(seed=7):
+    rnd = random.Random(seed)
+    texts = []
+    for _ in range(NUM_COMMENTS):
+        parts = [rnd.choice(PHRASES) for _ in range(rnd.randint(1, 3))]
+        texts.append(rnd.choice(PIVOTS).join(parts))
+    return pd.DataFrame({
+        'record_id': [f"REC_{i + 1:03d}" for i in range(NUM_COMMENTS)],
+        'timestamp': '2024-01-01 00:00:00',
+        'social_user_id': 'user',
+        'processed_text': texts,
+        'reaction_label': [rnd.choice(REACTIONS) for _ in range(NUM_COMMENTS)],
+    })
+
+
+if __name__ == "__main__":
+    scorer = SentimentScorer()
+    df = generate_comments()
+
+    print("=" * 60)
+    print(f"📊 [BENCH] Chấm điểm song song: {NUM_COMMENTS} comment, CPU máy: {os.cpu_count()}")
+    print("=" * 60)
+    print(f"{'worker':>6} | {'thời gian (s)':>13} | {'x':>5}")
+
+    baseline = None
+    t_serial = None
+    for workers in range(1, MAX_WORKERS + 1):
+        start = time.perf_counter()
+        result = scorer.score_frame(df, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        # Golden output: ghép kết quả song song phải giống hệt bản tuần tự
+        if baseline is None:
+            baseline, t_serial = result, elapsed
+        elif not result.equals(baseline):
+            print(f"❌ Kết quả {workers} worker lệch bản tuần tự")
+            sys.exit(1)
+        print(f"{workers:>6} | {elapsed:>13.3f} | {t_serial / elapsed:>5.2f}")
+
+    print("✅ Kết quả song song khớp 100% bản tuần tự.")
@@ -0,0 +1,84 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.scoring_service import ScoringService
+
+# ==============================================================================
+# CẤU HÌNH BENCHMARK (Load generator chạy cùng máy)
+# ==============================================================================
+HOST = '127.0.0.1'
+CONNECTIONS = 32            # Số client đồng thời (mỗi client gửi-chờ-gửi tiếp)
+REQUESTS_PER_CONNECTION = 100
+BATCH_CONFIGS = [(1, 0), (16, 2), (64, 5)]   # (max_batch_size, max_wait_ms); (1, 0) = không gom lô
+
+TEXTS = [
+    "app dùng ổn nhưng rút tiền hơi chậm",
+    "admin ơi lãi suất gói tích lũy bao nhiêu vậy 😍",
+    "nạp tiền mãi chưa vào ví, sđt em 0912345678 check giúp",
+    "uy tín lắm mọi người ơi 👍",
+    "lừa đảo à, không rút được tiền 😡",
+    "",
+]
+REACTIONS = ['LIKE', 'LOVE', 'HAHA', 'SAD', 'ANGRY', 'NONE']
+
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+
+async def client(port, seed, latencies):
+    rnd = random.Random(seed)
+    reader, writer = await asyncio.open_connection(HOST, port)
+    for i in range(REQUESTS_PER_CONNECTION):
+        request = {'id': i, 'text': rnd.choice(TEXTS), 'reaction': rnd.choice(REACTIONS),
+                   'context': 'Nạp tiền nhận ưu đãi lãi suất'}
+        start = time.perf_counter()
+        writer.write((json.dumps(request, ensure_ascii=False) + '\n').encode('utf-8'))
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+    writer.close()
+
+
+async def run_config(max_batch_size, max_wait_ms):
+    service = ScoringService(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    server = await service.start(HOST, 0)
+    port = server.sockets[0].getsockname()[1]
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, seed, latencies) for seed in range(CONNECTIONS)))
+    elapsed = time.perf_counter() - start
+    server_stats = service.stats()
+    await service.stop()
+
+    ordered = sorted(latencies)
+    return percentile(ordered, 0.50), percentile(ordered, 0.99), len(ordered) / elapsed, server_stats
+
+
+if __name__ == "__main__":
+    results = []
+    for max_batch_size, max_wait_ms in BATCH_CONFIGS:
+        results.append((max_batch_size, max_wait_ms, asyncio.run(run_config(max_batch_size, max_wait_ms))))
+
+    print("=" * 72)
+    print(f"📊 [BENCH] Scoring service: {CONNECTIONS} client x {REQUESTS_PER_CONNECTION} request (JSON-lines)")
+    print("=" * 72)
+    print(f"{'lô tối đa':>9} | {'chờ (ms)':>8} | {'lô TB':>6} | {'p50 (ms)':>8} | {'p99 (ms)':>8} | {'req/s':>8}")
+    for max_batch_size, max_wait_ms, (p50, p99, rps, stats) in results:
+        print(f"{max_batch_size:>9} | {max_wait_ms:>8} | {stats['avg_batch_size']:>6} | "
+              f"{p50:>8.2f} | {p99:>8.2f} | {rps:>8.0f}")
@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import random
+import shutil
+import tempfile
+import subprocess
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+# ==============================================================================
+# CẤU HÌNH BENCHMARK
+# ==============================================================================
+LEXICON_SIZES = [None, 20_000, 100_000]   # None = từ điển thật trong resources/
+REPEAT = 3
+
+SYLLABLES = ["tiền", "nạp", "rút", "app", "lỗi", "chậm", "uy", "tín", "ví", "lãi", "suất",
+             "gói", "tích", "lũy", "ngân", "hàng", "mã", "giao", "dịch", "hỗ", "trợ", "admin",
+             "nhanh", "ổn", "tốt", "tệ", "lừa", "đảo", "khóa", "tài", "khoản", "xác", "thực"]
+SAMPLE_TEXTS = ["app dùng ổn nhưng rút tiền hơi chậm", "lừa đảo à không rút được tiền [ICON_NEG]",
+                "lãi suất gói tích lũy bao nhiêu vậy ad", "uy tín lắm mọi người ơi [ICON_POS]"]
+
+# Chạy trong tiến trình con mới tinh (đúng chi phí khởi động thật): in JSON {thời gian, kết quả mẫu}
+CHILD_SCRIPT = r'''
+import sys, json, time
+sys.path.insert(0, sys.argv[1])
+from src.utils import config_loader
+config_loader.RESOURCE_DIR = sys.argv[2]
+config_loader.BUNDLE_CACHE_DIR = sys.argv[3]
+from src.data_processor import DataProcessor
+from src.sentiment_scorer import SentimentScorer
+
+start = time.perf_counter()
+loader = config_loader.ConfigLoader.load()
+processor = DataProcessor(loader)
+scorer = SentimentScorer(loader)
+elapsed = time.perf_counter() - start
+
+texts = processor.process_texts(json.loads(sys.argv[4]))
+df = scorer.score_batch(texts, ['LIKE'] * len(texts), [''] * len(texts))
+print(json.dumps({'elapsed': elapsed, 'result': df.astype(str).values.tolist()}, ensure_ascii=False))
+'''
+
+
+def synthetic_resources(size, target_dir, seed=11):
+    """Copy resources/ thật rồi phình sentiment/topic/teencode lên `size` keyword"""
+    shutil.copytree(os.path.join(project_root, 'resources'), target_dir)
+    if size is None: return
+    rnd = random.Random(seed)
+    dict_dir = os.path.join(target_dir, 'dictionaries')
+
+    # Keyword không trùng nhau (như từ điển thật) -> automaton không phình output vì keyword lặp
+    seen = set()
+    def phrase():
+        while True:
+            candidate = ' '.join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 5)))
+            if candidate not in seen:
+                seen.add(candidate)
+                return candidate
+
+    with open(os.path.join(dict_dir, 'sentiment_keywords.json'), encoding='utf-8') as f:
+        sentiment = json.load(f)
+    labels = list(sentiment)
+    for _ in range(size):
+        sentiment[rnd.choice(labels)]['keywords'].append(phrase())
+
+    with open(os.path.join(dict_dir, 'topic_keywords.json'), encoding='utf-8') as f:
+        topics = json.load(f)
+    names = list(topics)
+    for _ in range(size // 4):
+        topics[rnd.choice(names)].append(phrase())
+
+    with open(os.path.join(dict_dir, 'teencode.json'), encoding='utf-8') as f:
+        teencode = json.load(f)
+    for i in range(size // 4):
+        teencode[f"tc{i}"] = phrase()
+
+    for filename, data in [('sentiment_keywords.json', sentiment), ('topic_keywords.json', topics),
+                           ('teencode.json', teencode)]:
+        with open(os.path.join(dict_dir, filename), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+
+def start_once(resource_dir, bundle_dir):
+    output = subprocess.run([sys.executable, '-c', CHILD_SCRIPT, project_root, resource_dir, bundle_dir,
+                             json.dumps(SAMPLE_TEXTS, ensure_ascii=False)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    print("=" * 64)
+    print("📊 [BENCH] Khởi động ConfigLoader + DataProcessor + SentimentScorer")
+    print("=" * 64)
+    print(f"{'keyword':>8} | {'cold (ms)':>9} | {'warm (ms)':>9} | {'x':>6}")
+
+    for size in LEXICON_SIZES:
+        work_dir = tempfile.mkdtemp(prefix='bench_startup_')
+        try:
+            resource_dir = os.path.join(work_dir, 'resources')
+            bundle_dir = os.path.join(work_dir, 'cache')
+            synthetic_resources(size, resource_dir)
+
+            cold, warm = [], []
+            for _ in range(REPEAT):
+                # Cold: chưa có bundle -> parse YAML/JSON + dựng automaton, rồi ghi bundle
+                shutil.rmtree(bundle_dir, ignore_errors=True)
+                cold_run = start_once(resource_dir, bundle_dir)
+                # Warm: bundle vừa ghi -> chỉ unpickle
+                warm_run = start_once(resource_dir, bundle_dir)
+
+                # Golden output: đối tượng lấy từ bundle phải chấm ra đúng như bản vừa compile
+                if warm_run['result'] != cold_run['result']:
+                    print(f"❌ Kết quả chấm từ bundle lệch bản compile mới ({size} keyword)")
+                    sys.exit(1)
+                cold.append(cold_run['elapsed'])
+                warm.append(warm_run['elapsed'])
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        label = 'thật' if size is None else f"{size:,}"
+        print(f"{label:>8} | {min(cold) * 1000:>9.1f} | {min(warm) * 1000:>9.1f} | {min(cold) / min(warm):>6.2f}")
+
+    print("✅ Kết quả chấm từ bundle khớp 100% bản compile mới.")
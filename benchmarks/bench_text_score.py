@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import random
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.sentiment_scorer import SentimentScorer
+
+# ==============================================================================
+# CẤU HÌNH BENCHMARK
+# ==============================================================================
+NUM_SEGMENTS = 5_000
+LEXICON_SIZES = [None, 2_000, 20_000]   # None = từ điển thật trong resources/
+REPEAT = 3
+
+SYLLABLES = ["tiền", "nạp", "rút", "app", "lỗi", "chậm", "uy", "tín", "ví", "lãi", "suất",
+             "gói", "tích", "lũy", "ngân", "hàng", "mã", "giao", "dịch", "hỗ", "trợ", "admin",
+             "nhanh", "ổn", "tốt", "tệ", "lừa", "đảo", "khóa", "tài", "khoản", "xác", "thực"]
+EMOJI_TOKENS = ["[ICON_POS]", "[ICON_NEG]", "[ICON_MONEY]", "[ICON_LAUGH]", "[ICON_GROWTH]"]
+
+
+def score_reference(scorer, text):
+    """Bản gốc: `in` cho từng keyword + text.count cho từng emoji"""
+    if text == '[POST_REACTION]': return 0.0
+    score = 0.0
+    text_lower = text.lower()
+    for label, data in scorer.sentiment_keywords.items():
+        base_score = data['score']
+        for kw in data['keywords']:
+            if kw in text_lower:
+                score += base_score
+    for token, val in scorer.emoji_scores.items():
+        count = text.count(token)
+        if count > 0: score += (val * count)
+    return max(-2.0, min(2.0, score))
+
+
+def synthetic_lexicon(size, seed=11):
+    rnd = random.Random(seed)
+    labels = {'panic': -2.0, 'negative': -1.0, 'neutral': 0.0, 'positive': 1.0, 'advocacy': 2.0}
+    lexicon = {label: {'score': score, 'keywords': []} for label, score in labels.items()}
+    names = list(labels)
+    for _ in range(size):
+        phrase = ' '.join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(1, 4)))
+        lexicon[rnd.choice(names)]['keywords'].append(phrase)
+    return lexicon
+
+
+def generate_segments(seed=7):
+    rnd = random.Random(seed)
+    segments = []
+    for _ in range(NUM_SEGMENTS):
+        words = [rnd.choice(SYLLABLES) for _ in range(rnd.randint(3, 25))]
+        if rnd.random() < 0.3:
+            words.insert(rnd.randrange(len(words) + 1), rnd.choice(EMOJI_TOKENS))
+        segments.append(' '.join(words))
+    return segments
+
+
+def best_time(func, segments):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for seg in segments:
+            func(seg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    scorer = SentimentScorer()
+    segments = generate_segments()
+
+    print("=" * 60)
+    print("📊 [BENCH] calculate_text_score: Aho–Corasick vs `in` từng keyword")
+    print("=" * 60)
+    print(f"{'số keyword':>10} | {'gốc (s)':>9} | {'automaton (s)':>13} | {'x':>6}")
+
+    for size in LEXICON_SIZES:
+        if size is not None:
+            scorer.sentiment_keywords = synthetic_lexicon(size)
+            scorer.build_keyword_matchers()
+        n_keywords = len(scorer.keyword_scores)
+
+        # Golden output: điểm phải giống hệt bản gốc
+        mismatches = [s for s in segments if scorer.calculate_text_score(s) != score_reference(scorer, s)]
+        if mismatches:
+            print(f"❌ Lệch điểm ở {len(mismatches)} đoạn, VD: {mismatches[0]!r}")
+            sys.exit(1)
+
+        t_ref = best_time(lambda s: score_reference(scorer, s), segments)
+        t_ac = best_time(scorer.calculate_text_score, segments)
+        print(f"{n_keywords:>10} | {t_ref:>9.3f} | {t_ac:>13.3f} | {t_ref / t_ac:>6.1f}")
+
+    print("✅ Golden output khớp 100%.")
@@ -11,6 +11,36 @@ TARGET_PAGE_URL = 'https://www.facebook.com/tikopapp'
 # Số lượng bài viết muốn lấy
 NUM_POSTS_TO_CRAWL = 10 
 
+# Merge incremental: chỉ nối thêm tương tác mới vào raw_fb_data.csv (giữ nguyên REC_xxx cũ)
+INCREMENTAL_MERGE = False
+
+# Crawl pipeline: comment/reaction chạy song song với crawl post (thay vì 3 giai đoạn nối tiếp)
+CRAWL_PIPELINED = True
+
+# Chạy trình duyệt ẩn (headless) khi crawl. Profile phải đăng nhập sẵn (login_fb.py)
+CRAWL_HEADLESS = False
+
+# Chặn ảnh/video/font/tracking khi crawl (chỉ giữ request cần để sinh dữ liệu GraphQL/XHR)
+CRAWL_BLOCK_RESOURCES = True
+
+# Số tab cào comment song song (cùng 1 trình duyệt, 1 = tuần tự như cũ)
+CRAWL_COMMENT_TABS = 4
+
+# Trần RAM (MB) cho bước Merge. Vượt trần -> merge streaming theo partition post_id trên đĩa. None = không giới hạn
+MERGE_MAX_MEMORY_MB = None
+
+# Số tiến trình xử lý Text song song ở bước Processing (1 = tuần tự)
+PROCESS_WORKERS = 1
+
+# Số tiến trình chấm điểm song song ở bước Scoring (1 = tuần tự)
+SCORE_WORKERS = 1
+
+# Kho điểm (data/cache): chỉ chấm lại comment có input hoặc từ điển thay đổi
+USE_SCORE_STORE = True
+
+# Cache processed_text trên đĩa (data/cache) - bỏ qua text đã xử lý ở lần chạy trước
+USE_TEXT_CACHE = True
+
 # ==============================================================================
 # CẤU HÌNH HỆ THỐNG
 # ==============================================================================
@@ -41,7 +71,9 @@ def main():
     print_separator("1. CRAWLING DATA")
     try:
         # 1. Truyền tham số ngay lúc khởi tạo class
-        crawler = CrawlerManager(target_url=TARGET_PAGE_URL, max_posts=NUM_POSTS_TO_CRAWL)
+        crawler = CrawlerManager(target_url=TARGET_PAGE_URL, max_posts=NUM_POSTS_TO_CRAWL,
+                                 comment_tabs=CRAWL_COMMENT_TABS, pipelined=CRAWL_PIPELINED,
+                                 headless=CRAWL_HEADLESS, block_resources=CRAWL_BLOCK_RESOURCES)
         
         # 2. Dùng asyncio.run() vì hàm run_full_crawl là async
         asyncio.run(crawler.run_full_crawl())
@@ -56,7 +88,7 @@ def main():
     print_separator("2. MERGING RAW DATA")
     try:
         merger = DataMerger()
-        merger.run_merge()
+        merger.run_merge(incremental=INCREMENTAL_MERGE, max_memory_mb=MERGE_MAX_MEMORY_MB)
     except Exception as e:
         print(f"❌ Lỗi bước Merge: {e}")
         return 
@@ -67,7 +99,7 @@ def main():
     print_separator("3. PROCESSING DATA")
     try:
         processor = DataProcessor()
-        processor.run_process()
+        processor.run_process(workers=PROCESS_WORKERS, use_cache=USE_TEXT_CACHE)
     except Exception as e:
         print(f"❌ Lỗi bước Processing: {e}")
         return
@@ -78,7 +110,7 @@ def main():
     print_separator("4. SENTIMENT SCORING")
     try:
         scorer = SentimentScorer()
-        scorer.run_analysis()
+        scorer.run_analysis(workers=SCORE_WORKERS, use_store=USE_SCORE_STORE)
     except Exception as e:
         print(f"❌ Lỗi bước Scoring: {e}")
         return
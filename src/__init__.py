@@ -11,3 +11,6 @@ from .data_processor import DataProcessor
 
 # 4. Module Analysis (Chấm điểm & Phân loại)
 from .sentiment_scorer import SentimentScorer
+
+# 5. Module Service (Chấm điểm real-time)
+from .scoring_service import ScoringService
@@ -1,6 +1,9 @@
 # Import các class chính từ các file con
 
 from .login_fb import FacebookLogin
+from .browser_session import BrowserSession
+from .resource_blocker import ResourceBlocker
+from .adaptive_scroller import AdaptiveScroller
 from .get_posts import FacebookPostCrawler
 from .get_comments import FacebookCommentCrawler
 from .get_reactions import FacebookReactionCrawler
\ No newline at end of file
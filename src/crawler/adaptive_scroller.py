@@ -0,0 +1,65 @@
+import time
+import random
+import asyncio
+
+# ==============================================================================
+# CẤU HÌNH MẶC ĐỊNH
+# ==============================================================================
+SCROLL_MAX_WAIT = 6         # Trần chờ dữ liệu cho 1 lượt cuộn (giây)
+NETWORK_IDLE_WAIT = 0.6     # Không còn XHR/GraphQL nào đang chạy trong ngần này giây -> lượt cuộn đã tải xong
+POLL_INTERVAL = 0.05
+
+class AdaptiveScroller:
+    """
+    Nhịp cuộn theo sự kiện thay cho sleep cố định.
+    Sau mỗi lượt cuộn, wait() trả về ngay khi:
+    - bộ đếm item đã bắt (progress) tăng -> cuộn tiếp luôn, hoặc
+    - mạng yên (không còn request liên quan đang chạy trong NETWORK_IDLE_WAIT) -> lượt này không có gì mới, hoặc
+    - chạm trần max_wait.
+    Request chạy lâu hơn max_wait (long-poll, realtime) không tính là đang tải.
+    """
+
+    def __init__(self, page, progress, is_relevant=None, max_wait=SCROLL_MAX_WAIT,
+                 idle_wait=NETWORK_IDLE_WAIT, jitter=(0, 0)):
+        self.progress = progress        # callable -> số item đã bắt (comment/post/reaction)
+        self.is_relevant = is_relevant or (lambda request: request.resource_type in ["xhr", "fetch"])
+        self.max_wait = max_wait
+        self.idle_wait = idle_wait
+        self.jitter = jitter            # Nghỉ thêm ngẫu nhiên (giây) sau mỗi lượt, tránh nhịp đều như bot
+
+        self.in_flight = {}             # request -> thời điểm gửi
+        self.last_activity = time.monotonic()
+        page.on("request", self.on_request)
+        page.on("requestfinished", self.on_request_done)
+        page.on("requestfailed", self.on_request_done)
+
+    def on_request(self, request):
+        if self.is_relevant(request):
+            self.in_flight[request] = time.monotonic()
+            self.last_activity = time.monotonic()
+
+    def on_request_done(self, request):
+        if self.in_flight.pop(request, None) is not None:
+            self.last_activity = time.monotonic()
+
+    def network_idle(self, now):
+        pending = any(now - sent < self.max_wait for sent in self.in_flight.values())
+        return not pending and now - self.last_activity >= self.idle_wait
+
+    async def wait(self, start_count=None):
+        """Chờ sau 1 lượt cuộn/click. True nếu có item mới so với start_count"""
+        if start_count is None: start_count = self.progress()
+        self.last_activity = time.monotonic()
+        deadline = self.last_activity + self.max_wait
+        grew = False
+        while True:
+            await asyncio.sleep(POLL_INTERVAL)
+            now = time.monotonic()
+            if self.progress() > start_count:
+                grew = True
+                break
+            if self.network_idle(now) or now >= deadline:
+                break
+        if self.jitter[1] > 0:
+            await asyncio.sleep(random.uniform(*self.jitter))
+        return grew
@@ -0,0 +1,85 @@
+import os
+import time
+from playwright.async_api import async_playwright
+
+# ==============================================================================
+# CẤU HÌNH
+# ==============================================================================
+CURRENT_PROFILE_NAME = "acc_clone_1"
+HEADLESS = False
+VIEWPORT = {"width": 1280, "height": 900}
+BROWSER_ARGS = ["--disable-notifications"]
+
+class BrowserSession:
+    """
+    1 trình duyệt (persistent context trên profile đã đăng nhập) dùng chung cho mọi crawler.
+    - Chỉ khởi động Chromium 1 lần, cache/cookie nóng giữ nguyên giữa các giai đoạn.
+    - Chromium khóa thư mục profile -> đây cũng là cách duy nhất để các crawler chạy song song.
+    - Crawler xin tab bằng new_page(), xong thì release_page().
+    """
+
+    def __init__(self, profile_name=CURRENT_PROFILE_NAME, headless=None, user_data_dir=None):
+        self.user_data_dir = user_data_dir or os.path.join(os.getcwd(), "profiles", profile_name)
+        self.profile_name = profile_name
+        self.headless = HEADLESS if headless is None else headless
+
+        self.playwright = None
+        self.context = None
+        self.startup_seconds = 0.0
+        self.pages_served = 0
+        self.taken_pages = set()
+        self.users = set()      # Tên các crawler đã dùng session (mỗi crawler trước đây tự khởi động 1 lần)
+
+    async def start(self):
+        if self.context is not None: return self
+        start = time.perf_counter()
+        self.playwright = await async_playwright().start()
+        self.context = await self.playwright.chromium.launch_persistent_context(
+            user_data_dir=self.user_data_dir, headless=self.headless,
+            args=BROWSER_ARGS, viewport=VIEWPORT
+        )
+        self.startup_seconds = time.perf_counter() - start
+        print(f"🚀 [BROWSER] Profile: {self.profile_name} | "
+              f"{'headless' if self.headless else 'có giao diện'} | khởi động {self.startup_seconds:.2f}s")
+        return self
+
+    async def new_page(self, user=None, blocker=None):
+        """blocker: ResourceBlocker của crawler xin tab (None = tải đầy đủ mọi tài nguyên)"""
+        await self.start()
+        if user: self.users.add(user)
+        self.pages_served += 1
+        # Tab mặc định của persistent context chưa ai dùng -> dùng luôn thay vì mở thêm
+        free_pages = [page for page in self.context.pages if page not in self.taken_pages]
+        page = free_pages[0] if free_pages else await self.context.new_page()
+        self.taken_pages.add(page)
+        if blocker is not None: await blocker.attach(page)
+        return page
+
+    async def release_page(self, page):
+        self.taken_pages.discard(page)
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+    def report(self):
+        """Thời gian khởi động tiết kiệm được so với mỗi crawler tự mở trình duyệt riêng"""
+        launches_saved = max(0, len(self.users) - 1)
+        saved = self.startup_seconds * launches_saved
+        print(f"⏱️ [BROWSER] Khởi động 1 lần ({self.startup_seconds:.2f}s) cho {len(self.users)} crawler, "
+              f"{self.pages_served} tab -> tiết kiệm ~{saved:.2f}s ({launches_saved} lần khởi động, chưa tính cache nóng).")
+        return saved
+
+    async def close(self):
+        if self.context is not None:
+            await self.context.close()
+            self.context = None
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -2,10 +2,22 @@ import asyncio
 import json
 import csv
 import os
+import sys
 import base64
 import re
 from datetime import datetime
-from playwright.async_api import async_playwright
+
+# ==============================================================================
+# [HEADER FIX PATH] (chạy trực tiếp file này vẫn import được src.crawler)
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.crawler.browser_session import BrowserSession
+from src.crawler.resource_blocker import ResourceBlocker
+from src.crawler.adaptive_scroller import AdaptiveScroller
 
 # ==============================================================================
 # CẤU HÌNH
@@ -14,19 +26,26 @@ INPUT_POSTS_FILE = 'data/crawler/posts_detail.csv'          # File đầu vào
 OUTPUT_COMMENTS_FILE = 'data/crawler/comments_detail.csv'   # File đầu ra
 CURRENT_PROFILE_NAME = "acc_clone_1"
 
-SCROLL_DELAY = 3      # Thời gian nghỉ khi cuộn
-MAX_RETRIES = 3       # Số lần thử cuộn lại nếu hết comment
+SCROLL_MAX_WAIT = 6   # Trần chờ comment mới sau mỗi lượt cuộn/click (giây). Có dữ liệu/mạng yên sớm hơn -> đi tiếp ngay
+MAX_RETRIES = 2       # Số lượt cuộn liên tiếp không có comment mới thì dừng bài
+# Chỉ đọc XHR comment -> không tải ảnh/video/font
+BLOCKED_RESOURCE_TYPES = ['image', 'media', 'font']
+
+# Số tab cào song song (cùng 1 browser context -> dùng chung cookie đăng nhập)
+MAX_TABS = 4
 
 class FacebookCommentCrawler:
-    def __init__(self):
-        """Khởi tạo Class"""
+    def __init__(self, max_tabs=MAX_TABS, block_resources=True):
+        """Khởi tạo Class (block_resources=False -> tải đầy đủ ảnh/video/font như trình duyệt thường)"""
         self.input_path = os.path.join(os.getcwd(), INPUT_POSTS_FILE)
         self.output_path = os.path.join(os.getcwd(), OUTPUT_COMMENTS_FILE)
         self.user_data_dir = os.path.join(os.getcwd(), "profiles", CURRENT_PROFILE_NAME)
         
         # [QUAN TRỌNG] Biến đếm tổng số Comment (để tạo ID COM_xxx)
         self.comment_counter = 0         
-        self.current_post_id = ""       
+        self.max_tabs = max(1, max_tabs)
+        self.blocker = ResourceBlocker('comments', BLOCKED_RESOURCE_TYPES) if block_resources else None
+        self.posts_started = 0
         
         os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
         
@@ -75,8 +94,8 @@ class FacebookCommentCrawler:
         print(f"📂 [READ] Đã đọc {len(posts)} bài viết.")
         return posts
 
-    def save_to_csv(self, items):
-        """Lưu danh sách comment vào file"""
+    def save_to_csv(self, items, post_id):
+        """Lưu danh sách comment (của bài post_id) vào file"""
         if not items: return
         
         with open(self.output_path, "a", newline="", encoding="utf-8-sig") as f:
@@ -92,14 +111,14 @@ class FacebookCommentCrawler:
                 writer.writerow([
                     com_id,                 # comment_id
                     'Facebook',             # source_channel
-                    self.current_post_id,   # post_id
+                    post_id,                # post_id
                     item.get("time"),       # timestamp
                     user_real_id,           # user_id
                     item.get("name"),       # social_user
                     item.get("text"),       # original_text
                     item.get("id")          # comment_fb_id
                 ])
-                print(f"      + [{self.current_post_id}] {item.get('name')}: {item.get('text')[:30]}...")
+                print(f"      + [{post_id}] {item.get('name')}: {item.get('text')[:30]}...")
 
     # ==========================================================================
     # HÀM BÓC TÁCH DỮ LIỆU
@@ -157,91 +176,156 @@ class FacebookCommentCrawler:
     # ==========================================================================
     # HÀM CHẠY CHÍNH
     # ==========================================================================
-    async def run(self):
-        posts_to_crawl = self.read_posts_from_csv()
-        if not posts_to_crawl: return
-
-        async with async_playwright() as p:
-            print(f"🚀 Profile: {CURRENT_PROFILE_NAME}")
-            context = await p.chromium.launch_persistent_context(
-                user_data_dir=self.user_data_dir, headless=False,
-                args=["--disable-notifications"], viewport={"width": 1280, "height": 800}
-            )
-            page = context.pages[0]
-
-            # --- LẮNG NGHE MẠNG ---
-            async def handle_response(response):
-                if response.request.resource_type in ["xhr", "fetch"]:
-                    try:
-                        text = await response.text()
-                        if text.startswith("for (;;);"): text = text[9:]
-                        if '"Comment"' in text or '"feedback"' in text:
-                            try:
-                                items = []
-                                self.parse_comments_json(json.loads(text), items)
-                                if items: self.save_to_csv(items)
-                            except: pass
-                    except: pass
-            page.on("response", handle_response)
+    def listen_comments(self, page, tab):
+        """Bắt response XHR chứa comment trên 1 tab.
+        post_id gắn theo request (lúc request được gửi đi), không theo bài tab đang mở lúc response về
+        -> response đến muộn của bài trước không bị gắn nhầm sang bài sau."""
+        request_posts = {}
 
-            total = len(posts_to_crawl)
-            for i, post in enumerate(posts_to_crawl):
-                self.current_post_id = post['post_id'] 
-                link = post['post_link']
-                
-                print(f"\n[{i+1}/{total}] 🌐 {self.current_post_id} | {link}")
+        def handle_request(request):
+            request_posts[request] = tab['post_id']
+
+        def handle_request_failed(request):
+            request_posts.pop(request, None)
+
+        async def handle_response(response):
+            post_id = request_posts.pop(response.request, tab['post_id'])
+            if response.request.resource_type in ["xhr", "fetch"]:
                 try:
-                    await page.goto(link)
-                    await page.wait_for_timeout(4000)
-
-                    # 1. Chỉnh bộ lọc (Most Recent -> All Comments)
-                    print("    ⚙️ Chỉnh bộ lọc...")
-                    try:
-                        filter_btn = page.locator("div[role='button']:has-text('Phù hợp nhất'), div[role='button']:has-text('Most relevant')").first
-                        if await filter_btn.is_visible():
-                            await filter_btn.click()
-                            await page.wait_for_timeout(2000)
-                            all_opt = page.locator("div[role='menuitem']:has-text('Tất cả bình luận'), div[role='menuitem']:has-text('All comments')").first
-                            if await all_opt.is_visible():
-                                await all_opt.click()
-                                await page.wait_for_timeout(3000)
-                            else:
-                                newest_opt = page.locator("div[role='menuitem']:has-text('Mới nhất'), div[role='menuitem']:has-text('Newest')").first
-                                if await newest_opt.is_visible(): await newest_opt.click(); await page.wait_for_timeout(3000)
+                    text = await response.text()
+                    if text.startswith("for (;;);"): text = text[9:]
+                    if '"Comment"' in text or '"feedback"' in text:
+                        try:
+                            items = []
+                            self.parse_comments_json(json.loads(text), items)
+                            if items:
+                                self.save_to_csv(items, post_id)
+                                # Bộ đếm tiến độ của bài tab đang mở (AdaptiveScroller dựa vào đây để cuộn tiếp/dừng)
+                                if post_id == tab['post_id']: tab['captured'] += len(items)
+                        except: pass
+                except: pass
+
+        page.on("request", handle_request)
+        page.on("requestfailed", handle_request_failed)
+        page.on("response", handle_response)
+
+    async def crawl_post(self, page, tab, post, index, total):
+        tab['post_id'] = post['post_id']
+        tab['captured'] = 0
+        scroller = tab['scroller']
+        link = post['post_link']
+
+        print(f"\n[{index}/{total}] 🌐 Tab {tab['no']} | {post['post_id']} | {link}")
+        try:
+            await page.goto(link)
+            # Chờ lượt comment đầu tiên (hoặc mạng yên) thay vì ngủ cố định
+            await scroller.wait(0)
+
+            # 1. Chỉnh bộ lọc (Most Recent -> All Comments)
+            print(f"    ⚙️ [Tab {tab['no']}] Chỉnh bộ lọc...")
+            try:
+                filter_btn = page.locator("div[role='button']:has-text('Phù hợp nhất'), div[role='button']:has-text('Most relevant')").first
+                if await filter_btn.is_visible():
+                    await filter_btn.click()
+                    all_opt = page.locator("div[role='menuitem']:has-text('Tất cả bình luận'), div[role='menuitem']:has-text('All comments')").first
+                    newest_opt = page.locator("div[role='menuitem']:has-text('Mới nhất'), div[role='menuitem']:has-text('Newest')").first
+                    # Chờ menu hiện ra (tối đa 2s) thay vì ngủ cố định
+                    try: await all_opt.or_(newest_opt).first.wait_for(state='visible', timeout=2000)
                     except: pass
+                    if await all_opt.is_visible():
+                        await all_opt.click()
+                        await scroller.wait()
+                    elif await newest_opt.is_visible():
+                        await newest_opt.click()
+                        await scroller.wait()
+            except: pass
+
+            # 2. Cuộn tải comment: dừng khi MAX_RETRIES lượt liên tiếp không bắt thêm được comment nào
+            print(f"    🔄 [Tab {tab['no']}] Đang cuộn...")
+            retry_count = 0
+            while True:
+                before = tab['captured']
+                await page.keyboard.press("End")
+                grew = await scroller.wait(before)
+
+                # Click "Xem thêm" nếu có
+                try:
+                    view_more = page.locator("span:text('Xem thêm bình luận'), span:text('View more comments')").first
+                    if await view_more.is_visible():
+                        await view_more.click()
+                        grew = await scroller.wait(before) or grew
+                except: pass
 
-                    # 2. Cuộn tải comment
-                    print(f"    🔄 Đang cuộn...")
-                    last_count = 0
+                if grew:
+                    print(f"      ⬇️ [Tab {tab['no']}] Tải thêm {tab['captured'] - before}...")
                     retry_count = 0
-                    while True:
-                        current_count = await page.locator("div[role='article'][aria-label*='luan'], div[role='article'][aria-label*='ment']").count()
-                        if current_count == 0: current_count = await page.locator("div[role='article']").count()
-
-                        if current_count == last_count and current_count > 0:
-                            retry_count += 1
-                            print(f"      ⚠️ Chưa thấy mới ({retry_count}/{MAX_RETRIES})...")
-                            if retry_count >= MAX_RETRIES:
-                                print(f"      🛑 Dừng bài này. ")
-                                break
-                        else:
-                            if current_count > last_count:
-                                print(f"      ⬇️ Tải thêm {current_count - last_count}...")
-                                retry_count = 0
-                            last_count = current_count
-
-                        await page.keyboard.press("End")
-                        await page.wait_for_timeout(SCROLL_DELAY * 1000)
-                        
-                        # Click "Xem thêm" nếu có
-                        try:
-                            view_more = page.locator("span:text('Xem thêm bình luận'), span:text('View more comments')").first
-                            if await view_more.is_visible(): await view_more.click(); await page.wait_for_timeout(2000)
-                        except: pass
-                except Exception as e:
-                    print(f"    ⚠️ Lỗi: {e}")
+                else:
+                    retry_count += 1
+                    print(f"      ⚠️ [Tab {tab['no']}] Chưa thấy mới ({retry_count}/{MAX_RETRIES})...")
+                    if retry_count >= MAX_RETRIES:
+                        print(f"      🛑 [Tab {tab['no']}] Dừng bài {post['post_id']} ({tab['captured']} comment). ")
+                        break
+        except Exception as e:
+            print(f"    ⚠️ [Tab {tab['no']}] Lỗi ({post['post_id']}): {e}")
+
+    async def crawl_worker(self, page, tab, queue, total):
+        """Mỗi tab lấy bài tiếp theo trong hàng đợi cho tới khi gặp None (hết bài)"""
+        while True:
+            post = await queue.get()
+            if post is None:
+                # Trả lại tín hiệu kết thúc cho các tab khác
+                queue.put_nowait(None)
+                return
+            self.posts_started += 1
+            await self.crawl_post(page, tab, post, self.posts_started, total)
+
+    async def crawl(self, session, post_queue, total):
+        # --- MỞ N TAB, MỖI TAB 1 BỘ LẮNG NGHE MẠNG RIÊNG ---
+        num_tabs = min(self.max_tabs, total) if isinstance(total, int) else self.max_tabs
+        pages, workers = [], []
+        try:
+            for _ in range(num_tabs):
+                pages.append(await session.new_page('comments', self.blocker))
+            tabs = [{'no': i + 1, 'post_id': '', 'captured': 0} for i in range(num_tabs)]
+            for page, tab in zip(pages, tabs):
+                self.listen_comments(page, tab)
+                tab['scroller'] = AdaptiveScroller(page, lambda tab=tab: tab['captured'], max_wait=SCROLL_MAX_WAIT)
+            print(f"🗂️ Cào song song {num_tabs} tab cho {total} bài viết.")
+
+            workers = [asyncio.ensure_future(self.crawl_worker(page, tab, post_queue, total))
+                       for page, tab in zip(pages, tabs)]
+            await asyncio.gather(*workers)
+        finally:
+            # 1 tab lỗi -> dừng các tab còn lại rồi mới đóng, không để tab mồ côi trong context dùng chung
+            for worker in workers: worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for page in pages: await session.release_page(page)
+
+    async def run(self, post_queue=None, session=None):
+        """
+        post_queue=None: đọc toàn bộ bài từ posts_detail.csv (chạy độc lập).
+        post_queue     : nhận bài ngay khi FacebookPostCrawler phát hiện (pipeline), kết thúc khi gặp None.
+        session        : BrowserSession dùng chung (CrawlerManager); None -> tự mở trình duyệt riêng.
+        """
+        self.posts_started = 0
+        total = '?'
+        if post_queue is None:
+            posts_to_crawl = self.read_posts_from_csv()
+            if not posts_to_crawl: return
+            total = len(posts_to_crawl)
+            post_queue = asyncio.Queue()
+            for post in posts_to_crawl:
+                post_queue.put_nowait(post)
+            post_queue.put_nowait(None)
+
+        if session is not None:
+            await self.crawl(session, post_queue, total)
+        else:
+            async with BrowserSession(CURRENT_PROFILE_NAME, user_data_dir=self.user_data_dir) as session:
+                await self.crawl(session, post_queue, total)
 
-            print(f"\n🎉 HOÀN THÀNH! File: {OUTPUT_COMMENTS_FILE}")
+        print(f"\n🎉 HOÀN THÀNH! {self.posts_started} bài | File: {OUTPUT_COMMENTS_FILE}")
+        if self.blocker: self.blocker.report()
 
 if __name__ == "__main__":
     crawler = FacebookCommentCrawler()
@@ -2,10 +2,21 @@ import asyncio
 import json
 import csv
 import os
+import sys
 import base64
 import re
-import random
-from playwright.async_api import async_playwright
+
+# ==============================================================================
+# [HEADER FIX PATH] (chạy trực tiếp file này vẫn import được src.crawler)
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.crawler.browser_session import BrowserSession
+from src.crawler.resource_blocker import ResourceBlocker
+from src.crawler.adaptive_scroller import AdaptiveScroller
 
 # ==============================================================================
 # CẤU HÌNH MẶC ĐỊNH
@@ -15,12 +26,15 @@ DEFAULT_OUTPUT_FILE = 'data/crawler/posts_detail.csv'
 DEFAULT_MAX_POSTS = 20        
 CURRENT_PROFILE_NAME = "acc_clone_1" 
 
-SCROLL_DELAY = 3      
-MAX_RETRIES = 5       
+SCROLL_MAX_WAIT = 8           # Trần chờ GraphQL feed sau mỗi lượt cuộn (giây)
+SCROLL_JITTER = (0.3, 1.0)    # Nghỉ ngẫu nhiên thêm sau mỗi lượt (giây), tránh nhịp cuộn đều như bot
+MAX_RETRIES = 3               # Số lượt cuộn liên tiếp không thấy bài mới thì dừng
+# Chỉ đọc JSON GraphQL của feed -> không tải ảnh/video/font
+BLOCKED_RESOURCE_TYPES = ['image', 'media', 'font']
 
 class FacebookPostCrawler:
     # [QUAN TRỌNG] Đã sửa __init__ để nhận tham số target_url và max_posts
-    def __init__(self, target_url=DEFAULT_TARGET_URL, max_posts=DEFAULT_MAX_POSTS):
+    def __init__(self, target_url=DEFAULT_TARGET_URL, max_posts=DEFAULT_MAX_POSTS, block_resources=True):
         self.output_path = os.path.join(os.getcwd(), DEFAULT_OUTPUT_FILE)
         self.user_data_dir = os.path.join(os.getcwd(), "profiles", CURRENT_PROFILE_NAME)
         
@@ -30,6 +44,13 @@ class FacebookPostCrawler:
         
         self.post_counter = 0        
         self.captured_fb_ids = set() 
+        # Mọi bài feed trả về (kể cả bài Share/Video bị loại) -> đo tiến độ cuộn
+        self.seen_fb_ids = set()
+        # Chặn ảnh/video/font/tracking (False -> tải đầy đủ như trình duyệt thường)
+        self.blocker = ResourceBlocker('posts', BLOCKED_RESOURCE_TYPES) if block_resources else None
+        # Pipeline: bài mới chờ đẩy sang hàng đợi của crawler comment/reaction
+        self.post_queues = []
+        self.pending_posts = []
         
         os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
         
@@ -116,6 +137,7 @@ class FacebookPostCrawler:
                 except: pass
 
             if not fb_id or fb_id in self.captured_fb_ids: return
+            self.seen_fb_ids.add(fb_id)
 
             user_id, social_user = self.get_author_info(node)
             if user_id == "Unknown": return 
@@ -137,6 +159,7 @@ class FacebookPostCrawler:
                 ])
 
             self.captured_fb_ids.add(fb_id) 
+            if self.post_queues: self.pending_posts.append({'post_id': internal_id, 'post_link': link})
             print(f"✅ [{self.post_counter}/{self.max_posts}] {social_user} | {content[:30]}...")
 
         except Exception: pass
@@ -154,59 +177,80 @@ class FacebookPostCrawler:
         elif isinstance(data, list):
             for item in data: self.parse_graphql_response(item)
 
-    async def run(self):
-        async with async_playwright() as p:
-            print(f"🚀 [START] Profile: {CURRENT_PROFILE_NAME}")
-            context = await p.chromium.launch_persistent_context(
-                user_data_dir=self.user_data_dir,
-                headless=False, 
-                args=["--disable-notifications"],
-                viewport={"width": 1280, "height": 900}
-            )
-            page = context.pages[0]
-
-            async def handle_response(response):
-                if "graphql" in response.url: 
-                    try:
-                        text = await response.text()
-                        for line in text.split('\n'): 
-                            if line.strip():
-                                try: self.parse_graphql_response(json.loads(line))
-                                except: pass
-                    except: pass
-
-            page.on("response", handle_response)
-
-            # [QUAN TRỌNG] Dùng self.target_url thay vì biến mặc định
-            print(f"🌐 [GOTO] {self.target_url}")
-            await page.goto(self.target_url)
-            await page.wait_for_timeout(3000)
-
-            print(f"🔄 [SCROLL] Bắt đầu quét...")
-            retry_count = 0
-            last_count = 0
-
-            # [QUAN TRỌNG] Dùng self.max_posts
-            while self.post_counter < self.max_posts:
-                await page.keyboard.press("End") 
-                await asyncio.sleep(random.uniform(SCROLL_DELAY, SCROLL_DELAY + 2))
-
-                if self.post_counter == last_count: 
-                    retry_count += 1
-                    print(f"   ⏳ Đang chờ... ({retry_count}/{MAX_RETRIES})")
-                    if retry_count >= MAX_RETRIES: 
-                        print("🛑 Dừng cuộn.")
-                        break
-                    try: 
-                        view_more = page.locator("div[role='button']:has-text('Xem thêm')").first
-                        if await view_more.is_visible(): await view_more.click()
-                    except: pass
-                else: 
-                    retry_count = 0
-                    last_count = self.post_counter
-
-            print(f"\n🎉 [DONE] Tổng: {self.post_counter} bài.")
-            print(f"📂 [FILE] {DEFAULT_OUTPUT_FILE}")
+    async def publish_posts(self):
+        """Đẩy bài mới sang các hàng đợi. Hàng đợi đầy (bên nhận chậm) -> chờ ở đây = tạm dừng cuộn tìm bài"""
+        while self.pending_posts:
+            post = self.pending_posts.pop(0)
+            for queue in self.post_queues:
+                await queue.put(post)
+
+    async def crawl(self, page):
+        async def handle_response(response):
+            if "graphql" in response.url: 
+                try:
+                    text = await response.text()
+                    for line in text.split('\n'): 
+                        if line.strip():
+                            try: self.parse_graphql_response(json.loads(line))
+                            except: pass
+                except: pass
+
+        page.on("response", handle_response)
+        scroller = AdaptiveScroller(page, lambda: len(self.seen_fb_ids),
+                                    is_relevant=lambda request: "graphql" in request.url,
+                                    max_wait=SCROLL_MAX_WAIT, jitter=SCROLL_JITTER)
+
+        # [QUAN TRỌNG] Dùng self.target_url thay vì biến mặc định
+        print(f"🌐 [GOTO] {self.target_url}")
+        await page.goto(self.target_url)
+        await scroller.wait(0)
+
+        print(f"🔄 [SCROLL] Bắt đầu quét...")
+        retry_count = 0
+
+        # [QUAN TRỌNG] Dùng self.max_posts
+        while self.post_counter < self.max_posts:
+            await self.publish_posts()
+            await page.keyboard.press("End") 
+            grew = await scroller.wait()
+
+            if not grew: 
+                retry_count += 1
+                print(f"   ⏳ Đang chờ... ({retry_count}/{MAX_RETRIES})")
+                if retry_count >= MAX_RETRIES: 
+                    print("🛑 Dừng cuộn.")
+                    break
+                try: 
+                    view_more = page.locator("div[role='button']:has-text('Xem thêm')").first
+                    if await view_more.is_visible(): await view_more.click()
+                except: pass
+            else: 
+                retry_count = 0
+        await self.publish_posts()
+
+        print(f"\n🎉 [DONE] Tổng: {self.post_counter} bài.")
+        print(f"📂 [FILE] {DEFAULT_OUTPUT_FILE}")
+        if self.blocker: self.blocker.report()
+
+    async def run(self, post_queues=None, session=None):
+        """
+        post_queues: list asyncio.Queue (có giới hạn) nhận từng bài ngay khi được chấp nhận (pipeline).
+                     Việc đóng hàng đợi (đẩy None) do bên điều phối (CrawlerManager) làm.
+        session    : BrowserSession dùng chung (CrawlerManager); None -> tự mở trình duyệt riêng.
+        """
+        self.post_queues = post_queues or []
+        if session is not None:
+            await self.crawl_with_session(session)
+            return
+        async with BrowserSession(CURRENT_PROFILE_NAME, user_data_dir=self.user_data_dir) as session:
+            await self.crawl_with_session(session)
+
+    async def crawl_with_session(self, session):
+        page = await session.new_page('posts', self.blocker)
+        try:
+            await self.crawl(page)
+        finally:
+            await session.release_page(page)
 
 if __name__ == "__main__":
     crawler = FacebookPostCrawler()
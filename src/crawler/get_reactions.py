@@ -2,8 +2,20 @@ import asyncio
 import json
 import csv
 import os
+import sys
 import re
-from playwright.async_api import async_playwright
+
+# ==============================================================================
+# [HEADER FIX PATH] (chạy trực tiếp file này vẫn import được src.crawler)
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.crawler.browser_session import BrowserSession
+from src.crawler.resource_blocker import ResourceBlocker
+from src.crawler.adaptive_scroller import AdaptiveScroller
 
 # ==============================================================================
 # 1. CẤU HÌNH (SETTINGS)
@@ -12,12 +24,14 @@ INPUT_POSTS_FILE = 'data/crawler/posts_detail.csv'          # File chứa link b
 OUTPUT_REACTIONS_FILE = 'data/crawler/reactions_detail.csv' # File chứa kết quả
 CURRENT_PROFILE_NAME = "acc_clone_1"                    # Profile Chrome
 
-MAX_NO_DATA_RETRIES = 3   # Số lần cuộn không thấy mới thì dừng
-SCROLL_TIMEOUT = 2000     # Thời gian chờ khi cuộn (2s)
+MAX_NO_DATA_RETRIES = 2   # Số lượt cuộn liên tiếp không thấy reaction mới thì dừng
+SCROLL_MAX_WAIT = 5       # Trần chờ gói reactors sau mỗi lượt cuộn (giây). Có dữ liệu/mạng yên sớm hơn -> đi tiếp ngay
+# Popup reaction chỉ cần GraphQL reactors -> không tải avatar/video/font
+BLOCKED_RESOURCE_TYPES = ['image', 'media', 'font']
 
 class FacebookReactionCrawler:
-    def __init__(self):
-        """Khởi tạo: Đường dẫn file và các biến đếm"""
+    def __init__(self, block_resources=True):
+        """Khởi tạo: Đường dẫn file, các biến đếm và bộ chặn tài nguyên (block_resources=False -> tải đầy đủ)"""
         self.input_path = os.path.join(os.getcwd(), INPUT_POSTS_FILE)
         self.output_path = os.path.join(os.getcwd(), OUTPUT_REACTIONS_FILE)
         self.user_data_dir = os.path.join(os.getcwd(), "profiles", CURRENT_PROFILE_NAME)
@@ -29,6 +43,9 @@ class FacebookReactionCrawler:
         self.current_post_id = ""
         self.session_captured_count = 0 
         self.reaction_map = {}
+        self.posts_started = 0
+        self.scroller = None
+        self.blocker = ResourceBlocker('reactions', BLOCKED_RESOURCE_TYPES) if block_resources else None
 
         # Tạo thư mục và file CSV
         os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
@@ -140,112 +157,141 @@ class FacebookReactionCrawler:
     # ==========================================================================
     # HÀM CHẠY CHÍNH CHO 1 BÀI VIẾT
     # ==========================================================================
-    async def run(self):
-        # 1. Đọc danh sách bài viết
-        posts_to_crawl = self.read_posts_from_csv()
-        if not posts_to_crawl: return
+    def listen_reactions(self, page):
+        # Thiết lập lắng nghe mạng (Network Listener)
+        async def handle_response(response):
+            if "graphql" in response.url and response.request.method == "POST":
+                try:
+                    text = await response.text()
+                    if '"reactors"' in text: # Nếu thấy gói tin chứa reactors
+                        count = self.parse_reaction_packet(json.loads(text))
+                        if count > 0: 
+                            self.session_captured_count += count
+                            # print(f"      ✅ +{count}...") 
+                except: pass
+        page.on("response", handle_response)
 
-        async with async_playwright() as p:
-            print(f"🚀 [START] Profile: {CURRENT_PROFILE_NAME}")
-            
-            # Mở trình duyệt
-            context = await p.chromium.launch_persistent_context(
-                user_data_dir=self.user_data_dir, 
-                headless=False,
-                args=["--disable-notifications"],
-                viewport={"width": 1280, "height": 800}
-            )
-            page = context.pages[0]
-
-            # Thiết lập lắng nghe mạng (Network Listener)
-            async def handle_response(response):
-                if "graphql" in response.url and response.request.method == "POST":
-                    try:
-                        text = await response.text()
-                        if '"reactors"' in text: # Nếu thấy gói tin chứa reactors
-                            count = self.parse_reaction_packet(json.loads(text))
-                            if count > 0: 
-                                self.session_captured_count += count
-                                # print(f"      ✅ +{count}...") 
-                    except: pass
-            page.on("response", handle_response)
-
-            # 2. Vòng lặp qua từng bài viết
-            total_posts = len(posts_to_crawl)
-            for i, post in enumerate(posts_to_crawl):
-                # Gán thông tin bài hiện tại
-                self.current_post_id = post['post_id']
-                link = post['post_link']
-                self.session_captured_count = 0
-                self.reaction_map = {}
-
-                print(f"\n--- [{i+1}/{total_posts}] 🌐 {self.current_post_id} | {link}")
-                
+    async def crawl_post(self, page, post, index, total):
+        # Gán thông tin bài hiện tại
+        self.current_post_id = post['post_id']
+        link = post['post_link']
+        self.session_captured_count = 0
+        self.reaction_map = {}
+
+        print(f"\n--- [{index}/{total}] 🌐 {self.current_post_id} | {link}")
+        
+        try:
+            await page.goto(link)
+            await self.scroller.wait(0) # Chờ GraphQL của trang tải xong (mạng yên) thay vì ngủ cố định
+
+            # A. Tìm nút mở danh sách
+            button = await self.find_reaction_button(page)
+
+            if button:
+                # [VISUAL DEBUG - GIỮ LẠI ĐỂ ỔN ĐỊNH TOOL]
+                # Vẽ viền đỏ để mắt người nhìn thấy
+                # Việc này cũng tạo ra độ trễ nhỏ giúp tool click chính xác hơn
+                await button.evaluate("el => el.style.border = '4px solid red'")
+                await button.scroll_into_view_if_needed()
+                await page.wait_for_timeout(1000) # Dừng 1 giây cho chắc ăn
+
+                print("      🖱️ Click mở popup...")
                 try:
-                    await page.goto(link)
-                    await page.wait_for_timeout(4000) # Chờ load trang
-
-                    # A. Tìm nút mở danh sách
-                    button = await self.find_reaction_button(page)
-
-                    if button:
-                        # [VISUAL DEBUG - GIỮ LẠI ĐỂ ỔN ĐỊNH TOOL]
-                        # Vẽ viền đỏ để mắt người nhìn thấy
-                        # Việc này cũng tạo ra độ trễ nhỏ giúp tool click chính xác hơn
-                        await button.evaluate("el => el.style.border = '4px solid red'")
-                        await button.scroll_into_view_if_needed()
-                        await page.wait_for_timeout(1000) # Dừng 1 giây cho chắc ăn
-
-                        print("      🖱️ Click mở popup...")
-                        try:
-                            await button.click(force=True) # Click xuyên thấu
-                            await page.wait_for_timeout(3000)
-                        except: pass
-                    else:
-                        print("      ❌ Không tìm thấy nút mở Reaction.")
+                    await button.click(force=True) # Click xuyên thấu
+                    # Chờ popup hiện ra thay vì ngủ cố định
+                    await page.locator("div[role='dialog']").first.wait_for(state='visible', timeout=SCROLL_MAX_WAIT * 1000)
+                except: pass
+            else:
+                print("      ❌ Không tìm thấy nút mở Reaction.")
 
-                    # B. Logic Cuộn Popup & Kiểm tra dừng (Stuck Check)
-                    if await page.locator("div[role='dialog']").count() > 0:
-                        print("      ✅ Popup MỞ! Bắt đầu cuộn...")
-                        
-                        # Tìm hộp thoại popup
-                        dialog = page.locator("div[role='dialog']").first
-                        
-                        # Di chuột vào giữa popup để kích hoạt thanh cuộn
-                        box = await dialog.bounding_box()
-                        if box: await page.mouse.move(box["x"] + box["width"]/2, box["y"] + box["height"]/2)
+            # B. Logic Cuộn Popup & Kiểm tra dừng (Stuck Check)
+            if await page.locator("div[role='dialog']").count() > 0:
+                print("      ✅ Popup MỞ! Bắt đầu cuộn...")
+                
+                # Tìm hộp thoại popup
+                dialog = page.locator("div[role='dialog']").first
+                
+                # Di chuột vào giữa popup để kích hoạt thanh cuộn
+                box = await dialog.bounding_box()
+                if box: await page.mouse.move(box["x"] + box["width"]/2, box["y"] + box["height"]/2)
 
-                        retry_count = 0
-                        last_total = 0
-                        
-                        # Vòng lặp cuộn
-                        while True:
-                            await page.mouse.wheel(0, 3000)
-                            await page.wait_for_timeout(SCROLL_TIMEOUT)
-                            
-                            # Lấy tổng số reaction đã bắt được
-                            current_total = self.session_captured_count
-                            
-                            # So sánh với lần trước
-                            if current_total > last_total:
-                                print(f"         ⬇️ Tải thêm... (Tổng: {current_total})")
-                                last_total = current_total
-                                retry_count = 0 # Có dữ liệu mới -> Reset bộ đếm lỗi
-                            else:
-                                retry_count += 1
-                                print(f"         ⚠️ Không thấy mới... ({retry_count}/{MAX_NO_DATA_RETRIES})")
-                                
-                                # Nếu 3 lần liên tiếp không thấy mới -> Dừng bài này
-                                if retry_count >= MAX_NO_DATA_RETRIES:
-                                    print(f"         🛑 Dừng bài này. Tổng thu được: {current_total}")
-                                    break
+                retry_count = 0
+                
+                # Vòng lặp cuộn: chờ gói reactors tiếp theo (hoặc mạng yên) sau mỗi lượt
+                while True:
+                    last_total = self.session_captured_count
+                    await page.mouse.wheel(0, 3000)
+                    grew = await self.scroller.wait(last_total)
+                    
+                    # Lấy tổng số reaction đã bắt được
+                    current_total = self.session_captured_count
+                    
+                    # So sánh với lần trước
+                    if grew:
+                        print(f"         ⬇️ Tải thêm... (Tổng: {current_total})")
+                        retry_count = 0 # Có dữ liệu mới -> Reset bộ đếm lỗi
                     else:
-                        print("      ⚠️ Popup chưa mở (Lỗi click hoặc không có reaction).")
+                        retry_count += 1
+                        print(f"         ⚠️ Không thấy mới... ({retry_count}/{MAX_NO_DATA_RETRIES})")
+                        
+                        # Nếu MAX_NO_DATA_RETRIES lần liên tiếp không thấy mới -> Dừng bài này
+                        if retry_count >= MAX_NO_DATA_RETRIES:
+                            print(f"         🛑 Dừng bài này. Tổng thu được: {current_total}")
+                            break
+            else:
+                print("      ⚠️ Popup chưa mở (Lỗi click hoặc không có reaction).")
+
+        except Exception as e:
+            print(f"      ⚠️ Lỗi xử lý bài này: {e}")
+
+    # ==========================================================================
+    # HÀM CHẠY CHÍNH
+    # ==========================================================================
+    async def crawl(self, page, post_queue, total):
+        # Vòng lặp qua từng bài viết (tới khi gặp None = hết bài)
+        while True:
+            post = await post_queue.get()
+            if post is None: break
+            self.posts_started += 1
+            await self.crawl_post(page, post, self.posts_started, total)
+
+    async def crawl_with_session(self, session, post_queue, total):
+        page = await session.new_page('reactions', self.blocker)
+        try:
+            self.listen_reactions(page)
+            self.scroller = AdaptiveScroller(page, lambda: self.session_captured_count,
+                                             is_relevant=lambda request: "graphql" in request.url and request.method == "POST",
+                                             max_wait=SCROLL_MAX_WAIT)
+            await self.crawl(page, post_queue, total)
+        finally:
+            await session.release_page(page)
+
+    async def run(self, post_queue=None, session=None):
+        """
+        post_queue=None: đọc toàn bộ bài từ posts_detail.csv (chạy độc lập).
+        post_queue     : nhận bài ngay khi FacebookPostCrawler phát hiện (pipeline), kết thúc khi gặp None.
+        session        : BrowserSession dùng chung (CrawlerManager); None -> tự mở trình duyệt riêng.
+        """
+        self.posts_started = 0
+        total = '?'
+        # 1. Đọc danh sách bài viết
+        if post_queue is None:
+            posts_to_crawl = self.read_posts_from_csv()
+            if not posts_to_crawl: return
+            total = len(posts_to_crawl)
+            post_queue = asyncio.Queue()
+            for post in posts_to_crawl:
+                post_queue.put_nowait(post)
+            post_queue.put_nowait(None)
 
-                except Exception as e:
-                    print(f"      ⚠️ Lỗi xử lý bài này: {e}")
+        if session is not None:
+            await self.crawl_with_session(session, post_queue, total)
+        else:
+            async with BrowserSession(CURRENT_PROFILE_NAME, user_data_dir=self.user_data_dir) as session:
+                await self.crawl_with_session(session, post_queue, total)
 
-            print(f"\n🎉 HOÀN THÀNH TOÀN BỘ! File: {OUTPUT_REACTIONS_FILE}")
+        print(f"\n🎉 HOÀN THÀNH TOÀN BỘ! {self.posts_started} bài | File: {OUTPUT_REACTIONS_FILE}")
+        if self.blocker: self.blocker.report()
 
 if __name__ == "__main__":
     crawler = FacebookReactionCrawler()
@@ -0,0 +1,82 @@
+from collections import Counter
+
+# ==============================================================================
+# CẤU HÌNH MẶC ĐỊNH
+# ==============================================================================
+# Crawler chỉ đọc JSON GraphQL/XHR -> ảnh, video, font là tải thừa.
+# Không chặn stylesheet/script: layout + JS của Facebook cần để cuộn/click sinh ra request GraphQL.
+BLOCKED_RESOURCE_TYPES = ['image', 'media', 'font']
+
+# Chặn bằng CDP Network.setBlockedURLs (chỉ so khớp URL) -> mỗi loại tài nguyên quy về mẫu đuôi file.
+# '*' khớp chuỗi bất kỳ, đuôi file kèm '*' để bắt cả query (?stp=..., &bytestart=...)
+RESOURCE_TYPE_PATTERNS = {
+    'image': ['*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*'],
+    'media': ['*.mp4*', '*.webm*', '*.m4a*', '*.m4v*', '*.mp3*'],
+    'font': ['*.woff*', '*.ttf*', '*.otf*'],
+}
+
+# Host quảng cáo/tracking không liên quan dữ liệu (khớp cả subdomain)
+BLOCKED_HOSTS = [
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'pixel.facebook.com',
+    'an.facebook.com',
+]
+
+class ResourceBlocker:
+    """
+    Chặn request theo mẫu URL hẹp qua CDP Network.setBlockedURLs (Chromium).
+    Không dùng page.route("**/*"): Playwright tắt HTTP cache của tab khi bật chặn request,
+    mọi lần mở bài sẽ tải lại bundle JS/CSS của Facebook và mất luôn cache nóng của profile.
+    1 blocker/crawler (mỗi crawler tự chọn loại cần chặn), gắn được vào nhiều tab của crawler đó.
+    Thống kê: số request bị chặn theo lý do, số byte thực tải qua mạng, số request lấy từ cache.
+    """
+
+    def __init__(self, name, resource_types=BLOCKED_RESOURCE_TYPES, hosts=BLOCKED_HOSTS):
+        self.name = name
+        self.resource_types = set(resource_types or [])
+        unknown = self.resource_types - set(RESOURCE_TYPE_PATTERNS)
+        if unknown:
+            raise ValueError(f"Không hỗ trợ chặn loại tài nguyên: {', '.join(sorted(unknown))}")
+        self.hosts = tuple(h.lower() for h in (hosts or []))
+
+        self.url_patterns = [p for t in sorted(self.resource_types) for p in RESOURCE_TYPE_PATTERNS[t]]
+        for host in self.hosts:
+            for prefix in [host, f"*.{host}"]:
+                self.url_patterns += [f"*://{prefix}/*", f"*://{prefix}:*"]
+
+        self.blocked = Counter()
+        self.allowed_requests = 0
+        self.downloaded_bytes = 0   # Byte thực nhận qua mạng (encodedDataLength), request từ cache ~0
+        self.cache_hits = 0
+
+    def handle_loading_failed(self, params):
+        # Request bị setBlockedURLs chặn có blockedReason = 'inspector'
+        if params.get('blockedReason') != 'inspector': return
+        resource_type = params.get('type', '').lower()
+        self.blocked[resource_type if resource_type in self.resource_types else 'host tracking'] += 1
+
+    def handle_loading_finished(self, params):
+        self.allowed_requests += 1
+        self.downloaded_bytes += int(params.get('encodedDataLength', 0))
+
+    def handle_served_from_cache(self, params):
+        self.cache_hits += 1
+
+    async def attach(self, page):
+        cdp = await page.context.new_cdp_session(page)
+        cdp.on("Network.loadingFinished", self.handle_loading_finished)
+        cdp.on("Network.loadingFailed", self.handle_loading_failed)
+        cdp.on("Network.requestServedFromCache", self.handle_served_from_cache)
+        await cdp.send("Network.enable")
+        await cdp.send("Network.setBlockedURLs", {"urls": self.url_patterns})
+
+    def report(self):
+        total_blocked = sum(self.blocked.values())
+        total = total_blocked + self.allowed_requests
+        detail = ', '.join(f"{reason} {count}" for reason, count in self.blocked.most_common())
+        print(f"🛡️ [BLOCK {self.name}] Chặn {total_blocked}/{total} request"
+              f"{f' ({detail})' if detail else ''} | tải qua mạng {self.downloaded_bytes / 1024 / 1024:.2f} MB"
+              f" | {self.cache_hits} request lấy từ cache")
+        return total_blocked
@@ -1,5 +1,9 @@
 import pandas as pd
 import os
+import csv
+import json
+import heapq
+import shutil
 import sys
 from datetime import datetime
 
@@ -21,6 +25,20 @@ FILE_POSTS = 'posts_detail.csv'
 FILE_COMMENTS = 'comments_detail.csv'
 FILE_REACTIONS = 'reactions_detail.csv'
 FILE_OUTPUT_MASTER = 'raw_fb_data.csv'
+FILE_MERGE_STATE = 'merge_state.json'   # Watermark cho chế độ incremental
+TMP_PARTITION_DIR = '_merge_partitions'  # Thư mục tạm cho chế độ streaming (out-of-core)
+
+# Trần bộ nhớ (MB) cho merge. None = đọc toàn bộ vào RAM như cũ.
+DEFAULT_MAX_MEMORY_MB = None
+SAMPLE_ROWS = 2000      # Số dòng mẫu để ước lượng RAM / dòng
+
+MASTER_COLUMNS = ['record_id', 'timestamp', 'social_user_id', 'source_channel',
+                  'original_text', 'reaction_label', 'post_fb_id']
+
+# Bảng chiều (dimension) bài viết: nội dung bài chỉ lưu 1 lần, các dòng tham chiếu qua post_fb_id
+OUTPUT_DIM_DIR = os.path.join(BASE_DIR, 'data', 'dimensions')
+FILE_POSTS_DIM = 'posts_dim.csv'
+POSTS_DIM_COLUMNS = ['post_fb_id', 'post_id', 'user_id', 'social_user', 'context_content', 'post_link']
 
 class DataMerger:
     def __init__(self):
@@ -28,6 +46,8 @@ class DataMerger:
         self.comments_path = os.path.join(INPUT_CRAWLER_DIR, FILE_COMMENTS)
         self.reactions_path = os.path.join(INPUT_CRAWLER_DIR, FILE_REACTIONS)
         self.output_path = os.path.join(OUTPUT_RAW_DIR, FILE_OUTPUT_MASTER)
+        self.state_path = os.path.join(OUTPUT_RAW_DIR, FILE_MERGE_STATE)
+        self.posts_dim_path = os.path.join(OUTPUT_DIM_DIR, FILE_POSTS_DIM)
 
         # Load ConfigLoader
         self.app_config = ConfigLoader.load()
@@ -38,7 +58,8 @@ class DataMerger:
     def load_csv(self, file_path):
         if os.path.exists(file_path):
             try:
-                return pd.read_csv(file_path, encoding='utf-8-sig')
+                # dtype=str: ID/nội dung giữ nguyên dạng chuỗi, giống nhau giữa đọc cả file và đọc theo chunk
+                return pd.read_csv(file_path, encoding='utf-8-sig', dtype=str)
             except:
                 return pd.DataFrame()
         return pd.DataFrame()
@@ -49,13 +70,447 @@ class DataMerger:
         clean_key = str(raw_react).strip().lower()
         return self.reaction_map.get(clean_key, "NONE")
 
-    def run_merge(self):
+    def key_column(self, df, col):
+        """Cột khóa dạng chuỗi (giống str(row.get(col, '')) của bản lặp cũ)"""
+        if col not in df.columns:
+            return pd.Series('', index=df.index, dtype=object)
+        return df[col].astype(object).map(str)
+
+    def build_reaction_index(self, df_reactions):
+        """Dựng chỉ mục băm (post_id, user_id) -> reaction_type.
+        Giữ reaction ĐẦU TIÊN của mỗi cặp, khớp với iloc[0] của bản lọc mask cũ."""
+        if df_reactions.empty or 'reaction_type' not in df_reactions.columns:
+            return pd.Series(dtype=object, index=pd.MultiIndex.from_arrays([[], []]))
+        keys = pd.MultiIndex.from_arrays([
+            self.key_column(df_reactions, 'post_id'),
+            self.key_column(df_reactions, 'user_id')
+        ])
+        index = pd.Series(df_reactions['reaction_type'].values, index=keys, dtype=object)
+        return index[~index.index.duplicated(keep='first')]
+
+    # --------------------------------------------------------------------------
+    # WATERMARK (CHẾ ĐỘ INCREMENTAL)
+    # --------------------------------------------------------------------------
+    def new_merge_state(self):
+        return {
+            'last_record_no': 0,
+            'comment_keys': set(),            # Comment đã merge (comment_fb_id)
+            'reaction_ids': set(),            # Reaction lẻ đã merge (reaction_fb_id)
+            'comment_interactions': set(),    # (bài, user) đã có dòng comment
+            'reaction_interactions': set(),   # (bài, user) đang có dòng reaction lẻ
+            'reaction_labels': {}             # (bài, user) -> nhãn reaction ĐẦU TIÊN đã thấy
+        }
+
+    def load_merge_state(self):
+        """Đọc tập khóa đã merge. Chỉ hợp lệ khi file Master tương ứng còn tồn tại."""
+        if not (os.path.exists(self.state_path) and os.path.exists(self.output_path)):
+            return None
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            state = self.new_merge_state()
+            missing = [k for k in state if k not in raw]
+            if missing:
+                print(f"   ⚠️ {FILE_MERGE_STATE} định dạng cũ (thiếu {', '.join(missing)}).")
+                return None
+            state['last_record_no'] = int(raw['last_record_no'])
+            state['reaction_labels'] = dict(raw['reaction_labels'])
+            for k in ['comment_keys', 'reaction_ids', 'comment_interactions', 'reaction_interactions']:
+                state[k] = set(raw[k])
+            return state
+        except Exception as e:
+            print(f"⚠️ Lỗi đọc {FILE_MERGE_STATE}: {e}")
+            return None
+
+    def save_merge_state(self, state):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        data = {
+            'last_record_no': state['last_record_no'],
+            'updated_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'reaction_labels': dict(sorted(state['reaction_labels'].items()))
+        }
+        for k in ['comment_keys', 'reaction_ids', 'comment_interactions', 'reaction_interactions']:
+            data[k] = sorted(state[k])
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def update_merge_state(self, state, result):
+        """
+        Ghi nhận khóa của 1 khối vào watermark. Trả về 2 thay đổi cần áp lên các dòng đã có trong Master
+        để khớp với merge toàn bộ:
+        - retracted: (bài, user) trước đây merge thành reaction lẻ nhưng nay đã có comment
+          (merge toàn bộ gắn reaction vào comment, không sinh dòng reaction lẻ) -> rút các dòng đó.
+        - relabel  : (bài, user) đã có comment (nhãn NONE) nay mới crawl được reaction -> gắn lại nhãn.
+        """
+        retracted = state['reaction_interactions'].intersection(result['comment_interactions'])
+        state['reaction_interactions'] -= retracted
+        state['reaction_interactions'].update(result['reaction_interactions'])
+        state['comment_keys'].update(result['comment_keys'])
+        state['comment_interactions'].update(result['comment_interactions'])
+        state['reaction_ids'].update(result['reaction_ids'])
+        for interaction, label in result['reaction_labels'].items():
+            state['reaction_labels'].setdefault(interaction, label)
+        return retracted, result['relabel']
+
+    def read_master(self):
+        # keep_default_na=False: ghi lại y nguyên từng ô (ô trống vẫn là ô trống)
+        return pd.read_csv(self.output_path, encoding='utf-8-sig', dtype=str, keep_default_na=False)
+
+    def master_interactions(self, df_master):
+        return df_master['post_fb_id'] + '|' + df_master['social_user_id']
+
+    def rewrite_master(self, retracted, relabel):
+        """
+        Áp thay đổi lên các dòng cũ của Master (ghi lại nguyên tử, record_id còn lại giữ nguyên):
+        xóa dòng reaction lẻ thuộc `retracted`, gắn nhãn `relabel` cho dòng comment.
+        """
+        df_master = self.read_master()
+        interactions = self.master_interactions(df_master)
+        is_reaction = df_master['source_channel'] == 'Fanpage_Post_Reaction'
+        drop = is_reaction & interactions.isin(retracted)
+        new_label = interactions.map(relabel).where(~is_reaction)
+        update = new_label.notna()
+        if not (drop.any() or update.any()): return 0, 0
+        df_master.loc[update, 'reaction_label'] = new_label[update]
+        tmp_path = self.output_path + '.tmp'
+        df_master[~drop].to_csv(tmp_path, index=False, encoding='utf-8-sig')
+        os.replace(tmp_path, self.output_path)
+        return int(drop.sum()), int(update.sum())
+
+    def comment_keys(self, df_comments, post_keys, user_ids):
+        """Khóa bền vững của comment: comment_fb_id, fallback (bài, user, nội dung)"""
+        if 'comment_fb_id' in df_comments.columns:
+            fb_ids = df_comments['comment_fb_id'].astype(object)
+            has_id = fb_ids.notna() & (fb_ids != "")
+        else:
+            fb_ids = pd.Series('', index=df_comments.index, dtype=object)
+            has_id = pd.Series(False, index=df_comments.index)
+        texts = self.key_column(df_comments, 'original_text')
+        fallback = post_keys + '|' + user_ids + '|' + texts
+        return fb_ids.map(str).where(has_id, fallback)
+
+    def reaction_keys(self, df_reactions, interactions):
+        """Khóa bền vững của reaction lẻ: reaction_fb_id, fallback (bài, user, loại reaction)"""
+        reaction_type = self.key_column(df_reactions, 'reaction_type')
+        fallback = interactions + '|' + reaction_type
+        if 'reaction_fb_id' not in df_reactions.columns:
+            return fallback
+        fb_ids = df_reactions['reaction_fb_id'].astype(object)
+        has_id = fb_ids.notna() & (fb_ids != "")
+        return fb_ids.map(str).where(has_id, fallback)
+
+    # --------------------------------------------------------------------------
+    # BẢNG CHIỀU BÀI VIẾT (POSTS DIMENSION)
+    # --------------------------------------------------------------------------
+    def save_posts_dimension(self, df_posts, post_key_map, is_append):
+        """Ghi posts_dim.csv (1 dòng / bài). Chế độ incremental: upsert theo post_fb_id."""
+        df_dim = df_posts.copy()
+        df_dim['post_fb_id'] = df_dim['post_id'].astype(str).map(lambda pid: post_key_map.get(pid, pid))
+        df_dim = df_dim.reindex(columns=POSTS_DIM_COLUMNS)
+
+        if is_append and os.path.exists(self.posts_dim_path):
+            df_old = pd.read_csv(self.posts_dim_path, encoding='utf-8-sig', dtype=str)
+            df_dim = pd.concat([df_old, df_dim], ignore_index=True)
+        df_dim = df_dim.drop_duplicates(subset=['post_fb_id'], keep='last')
+
+        os.makedirs(os.path.dirname(self.posts_dim_path), exist_ok=True)
+        df_dim.to_csv(self.posts_dim_path, index=False, encoding='utf-8-sig')
+        print(f"   🗂️ Bảng chiều bài viết: {len(df_dim)} bài -> {self.posts_dim_path}")
+
+    # --------------------------------------------------------------------------
+    # LOGIC GHÉP CHO MỘT KHỐI DỮ LIỆU (Cả file hoặc 1 partition theo post_id)
+    # --------------------------------------------------------------------------
+    def merge_block(self, df_comments, df_reactions, ctx, state):
+        """
+        Ghép comment + reaction lẻ của một khối dữ liệu.
+        Mọi tương tác của cùng một post_id phải nằm trọn trong một khối.
+        """
+        admin_ids = ctx['admin_ids']
+        post_context_map = ctx['post_context_map']
+        post_key_map = ctx['post_key_map']
+
+        result = {
+            'comments': pd.DataFrame(), 'reactions': pd.DataFrame(),
+            'comment_keys': [], 'comment_interactions': [], 'reaction_interactions': [], 'reaction_ids': [],
+            'reaction_labels': {}, 'relabel': {},
+            'skipped_admin': 0, 'skipped_admin_react': 0,
+            'new_comments': 0, 'total_comments': 0, 'new_reactions': 0
+        }
+
+        # Chỉ mục (post_id, user_id) -> reaction_type, dựng MỘT lần cho toàn bộ khối
+        reaction_index = self.build_reaction_index(df_reactions)
+        processed_interactions = set()
+
+        # [INCREMENTAL] Nhãn reaction đầu tiên của các (bài, user) lần đầu xuất hiện.
+        # Comment đã merge ở lần trước (nhãn NONE) nay mới có reaction -> cần gắn lại nhãn trong Master
+        if not reaction_index.empty:
+            index_post_key = reaction_index.index.get_level_values(0).map(lambda pid: post_key_map.get(pid, pid))
+            index_interaction = index_post_key + '|' + reaction_index.index.get_level_values(1)
+            for interaction, raw_react in zip(index_interaction, reaction_index.values):
+                if interaction in state['reaction_labels']: continue
+                label = self.normalize_reaction(raw_react)
+                result['reaction_labels'][interaction] = label
+                if interaction in state['comment_interactions']:
+                    result['relabel'][interaction] = label
+
+        # --- XỬ LÝ COMMENT ---
+        if not df_comments.empty:
+            c_post = self.key_column(df_comments, 'post_id')
+            c_user = self.key_column(df_comments, 'user_id')
+
+            # [LỌC ADMIN COMMENT]
+            is_admin = c_user.isin(admin_ids)
+            result['skipped_admin'] = int(is_admin.sum())
+            keep = ~is_admin
+            c_post, c_user = c_post[keep], c_user[keep]
+            df_keep = df_comments[keep]
+            processed_interactions.update(zip(c_post, c_user))
+
+            # [INCREMENTAL] Bỏ qua comment đã có trong file Master
+            c_post_key = c_post.map(lambda pid: post_key_map.get(pid, pid))
+            c_key = self.comment_keys(df_keep, c_post_key, c_user)
+            is_new = ~c_key.isin(state['comment_keys'])
+            result['new_comments'] = int(is_new.sum())
+            result['total_comments'] = len(is_new)
+            c_post, c_user, df_keep = c_post[is_new], c_user[is_new], df_keep[is_new]
+            c_post_key = c_post_key[is_new]
+            c_interaction = c_post_key + '|' + c_user
+            result['comment_keys'] = list(c_key[is_new])
+            result['comment_interactions'] = list(c_interaction)
+
+            # Hash-join: tra reaction của từng comment trong chỉ mục.
+            # Reaction đã thấy ở lần chạy trước đứng trước trong file -> nhãn đã lưu được ưu tiên
+            raw_reaction = reaction_index.reindex(pd.MultiIndex.from_arrays([c_post, c_user]))
+            known_labels = state['reaction_labels']
+            reaction_label = [known_labels[k] if k in known_labels else self.normalize_reaction(r)
+                              for k, r in zip(c_interaction, raw_reaction.values)]
+
+            # Lấy Timestamp
+            if 'timestamp' in df_keep.columns:
+                cmt_time = df_keep['timestamp']
+            elif 'time' in df_keep.columns:
+                cmt_time = df_keep['time']
+            else:
+                cmt_time = pd.Series(None, index=df_keep.index, dtype=object)
+            missing_time = cmt_time.isna() | (cmt_time.astype(object) == "")
+            final_time = cmt_time.astype(object).where(~missing_time, ctx['now'])
+
+            result['comments'] = pd.DataFrame({
+                '_row': df_keep['_row'].values if '_row' in df_keep.columns else range(len(df_keep)),
+                'timestamp': final_time.values,
+                'social_user_id': c_user.values,
+                'source_channel': 'Fanpage_Comment',
+                'original_text': df_keep['original_text'].values if 'original_text' in df_keep.columns else '',
+                'reaction_label': reaction_label,
+                'post_fb_id': c_post_key.values
+            })
+
+        # --- XỬ LÝ REACTION LẺ ---
+        if not df_reactions.empty:
+            r_post = self.key_column(df_reactions, 'post_id')
+            r_user = self.key_column(df_reactions, 'user_id')
+
+            # [LỌC ADMIN REACTION]
+            is_admin = r_user.isin(admin_ids)
+            result['skipped_admin_react'] = int(is_admin.sum())
+
+            # Đã comment ở khối này hoặc ở lần chạy trước -> reaction đi theo dòng comment
+            r_post_key = r_post.map(lambda pid: post_key_map.get(pid, pid))
+            r_interaction = r_post_key + '|' + r_user
+            already_commented = pd.Series(
+                [key in processed_interactions for key in zip(r_post, r_user)],
+                index=df_reactions.index, dtype=bool
+            ) | r_interaction.isin(state['comment_interactions'])
+            context_text = r_post.map(post_context_map)
+            has_context = r_post.isin(post_context_map.keys()) & (context_text.astype(object) != "")
+
+            # [INCREMENTAL] Bỏ qua reaction (reaction_fb_id) đã merge ở lần chạy trước
+            r_key = self.reaction_keys(df_reactions, r_interaction)
+            already_merged = r_key.isin(state['reaction_ids'])
+
+            keep = ~is_admin & ~already_commented & has_context & ~already_merged
+            result['new_reactions'] = int(keep.sum())
+            if keep.any():
+                result['reaction_ids'] = list(r_key[keep])
+                result['reaction_interactions'] = list(r_interaction[keep])
+                reaction_type = df_reactions['reaction_type'] if 'reaction_type' in df_reactions.columns \
+                    else pd.Series('NONE', index=df_reactions.index)
+                result['reactions'] = pd.DataFrame({
+                    '_row': df_reactions['_row'][keep].values if '_row' in df_reactions.columns else range(int(keep.sum())),
+                    'timestamp': ctx['now'],
+                    'social_user_id': r_user[keep].values,
+                    'source_channel': 'Fanpage_Post_Reaction',
+                    'original_text': None,
+                    'reaction_label': [self.normalize_reaction(r) for r in reaction_type[keep].values],
+                    'post_fb_id': r_post_key[keep].values
+                })
+
+        return result
+
+    def report_block(self, result, n_comments, n_reactions, is_append):
+        if n_comments:
+            print(f"   ↳ Đang quét {n_comments} comments...")
+            if is_append:
+                print(f"     💧 {result['new_comments']} comment mới / {result['total_comments']}.")
+            if result['skipped_admin'] > 0:
+                print(f"     🚫 Đã lọc bỏ {result['skipped_admin']} comment của Admin.")
+        if n_reactions:
+            print(f"   ↳ Đang quét {n_reactions} reactions lẻ...")
+            if is_append:
+                print(f"     💧 {result['new_reactions']} reaction lẻ mới.")
+            if result['skipped_admin_react'] > 0:
+                print(f"     🚫 Đã lọc bỏ {result['skipped_admin_react']} reaction lẻ của Admin.")
+
+    # --------------------------------------------------------------------------
+    # CHẾ ĐỘ STREAMING (OUT-OF-CORE)
+    # --------------------------------------------------------------------------
+    def estimate_memory_mb(self, file_path):
+        """Ước lượng RAM (MB) khi nạp toàn bộ file CSV vào pandas, dựa trên dòng mẫu"""
+        if not os.path.exists(file_path):
+            return 0.0, 0.0
+        try:
+            sample = pd.read_csv(file_path, encoding='utf-8-sig', dtype=str, nrows=SAMPLE_ROWS)
+        except Exception:
+            return 0.0, 0.0
+        if sample.empty:
+            return 0.0, 0.0
+        mem_per_row = sample.memory_usage(deep=True, index=False).sum() / len(sample)
+        sample_bytes = len(sample.to_csv(index=False).encode('utf-8')) / len(sample)
+        est_rows = os.path.getsize(file_path) / max(sample_bytes, 1)
+        return est_rows * mem_per_row / 1024 ** 2, mem_per_row
+
+    def partition_to_disk(self, file_path, tmp_dir, prefix, n_partitions, chunk_rows):
+        """Đọc file theo chunk, chia theo hash(post_id) vào n_partitions file tạm"""
+        part_paths = [os.path.join(tmp_dir, f"{prefix}_{i}.csv") for i in range(n_partitions)]
+        if not os.path.exists(file_path):
+            return part_paths, 0
+
+        row_offset = 0
+        try:
+            reader = pd.read_csv(file_path, encoding='utf-8-sig', dtype=str, chunksize=chunk_rows)
+            for chunk in reader:
+                chunk.insert(0, '_row', range(row_offset, row_offset + len(chunk)))
+                row_offset += len(chunk)
+                bucket = pd.util.hash_pandas_object(self.key_column(chunk, 'post_id'), index=False) % n_partitions
+                for part_no, part in chunk.groupby(bucket.values, sort=False):
+                    path = part_paths[part_no]
+                    part.to_csv(path, mode='a', header=not os.path.exists(path), index=False, encoding='utf-8')
+        except Exception as e:
+            print(f"❌ Lỗi đọc {os.path.basename(file_path)}: {e}")
+        return part_paths, row_offset
+
+    def load_partition(self, path):
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        df = pd.read_csv(path, encoding='utf-8', dtype=str)
+        df['_row'] = df['_row'].astype(int)
+        return df
+
+    def iter_sorted_rows(self, paths):
+        """K-way merge các file partition (mỗi file đã sắp theo _row) -> thứ tự gốc"""
+        files = [open(p, 'r', newline='', encoding='utf-8') for p in paths if os.path.exists(p)]
+        try:
+            readers = []
+            for f in files:
+                reader = csv.reader(f)
+                next(reader, None)  # Bỏ header
+                readers.append(reader)
+            for row in heapq.merge(*readers, key=lambda r: int(r[0])):
+                yield row[1:]
+        finally:
+            for f in files:
+                f.close()
+
+    def run_merge_streaming(self, ctx, state, is_append, max_memory_mb):
+        """Merge theo partition post_id trên đĩa, RAM mỗi bước bị chặn bởi max_memory_mb"""
+        est_comments_mb, comment_row_mem = self.estimate_memory_mb(self.comments_path)
+        est_reactions_mb, reaction_row_mem = self.estimate_memory_mb(self.reactions_path)
+
+        # Mỗi partition (comment + reaction + bản sao khi ghép) dùng tối đa ~1/3 trần RAM
+        budget_mb = max_memory_mb / 3
+        n_partitions = max(1, int((est_comments_mb + est_reactions_mb) // budget_mb) + 1)
+        row_mem = max(comment_row_mem, reaction_row_mem, 1)
+        chunk_rows = max(1000, int(budget_mb * 1024 ** 2 / row_mem))
+        print(f"   💽 Streaming: ước lượng {est_comments_mb + est_reactions_mb:.1f} MB | "
+              f"Trần {max_memory_mb} MB -> {n_partitions} partition, chunk {chunk_rows} dòng.")
+
+        tmp_dir = os.path.join(os.path.dirname(self.output_path), TMP_PARTITION_DIR)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        total_rows = 0
+        retracted, relabel = set(), {}
+        try:
+            comment_parts, n_comments = self.partition_to_disk(
+                self.comments_path, tmp_dir, 'comments', n_partitions, chunk_rows)
+            reaction_parts, n_reactions = self.partition_to_disk(
+                self.reactions_path, tmp_dir, 'reactions', n_partitions, chunk_rows)
+
+            # Ghép từng partition -> file kết quả tạm (đã sắp theo _row)
+            summary = None
+            out_comment_parts, out_reaction_parts = [], []
+            for i in range(n_partitions):
+                result = self.merge_block(
+                    self.load_partition(comment_parts[i]), self.load_partition(reaction_parts[i]), ctx, state)
+                if summary is None:
+                    summary = result
+                else:
+                    for k in ['skipped_admin', 'skipped_admin_react', 'new_comments', 'total_comments', 'new_reactions']:
+                        summary[k] += result[k]
+                block_retracted, block_relabel = self.update_merge_state(state, result)
+                retracted |= block_retracted
+                relabel.update(block_relabel)
+
+                for key, out_list in [('comments', out_comment_parts), ('reactions', out_reaction_parts)]:
+                    df_part = result[key]
+                    if not df_part.empty:
+                        out_path = os.path.join(tmp_dir, f"out_{key}_{i}.csv")
+                        df_part.to_csv(out_path, index=False, encoding='utf-8')
+                        out_list.append(out_path)
+            self.report_block(summary, n_comments, n_reactions, is_append)
+
+            # Ghi file Master theo thứ tự gốc: toàn bộ comment rồi đến reaction lẻ
+            if out_comment_parts or out_reaction_parts:
+                os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+                mode, encoding = ('a', 'utf-8') if is_append else ('w', 'utf-8-sig')
+                with open(self.output_path, mode, newline='', encoding=encoding) as f:
+                    writer = csv.writer(f, lineterminator=os.linesep)
+                    if not is_append:
+                        writer.writerow(MASTER_COLUMNS)
+                    record_no = state['last_record_no']
+                    for paths in [out_comment_parts, out_reaction_parts]:
+                        for row in self.iter_sorted_rows(paths):
+                            record_no += 1
+                            writer.writerow([f"REC_{record_no:03d}"] + row)
+                total_rows = record_no - state['last_record_no']
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return total_rows, retracted, relabel
+
+    # --------------------------------------------------------------------------
+    # HÀM CHẠY CHÍNH
+    # --------------------------------------------------------------------------
+    def run_merge(self, incremental=False, max_memory_mb=DEFAULT_MAX_MEMORY_MB):
+        """
+        Gộp dữ liệu crawler thành file Master.
+        - incremental=False: dựng lại toàn bộ raw_fb_data.csv.
+        - incremental=True : chỉ nối thêm comment/reaction chưa từng merge (theo
+          merge_state.json), record_id cũ giữ nguyên, ID mới đánh tiếp từ watermark.
+          User đã có dòng reaction lẻ ở lần trước rồi mới comment -> dòng reaction lẻ đó
+          bị rút khỏi Master (reaction đi theo dòng comment mới); comment đã merge với nhãn NONE
+          nay mới crawl được reaction -> được gắn lại nhãn. Reaction lẻ khử trùng theo reaction_fb_id.
+          Tập dòng khớp merge toàn bộ trên cùng dữ liệu, chỉ khác: record_id (không đánh lại, ID của
+          dòng bị rút không dùng lại), thứ tự dòng (dòng mới nối cuối) và timestamp điền bằng giờ chạy.
+          Watermark chỉ ghi khi incremental=True; merge toàn bộ xóa watermark cũ.
+        - max_memory_mb    : trần RAM. Nếu comment + reaction ước lượng vượt trần,
+          merge chạy streaming theo chunk và chia partition theo post_id trên đĩa.
+        """
         print("🔄 [MERGER] BẮT ĐẦU GHÉP NỐI & CHUẨN HÓA...")
         
-        # 1. Đọc dữ liệu
+        # 1. Đọc dữ liệu (Posts luôn nhỏ -> nạp toàn bộ)
         df_posts = self.load_csv(self.posts_path)
-        df_comments = self.load_csv(self.comments_path)
-        df_reactions = self.load_csv(self.reactions_path)
 
         if df_posts.empty:
             print("❌ [MERGER] Thiếu file POSTS.")
@@ -66,101 +521,93 @@ class DataMerger:
         print(f"   🛡️ Đã xác định {len(admin_ids)} Admin ID cần lọc.")
 
         post_context_map = dict(zip(df_posts['post_id'].astype(str), df_posts['context_content']))
-        
-        merged_records = []
-        processed_interactions = set()
 
-        # --- XỬ LÝ COMMENT ---
-        if not df_comments.empty:
-            skipped_admin = 0
-            print(f"   ↳ Đang quét {len(df_comments)} comments...")
-            
-            for _, row in df_comments.iterrows():
-                post_id = str(row.get('post_id', ''))
-                user_id = str(row.get('user_id', ''))
-                
-                # [LỌC ADMIN COMMENT]
-                if user_id in admin_ids:
-                    skipped_admin += 1
-                    continue 
-
-                raw_reaction = "NONE"
-                if not df_reactions.empty:
-                    react_rows = df_reactions[
-                        (df_reactions['post_id'].astype(str) == post_id) & 
-                        (df_reactions['user_id'].astype(str) == user_id)
-                    ]
-                    if not react_rows.empty:
-                        raw_reaction = react_rows.iloc[0]['reaction_type']
-
-                # Lấy Timestamp
-                cmt_time = row.get('timestamp', row.get('time', None))
-                if pd.isna(cmt_time) or cmt_time == "":
-                    final_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # post_id (POST_xxx) bị crawler đánh lại mỗi lần chạy -> khóa bền vững dùng post_fb_id
+        if 'post_fb_id' in df_posts.columns:
+            post_key_map = dict(zip(df_posts['post_id'].astype(str), df_posts['post_fb_id'].astype(object).map(str)))
+        else:
+            post_key_map = {}
+
+        ctx = {
+            'admin_ids': admin_ids,
+            'post_context_map': post_context_map,
+            'post_key_map': post_key_map,
+            'now': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+        state = self.load_merge_state() if incremental else None
+        is_append = state is not None
+        if incremental and not is_append:
+            print("   ⚠️ Chưa có watermark hợp lệ -> Merge toàn bộ lần đầu.")
+
+        self.save_posts_dimension(df_posts, post_key_map, is_append)
+        if state is None:
+            state = self.new_merge_state()
+        elif state['comment_keys'] or state['reaction_ids']:
+            print(f"   💧 Watermark: REC_{state['last_record_no']:03d} | "
+                  f"{len(state['comment_keys'])} comment, {len(state['reaction_ids'])} reaction lẻ đã merge.")
+
+        use_streaming = False
+        if max_memory_mb:
+            est_mb = self.estimate_memory_mb(self.comments_path)[0] + self.estimate_memory_mb(self.reactions_path)[0]
+            use_streaming = est_mb > max_memory_mb / 3
+
+        # --- GHÉP & LƯU FILE ---
+        if use_streaming:
+            total_rows, retracted, relabel = self.run_merge_streaming(ctx, state, is_append, max_memory_mb)
+        else:
+            df_comments = self.load_csv(self.comments_path)
+            df_reactions = self.load_csv(self.reactions_path)
+            result = self.merge_block(df_comments, df_reactions, ctx, state)
+            self.report_block(result, len(df_comments), len(df_reactions), is_append)
+            retracted, relabel = self.update_merge_state(state, result)
+
+            merged_frames = [f for f in [result['comments'], result['reactions']] if not f.empty]
+            total_rows = 0
+            if merged_frames:
+                df_final = pd.concat(merged_frames, ignore_index=True).drop(columns=['_row'])
+                start_no = state['last_record_no']
+                df_final.insert(0, 'record_id', [f"REC_{start_no+i+1:03d}" for i in range(len(df_final))])
+                df_final = df_final.reindex(columns=MASTER_COLUMNS)
+
+                os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+                if is_append:
+                    # Nối thêm vào cuối, không đọc/ghi lại phần lịch sử
+                    df_final.to_csv(self.output_path, mode='a', header=False, index=False, encoding='utf-8')
                 else:
-                    final_time = cmt_time
-
-                merged_records.append({
-                    'timestamp': final_time,
-                    'social_user_id': user_id,
-                    'source_channel': 'Fanpage_Comment',
-                    'original_text': row.get('original_text', ''),
-                    'reaction_label': self.normalize_reaction(raw_reaction),
-                    'context_content': None
-                })
-                processed_interactions.add((post_id, user_id))
-            
-            if skipped_admin > 0:
-                print(f"     🚫 Đã lọc bỏ {skipped_admin} comment của Admin.")
+                    df_final.to_csv(self.output_path, index=False, encoding='utf-8-sig')
+                total_rows = len(df_final)
+
+        if is_append and (retracted or relabel):
+            n_retracted, n_relabelled = self.rewrite_master(retracted, relabel)
+            if n_retracted:
+                print(f"     ♻️ Rút {n_retracted} dòng reaction lẻ cũ (user đã comment, reaction gắn vào comment).")
+            if n_relabelled:
+                print(f"     🏷️ Gắn lại nhãn reaction cho {n_relabelled} comment cũ (reaction mới crawl được).")
+
+        # Watermark chỉ ghi ở chế độ incremental. Merge toàn bộ dựng lại Master -> watermark cũ hết hiệu lực
+        if incremental:
+            state['last_record_no'] += total_rows
+            self.save_merge_state(state)
+        elif os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+        if total_rows:
 
-        # --- XỬ LÝ REACTION LẺ ---
-        if not df_reactions.empty:
-            skipped_admin_react = 0
-            print(f"   ↳ Đang quét {len(df_reactions)} reactions lẻ...")
-            
-            for _, row in df_reactions.iterrows():
-                post_id = str(row.get('post_id', ''))
-                user_id = str(row.get('user_id', ''))
-
-                # [LỌC ADMIN REACTION]
-                if user_id in admin_ids:
-                    skipped_admin_react += 1
-                    continue
-
-                if (post_id, user_id) not in processed_interactions:
-                    context_text = post_context_map.get(post_id, None)
-                    if context_text:
-                        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-                        merged_records.append({
-                            'timestamp': current_time, 
-                            'social_user_id': user_id,
-                            'source_channel': 'Fanpage_Post_Reaction',
-                            'original_text': None,
-                            'reaction_label': self.normalize_reaction(row.get('reaction_type', 'NONE')),
-                            'context_content': context_text
-                        })
-            
-            # [MỚI] Thêm dòng này để thông báo số lượng bị lọc
-            if skipped_admin_react > 0:
-                print(f"     🚫 Đã lọc bỏ {skipped_admin_react} reaction lẻ của Admin.")
-
-        # --- LƯU FILE ---
-        if merged_records:
-            df_final = pd.DataFrame(merged_records)
-            df_final.insert(0, 'record_id', [f"REC_{i+1:03d}" for i in range(len(df_final))])
-            
-            cols = ['record_id', 'timestamp', 'social_user_id', 'source_channel', 
-                    'original_text', 'reaction_label', 'context_content']
-            df_final = df_final.reindex(columns=cols)
-
-            os.makedirs(OUTPUT_RAW_DIR, exist_ok=True)
-            df_final.to_csv(self.output_path, index=False, encoding='utf-8-sig')
             print(f"✅ [MERGER] Thành công! File: {self.output_path}")
-            print(f"📊 Tổng số: {len(df_final)} dòng.")
+            if is_append:
+                print(f"📊 Nối thêm: {total_rows} dòng (Tổng: {state['last_record_no']} dòng).")
+            else:
+                print(f"📊 Tổng số: {total_rows} dòng.")
+        elif is_append:
+            print("✅ [MERGER] Không có tương tác mới. File Master giữ nguyên.")
         else:
             print("⚠️ [MERGER] Không có dữ liệu.")
 
 if __name__ == "__main__":
+    max_memory_mb = DEFAULT_MAX_MEMORY_MB
+    if '--max-memory-mb' in sys.argv:
+        max_memory_mb = float(sys.argv[sys.argv.index('--max-memory-mb') + 1])
+
     merger = DataMerger()
-    merger.run_merge()  
\ No newline at end of file
+    merger.run_merge(incremental='--incremental' in sys.argv, max_memory_mb=max_memory_mb)
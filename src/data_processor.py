@@ -1,8 +1,9 @@
 import pandas as pd
-import re
-import html
 import os
 import sys
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # ==============================================================================
 # [HEADER FIX PATH]
@@ -12,7 +13,8 @@ project_root = os.path.dirname(current_dir)
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from src.utils import ConfigLoader
+from src.utils import ConfigLoader, TextNormalizer, PIIMasker, ProcessedTextCache
+from src.utils.pii_masker import PII_RULES
 
 # ==============================================================================
 # CẤU HÌNH ĐƯỜNG DẪN & FILE
@@ -20,64 +22,181 @@ from src.utils import ConfigLoader
 BASE_DIR = project_root
 INPUT_RAW_DIR = os.path.join(BASE_DIR, 'data', 'raw')
 OUTPUT_PROCESSED_DIR = os.path.join(BASE_DIR, 'data', 'processed')
+CACHE_DIR = os.path.join(BASE_DIR, 'data', 'cache')
 
 OUTPUT_MERGED_DEBUG = 'merged_raw.csv'
 OUTPUT_FILENAME = 'processed_data.csv'
 
+# Cache processed_text trên đĩa (tắt bằng --no-cache)
+CACHE_FILENAME = 'processed_text.sqlite'
+USE_TEXT_CACHE = True
+CACHE_MAX_ENTRIES = 500_000
+TEXT_PIPELINE_VERSION = '1'   # Tăng khi đổi logic Masking/Chuẩn hóa để vô hiệu cache cũ
+
+# Đọc file nguồn: engine C (nhanh), lỗi định dạng mới chuyển sang engine python (chịu lỗi)
+READ_WORKERS = 4
+RAW_DTYPES = {'post_fb_id': str, 'record_id': str}
+
+# Chạy đa tiến trình (--workers N)
+DEFAULT_WORKERS = 1
+MIN_ROWS_PER_SHARD = 2000   # Ít dòng hơn thì chạy tuần tự cho đỡ chi phí khởi tạo pool
+SHARDS_PER_WORKER = 4       # Chia nhỏ shard để cân tải giữa các worker
+
+# ==============================================================================
+# WORKER (Mỗi tiến trình con khởi tạo ConfigLoader + Processor đúng 1 lần)
+# ==============================================================================
+_worker_processor = None
+
+def _init_worker():
+    global _worker_processor
+    _worker_processor = DataProcessor()
+
+def _process_shard(texts):
+    return _worker_processor.process_texts(texts)
+
 class DataProcessor:
-    def __init__(self):
-        """Khởi tạo Processor"""
+    def __init__(self, config_loader=None):
+        """Khởi tạo Processor (config_loader=None -> dùng singleton ConfigLoader)"""
         print("🔧 [PROCESSOR] Đang khởi tạo bộ xử lý dữ liệu...")
         
         # 1. Load Config & Dictionary
-        self.config_loader = ConfigLoader.load()
+        self.config_loader = config_loader or ConfigLoader.load()
         self.emoji_map = self.config_loader.emoji_map
         self.teencode_map = self.config_loader.teencode
         
-        # 2. Compile Regex
-        self.url_pattern = re.compile(r'http\S+|www\.\S+')
-        self.regex_phone = re.compile(r'(03|05|07|08|09|01[2|6|8|9])+([0-9]{8})\b')
-        self.regex_id = re.compile(r'\b\d{9}\b|\b\d{12}\b')
-        self.regex_bank = re.compile(r'\b\d{10,16}\b')
-        self.regex_email = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
-        self.regex_money = re.compile(r'\b\d+([.,]\d+)*\s?(k|tr|triệu|đ|vnd|vnđ)\b', re.IGNORECASE)
+        # 2. Compile bộ chuẩn hóa (Emoji + Teencode, lấy sẵn từ bundle nếu có) & bộ che PII
+        self.normalizer = self.config_loader.get_compiled(
+            'text_normalizer', lambda: TextNormalizer(self.emoji_map, self.teencode_map))
+        self.config_loader.save_bundle()
+        self.pii_masker = PIIMasker()
+
+        # 3. Phiên bản từ điển (khóa cache): đổi emoji_map/teencode/luật PII -> cache tự vô hiệu
+        version_src = json.dumps([TEXT_PIPELINE_VERSION, self.emoji_map, self.teencode_map, PII_RULES],
+                                 sort_keys=True, ensure_ascii=False)
+        self.text_version = hashlib.sha1(version_src.encode('utf-8')).hexdigest()[:16]
 
     # --------------------------------------------------------------------------
     # 1. LOGIC MASKING PII
     # --------------------------------------------------------------------------
     def mask_pii_info(self, text):
-        if not isinstance(text, str): return ""
-        text = self.regex_phone.sub('[PHONE]', text)
-        text = self.regex_id.sub('[ID_CARD]', text)
-        text = self.regex_bank.sub('[BANK_ACC]', text)
-        text = self.regex_email.sub('[EMAIL]', text)
-        text = self.regex_money.sub('[MONEY]', text)
-        return text
+        # 1 lượt quét: PHONE -> ID_CARD -> BANK_ACC -> EMAIL -> MONEY (cùng thứ tự ưu tiên)
+        return self.pii_masker.mask(text)
 
     # --------------------------------------------------------------------------
     # 2. LOGIC CHUẨN HÓA TEXT
     # --------------------------------------------------------------------------
     def normalize_text(self, text):
-        if not isinstance(text, str): return ""
+        return self.normalizer.normalize(text)
+
+    # --------------------------------------------------------------------------
+    # 3. XỬ LÝ THEO CỘT (Batch)
+    # --------------------------------------------------------------------------
+    def process_texts(self, texts):
+        """Masking PII -> Chuẩn hóa cho một list text (đã lọc bỏ dòng rỗng)"""
+        mask = self.pii_masker.mask
+        normalize = self.normalizer.normalize
+        return [normalize(mask(text)) for text in texts]
+
+    def process_texts_parallel(self, texts, workers):
+        """Chia list text thành các shard liên tiếp, xử lý song song, ghép lại đúng thứ tự gốc"""
+        n_shards = min(workers * SHARDS_PER_WORKER, max(1, len(texts) // MIN_ROWS_PER_SHARD))
+        if workers <= 1 or n_shards <= 1:
+            return self.process_texts(texts)
+
+        shard_size = -(-len(texts) // n_shards)
+        shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+        print(f"   🧵 Chạy song song: {workers} worker, {len(shards)} shard x ~{shard_size} dòng.")
+
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            # map() trả kết quả theo đúng thứ tự shard -> output giống hệt bản tuần tự
+            for shard_result in pool.map(_process_shard, shards):
+                results.extend(shard_result)
+        return results
+
+    def process_texts_cached(self, texts, workers=DEFAULT_WORKERS, use_cache=USE_TEXT_CACHE):
+        """Khử trùng lặp text, tra cache trên đĩa, chỉ xử lý phần còn thiếu"""
+        unique_texts = list(dict.fromkeys(texts))
+        if len(unique_texts) < len(texts):
+            print(f"   ♊ {len(texts)} text -> {len(unique_texts)} text khác nhau.")
+
+        cache = None
+        done = {}
+        if use_cache:
+            cache = ProcessedTextCache(os.path.join(CACHE_DIR, CACHE_FILENAME), self.text_version,
+                                       max_entries=CACHE_MAX_ENTRIES)
+            done = cache.get_many(unique_texts)
 
-        text = str(text).lower()
-        text = html.unescape(text)
-        text = re.sub(r'<[^>]+>', '', text)
-        text = self.url_pattern.sub('', text)
+        todo = [t for t in unique_texts if t not in done]
+        if todo:
+            results = self.process_texts_parallel(todo, workers)
+            done.update(zip(todo, results))
+            if cache is not None:
+                cache.put_many(zip(todo, results))
 
-        for icon, token in self.emoji_map.items():
-            if icon in text:
-                text = text.replace(icon, f" {token} ")
+        if cache is not None:
+            cache.report()
+            cache.close()
+        return [done[t] for t in texts]
 
-        words = text.split()
-        processed_words = [self.teencode_map.get(word, word) for word in words]
-        text = ' '.join(processed_words)
+    def process_text_column(self, texts, workers=DEFAULT_WORKERS, use_cache=USE_TEXT_CACHE):
+        """
+        Xử lý cả cột original_text một lượt.
+        Dòng rỗng/NaN (reaction không kèm comment) -> '[POST_REACTION]' qua mask, không rẽ nhánh từng dòng.
+        """
+        raw = texts.astype(object)
+        raw_str = raw.map(str, na_action='ignore')
+        is_reaction = raw.isna() | (raw_str.str.strip() == '')
 
-        return re.sub(r'\s+', ' ', text).strip()
+        processed = pd.Series('[POST_REACTION]', index=texts.index, dtype=object)
+        has_text = ~is_reaction
+        if has_text.any():
+            processed[has_text] = self.process_texts_cached(raw_str[has_text].tolist(), workers, use_cache)
+        return processed
 
     # --------------------------------------------------------------------------
-    # 3. HÀM ĐỌC VÀ GỘP FILE
+    # 4. HÀM ĐỌC VÀ GỘP FILE
     # --------------------------------------------------------------------------
+    def read_raw_file(self, filename):
+        """
+        Đọc 1 file nguồn. Trả về (df, engine, số dòng lỗi bị bỏ qua).
+        Engine C đọc nhanh nhưng dừng ở dòng lỗi -> khi đó đọc lại bằng engine python
+        và đếm từng dòng bị bỏ qua.
+        """
+        path = os.path.join(INPUT_RAW_DIR, filename)
+        try:
+            df = pd.read_csv(path, encoding='utf-8-sig', engine='c', on_bad_lines='error', dtype=RAW_DTYPES)
+            return df, 'c', 0
+        except (pd.errors.ParserError, UnicodeDecodeError):
+            pass
+
+        bad_lines = []
+        def skip_bad_line(line):
+            bad_lines.append(line)
+            return None
+        df = pd.read_csv(path, encoding='utf-8-sig', engine='python', on_bad_lines=skip_bad_line,
+                         dtype=RAW_DTYPES)
+        return df, 'python', len(bad_lines)
+
+    def assign_record_ids(self, df):
+        """
+        Giữ record_id sẵn có (merger đánh ID bền vững, không đổi giữa các lần chạy incremental).
+        Chỉ dòng thiếu ID (file nguồn không có cột record_id) hoặc trùng ID mới được cấp ID mới,
+        đánh tiếp sau số REC lớn nhất đang có.
+        """
+        if 'record_id' in df.columns:
+            ids = df.pop('record_id').astype(object)
+        else:
+            ids = pd.Series(None, index=df.index, dtype=object)
+        missing = ids.isna() | (ids.astype(str).str.strip() == "") | ids.duplicated(keep='first')
+        if missing.any():
+            print(f"   🔢 Cấp record_id mới cho {int(missing.sum())} dòng thiếu/trùng ID...")
+            numbers = ids[~missing].astype(str).str.extract(r'^REC_(\d+)$', expand=False).dropna()
+            start_no = int(numbers.astype(int).max()) if not numbers.empty else 0
+            ids[missing] = [f"REC_{start_no+i+1:03d}" for i in range(int(missing.sum()))]
+        df.insert(0, 'record_id', ids.values)
+        return df
+
     def load_and_merge_raw(self):
         if not os.path.exists(INPUT_RAW_DIR):
             print(f"❌ Lỗi: Thư mục không tồn tại: {INPUT_RAW_DIR}")
@@ -91,18 +210,32 @@ class DataProcessor:
 
         print(f"📦 [PROCESSOR] Tìm thấy {len(all_files)} file nguồn: {all_files}")
         df_list = []
-        
-        for filename in all_files:
+
+        def safe_read(filename):
             try:
-                path = os.path.join(INPUT_RAW_DIR, filename)
-                df = pd.read_csv(path, encoding='utf-8-sig', on_bad_lines='skip', engine='python')
-                
-                if 'source_channel' not in df.columns:
-                    df['source_channel'] = filename.replace('.csv', '')
-                
-                df_list.append(df)
+                return self.read_raw_file(filename)
             except Exception as e:
-                print(f"❌ Lỗi đọc file {filename}: {e}")
+                return e
+
+        # Đọc song song nhiều file (I/O + parser C nhả GIL), map() giữ đúng thứ tự file
+        with ThreadPoolExecutor(max_workers=max(1, min(READ_WORKERS, len(all_files)))) as pool:
+            results = list(pool.map(safe_read, all_files))
+
+        for filename, result in zip(all_files, results):
+            if isinstance(result, Exception):
+                print(f"❌ Lỗi đọc file {filename}: {result}")
+                continue
+
+            df, engine, skipped = result
+            if skipped:
+                print(f"   📄 {filename}: {len(df)} dòng | ⚠️ Bỏ qua {skipped} dòng lỗi (engine {engine})")
+            else:
+                print(f"   📄 {filename}: {len(df)} dòng (engine {engine})")
+
+            if 'source_channel' not in df.columns:
+                df['source_channel'] = filename.replace('.csv', '')
+
+            df_list.append(df)
         
         if df_list:
             merged_df = pd.concat(df_list, ignore_index=True)
@@ -112,9 +245,9 @@ class DataProcessor:
         return pd.DataFrame()
 
     # --------------------------------------------------------------------------
-    # 4. HÀM CHẠY CHÍNH 
+    # 5. HÀM CHẠY CHÍNH 
     # --------------------------------------------------------------------------
-    def run_process(self):
+    def run_process(self, workers=DEFAULT_WORKERS, use_cache=USE_TEXT_CACHE):
         print("\n🧹 [PROCESSOR] BẮT ĐẦU QUÁ TRÌNH XỬ LÝ DỮ LIỆU...")
         
         # 1. Load dữ liệu
@@ -123,33 +256,22 @@ class DataProcessor:
             print("⏹️ Dừng quy trình vì không có dữ liệu.")
             return
 
-        # --- [LOGIC MỚI] ĐÁNH LẠI SỐ THỨ TỰ (RE-INDEXING) ---
-        print("   🔢 Đang tái lập chỉ mục (Re-indexing ID)...")
-        # Xóa cột record_id cũ nếu có (để tránh trùng lặp hoặc lộn xộn)
-        if 'record_id' in df.columns:
-            df = df.drop(columns=['record_id'])
-        
-        # Tạo ID mới tinh, liền mạch: REC_001 -> REC_NNN
-        df.insert(0, 'record_id', [f"REC_{i+1:03d}" for i in range(len(df))])
+        # --- GIỮ record_id CỦA MERGER (ổn định giữa các lần merge incremental) ---
+        df = self.assign_record_ids(df)
         # ----------------------------------------------------
 
-        # 2. Lưu file gộp thô (merged_raw.csv) - Lúc này đã có ID mới chuẩn
+        # 2. Lưu file gộp thô (merged_raw.csv) - record_id đã ổn định
         os.makedirs(OUTPUT_PROCESSED_DIR, exist_ok=True)
         debug_path = os.path.join(OUTPUT_PROCESSED_DIR, OUTPUT_MERGED_DEBUG)
         df.to_csv(debug_path, index=False, encoding='utf-8-sig')
-        print(f"💾 [DEBUG] Đã lưu file gộp thô (ID mới) tại: {debug_path}")
-
-        # 3. Xử lý Text
-        def process_row(row):
-            raw_text = row.get('original_text', '')
-            if pd.isna(raw_text) or str(raw_text).strip() == '':
-                return '[POST_REACTION]'
-            text = self.mask_pii_info(str(raw_text))
-            text = self.normalize_text(text)
-            return text
+        print(f"💾 [DEBUG] Đã lưu file gộp thô tại: {debug_path}")
 
+        # 3. Xử lý Text (theo cột, không dùng df.apply từng dòng)
         print("   ⚙️ Đang xử lý Text (Masking PII -> Emoji -> Teencode)...")
-        df['processed_text'] = df.apply(process_row, axis=1)
+        if 'original_text' in df.columns:
+            df['processed_text'] = self.process_text_column(df['original_text'], workers, use_cache)
+        else:
+            df['processed_text'] = '[POST_REACTION]'
 
         # 4. Chuẩn hóa Reaction
         if 'reaction_label' in df.columns:
@@ -180,5 +302,9 @@ class DataProcessor:
         except: pass
 
 if __name__ == "__main__":
+    workers = DEFAULT_WORKERS
+    if '--workers' in sys.argv:
+        workers = int(sys.argv[sys.argv.index('--workers') + 1])
+
     processor = DataProcessor()
-    processor.run_process()
\ No newline at end of file
+    processor.run_process(workers=workers, use_cache='--no-cache' not in sys.argv)
\ No newline at end of file
@@ -2,32 +2,101 @@
 import asyncio
 
 from src.crawler import (
-    FacebookPostCrawler, 
-    FacebookCommentCrawler, 
+    BrowserSession,
+    FacebookPostCrawler,
+    FacebookCommentCrawler,
     FacebookReactionCrawler
 )
+from src.crawler.browser_session import HEADLESS
+from src.crawler.get_comments import MAX_TABS
+
+# Pipeline: crawler comment/reaction bắt đầu ngay khi crawler post phát hiện bài mới
+PIPELINED = True
+# Số bài tối đa chờ trong mỗi hàng đợi. Đầy -> crawler post tạm dừng cuộn (backpressure)
+PIPELINE_QUEUE_SIZE = 8
+# Chặn ảnh/video/font/tracking trên mọi crawler (loại chặn cấu hình riêng trong từng file get_*.py)
+BLOCK_RESOURCES = True
 
 class CrawlerManager:
-    def __init__(self, target_url, max_posts):
+    def __init__(self, target_url, max_posts, comment_tabs=MAX_TABS, pipelined=PIPELINED, headless=HEADLESS,
+                 block_resources=BLOCK_RESOURCES):
         self.target_url = target_url
         self.max_posts = max_posts
+        self.comment_tabs = comment_tabs
+        self.pipelined = pipelined
+        self.block_resources = block_resources
+        # 1 trình duyệt cho cả 3 crawler (thay vì mỗi giai đoạn tự khởi động Chromium trên cùng profile)
+        self.session = BrowserSession(headless=headless)
 
     async def run_full_crawl(self):
+        async with self.session:
+            if self.pipelined:
+                await self.run_pipelined_crawl()
+            else:
+                await self.run_sequential_crawl()
+        self.session.report()
+
+    async def run_sequential_crawl(self):
         print("🤖 [MANAGER] BẮT ĐẦU QUY TRÌNH CRAWL DATA...")
 
         # 1. CRAWL POSTS
         print("\n=== GIAI ĐOẠN 1: CRAWL POSTS ===")
-        post_bot = FacebookPostCrawler(target_url=self.target_url, max_posts=self.max_posts)
-        await post_bot.run()
+        post_bot = FacebookPostCrawler(target_url=self.target_url, max_posts=self.max_posts,
+                                       block_resources=self.block_resources)
+        await post_bot.run(session=self.session)
 
         # 2. CRAWL COMMENTS
         print("\n=== GIAI ĐOẠN 2: CRAWL COMMENTS ===")
-        comment_bot = FacebookCommentCrawler()
-        await comment_bot.run()
+        comment_bot = FacebookCommentCrawler(max_tabs=self.comment_tabs, block_resources=self.block_resources)
+        await comment_bot.run(session=self.session)
 
         # 3. CRAWL REACTIONS
         print("\n=== GIAI ĐOẠN 3: CRAWL REACTIONS ===")
-        reaction_bot = FacebookReactionCrawler()
-        await reaction_bot.run()
+        reaction_bot = FacebookReactionCrawler(block_resources=self.block_resources)
+        await reaction_bot.run(session=self.session)
+
+        print("\n✅ [MANAGER] ĐÃ HOÀN THÀNH TOÀN BỘ!")
+
+    async def run_pipelined_crawl(self):
+        """
+        Post -> (hàng đợi comment, hàng đợi reaction) chạy đồng thời, mỗi crawler mở tab riêng trong session chung.
+        Tổng thời gian ~ giai đoạn chậm nhất thay vì tổng 3 giai đoạn.
+        """
+        print("🤖 [MANAGER] BẮT ĐẦU QUY TRÌNH CRAWL DATA (PIPELINE)...")
+        comment_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        reaction_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+
+        post_bot = FacebookPostCrawler(target_url=self.target_url, max_posts=self.max_posts,
+                                       block_resources=self.block_resources)
+        comment_bot = FacebookCommentCrawler(max_tabs=self.comment_tabs, block_resources=self.block_resources)
+        reaction_bot = FacebookReactionCrawler(block_resources=self.block_resources)
+
+        async def produce_posts():
+            try:
+                await post_bot.run(post_queues=[comment_queue, reaction_queue], session=self.session)
+            finally:
+                # None = hết bài (kể cả khi crawler post lỗi giữa chừng) -> bên nhận tự dừng
+                for queue in (comment_queue, reaction_queue):
+                    await queue.put(None)
+
+        async def consume_posts(bot, queue):
+            try:
+                await bot.run(post_queue=queue, session=self.session)
+            except Exception:
+                # Bên nhận lỗi -> vẫn rút cạn hàng đợi tới None, crawler post không bị kẹt ở put() khi hàng đầy
+                while (await queue.get()) is not None:
+                    pass
+                raise
+
+        # Chờ MỌI giai đoạn dừng hẳn rồi mới báo lỗi (gather mặc định trả lỗi ngay, session bị đóng khi tab còn chạy)
+        results = await asyncio.gather(
+            produce_posts(),
+            consume_posts(comment_bot, comment_queue),
+            consume_posts(reaction_bot, reaction_queue),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException): raise result
 
-        print("\n✅ [MANAGER] ĐÃ HOÀN THÀNH TOÀN BỘ!")
\ No newline at end of file
+        print(f"\n✅ [MANAGER] ĐÃ HOÀN THÀNH TOÀN BỘ! {post_bot.post_counter} bài | "
+              f"comment {comment_bot.comment_counter} | reaction {reaction_bot.total_reaction_counter}")
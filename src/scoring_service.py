@@ -0,0 +1,305 @@
+import os
+import sys
+import json
+import time
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.utils import ConfigLoader
+from src.data_processor import DataProcessor
+from src.sentiment_scorer import SentimentScorer
+
+# ==============================================================================
+# CẤU HÌNH SERVICE
+# ==============================================================================
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8765
+
+# Micro-batching: gom request đồng thời thành 1 lô, chờ tối đa MAX_WAIT_MS kể từ request đầu tiên
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 5
+
+# Hot-reload: theo dõi resources/ (config.yaml + từ điển), đổi -> dựng lại matcher ở nền rồi tráo nguyên bộ
+HOT_RELOAD = False
+RELOAD_POLL_S = 2
+
+LATENCY_WINDOW = 10_000     # Số request gần nhất dùng để tính p50/p99
+STATS_INTERVAL_S = 30       # Chu kỳ in thống kê (0 = không in)
+STOPPED_MESSAGE = "Service đang dừng, request không được chấm"
+
+class ScoringService:
+    """
+    Service chấm điểm real-time qua TCP, giao thức JSON-lines (mỗi dòng 1 JSON).
+    Request : {"id": ..., "text": "<comment thô>", "reaction": "LIKE", "context": "<nội dung bài>"}
+              {"cmd": "stats"} -> thống kê latency/throughput
+    Response: {"id": ..., "processed_text": ..., "segments": [{segment_content, topic_code, score_text,
+               score_react, final_score, sentiment_label, priority_level}, ...]}
+    Text thô đi qua DataProcessor (Masking PII -> Chuẩn hóa) rồi SentimentScorer.score_batch.
+    Mỗi response mang dict_version = version bộ từ điển đã chấm request đó.
+    """
+
+    def __init__(self, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, hot_reload=HOT_RELOAD):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.hot_reload = hot_reload
+
+        # Bộ (processor, scorer) đang phục vụ. Hot-reload thay cả tuple bằng 1 phép gán duy nhất
+        self.pipeline = self.build_pipeline()
+        # Luồng riêng để dựng bộ mới -> lô đang chấm không phải chờ
+        self.reload_executor = ThreadPoolExecutor(max_workers=1)
+
+        # 1 luồng chấm điểm: event loop vẫn nhận request mới (và gom lô tiếp theo) trong lúc chấm
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.queue = None
+        self.stopping = False
+
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.total_requests = 0
+        self.total_batches = 0
+        self.started_at = time.perf_counter()
+
+    # --------------------------------------------------------------------------
+    # 1. CHẤM 1 LÔ (chạy trong luồng executor)
+    # --------------------------------------------------------------------------
+    def build_pipeline(self, reload=False):
+        loader = ConfigLoader.reload() if reload else ConfigLoader.load()
+        processor = DataProcessor(loader)
+        scorer = SentimentScorer(loader)
+        scorer.verbose = False
+        if reload: loader.activate()
+        return processor, scorer
+
+    def score_items(self, items):
+        # Lấy bộ hiện tại 1 lần cho cả lô: hot-reload giữa chừng không làm lô bị trộn 2 version
+        # (items đã qua clean_item lúc xếp hàng -> text/reaction/context luôn là str)
+        processor, scorer = self.pipeline
+        texts = processor.process_texts([item['text'] for item in items])
+        df = scorer.score_batch(texts, [item['reaction'] for item in items], [item['context'] for item in items])
+
+        results = [{'id': item.get('id'), 'processed_text': text, 'dict_version': scorer.version, 'segments': []}
+                   for item, text in zip(items, texts)]
+        columns = ['segment_content', 'topic_code', 'score_text', 'score_react',
+                   'final_score', 'sentiment_label', 'priority_level']
+        for index, segment in zip(df['input_index'].tolist(), df[columns].to_dict('records')):
+            results[index]['segments'].append(segment)
+        return results
+
+    # --------------------------------------------------------------------------
+    # 2. GOM LÔ (Micro-batching)
+    # --------------------------------------------------------------------------
+    @staticmethod
+    def clean_item(item):
+        """Kiểm tra + ép kiểu 1 request TRƯỚC khi vào lô: request lỗi chỉ hỏng chính nó, không kéo cả lô"""
+        fields = {}
+        for key, default in [('text', ''), ('reaction', 'NONE'), ('context', '')]:
+            value = item.get(key)
+            if isinstance(value, (dict, list)):
+                raise ValueError(f"'{key}' phải là chuỗi, nhận {type(value).__name__}")
+            fields[key] = str(value) if value not in (None, '') else default
+        fields['reaction'] = fields['reaction'].upper()
+        return {'id': item.get('id'), **fields}
+
+    async def score(self, item):
+        if self.stopping: raise RuntimeError(STOPPED_MESSAGE)
+        item = self.clean_item(item)
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((item, future, time.perf_counter()))
+        return await future
+
+    async def batch_worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = []
+            try:
+                batch.append(await self.queue.get())
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0: break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                items = [item for item, _, _ in batch]
+                try:
+                    results = await loop.run_in_executor(self.executor, self.score_items, items)
+                except Exception:
+                    # Cả lô lỗi -> chấm lại từng request: chỉ request gây lỗi nhận exception
+                    results = [await self.score_one(loop, item) for item in items]
+            except asyncio.CancelledError:
+                # Bị hủy khi stop() giữa lúc gom/chấm lô -> lô dở dang cũng phải nhận lỗi
+                self.fail_pending(batch)
+                raise
+
+            now = time.perf_counter()
+            for (_, future, enqueued_at), result in zip(batch, results):
+                self.latencies.append(now - enqueued_at)
+                if future.done(): continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+            self.total_requests += len(batch)
+            self.total_batches += 1
+
+    def fail_pending(self, batch):
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(RuntimeError(STOPPED_MESSAGE))
+
+    async def score_one(self, loop, item):
+        try:
+            return (await loop.run_in_executor(self.executor, self.score_items, [item]))[0]
+        except Exception as e:
+            return e
+
+    # --------------------------------------------------------------------------
+    # 3. THỐNG KÊ
+    # --------------------------------------------------------------------------
+    def stats(self):
+        ordered = sorted(self.latencies)
+        def percentile(p):
+            if not ordered: return 0.0
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+        elapsed = time.perf_counter() - self.started_at
+        return {
+            'requests': self.total_requests,
+            'batches': self.total_batches,
+            'avg_batch_size': round(self.total_requests / self.total_batches, 2) if self.total_batches else 0.0,
+            'p50_ms': round(percentile(0.50), 2),
+            'p99_ms': round(percentile(0.99), 2),
+            'throughput_rps': round(self.total_requests / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+    async def stats_reporter(self):
+        last_requests = 0
+        while True:
+            await asyncio.sleep(STATS_INTERVAL_S)
+            if self.total_requests == last_requests: continue
+            last_requests = self.total_requests
+            s = self.stats()
+            print(f"📈 [SERVICE] {s['requests']} req | lô TB {s['avg_batch_size']} | "
+                  f"p50 {s['p50_ms']} ms | p99 {s['p99_ms']} ms | {s['throughput_rps']} req/s")
+
+    # --------------------------------------------------------------------------
+    # 4. HOT-RELOAD TỪ ĐIỂN
+    # --------------------------------------------------------------------------
+    async def watch_resources(self):
+        loop = asyncio.get_running_loop()
+        snapshot = ConfigLoader.resource_snapshot()
+        while True:
+            await asyncio.sleep(RELOAD_POLL_S)
+            current = ConfigLoader.resource_snapshot()
+            if current == snapshot: continue
+            snapshot = current
+
+            old_version = self.pipeline[1].version
+            try:
+                pipeline = await loop.run_in_executor(self.reload_executor, self.build_pipeline, True)
+            except Exception as e:
+                # File đang sửa dở/lỗi cú pháp -> giữ bộ cũ, lần sửa tiếp theo sẽ thử lại
+                print(f"⚠️ [SERVICE] Nạp lại từ điển lỗi, giữ version {old_version}: {e}")
+                continue
+            self.pipeline = pipeline
+            print(f"🔄 [SERVICE] Đã nạp lại từ điển: version {old_version} -> {pipeline[1].version}")
+
+    # --------------------------------------------------------------------------
+    # 5. KẾT NỐI CLIENT (JSON-lines)
+    # --------------------------------------------------------------------------
+    async def answer(self, item, writer):
+        try:
+            response = await self.score(item)
+        except Exception as e:
+            response = {'id': item.get('id'), 'error': str(e)}
+        writer.write((json.dumps(response, ensure_ascii=False, default=str) + '\n').encode('utf-8'))
+
+    async def handle_client(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    item = None
+                if not isinstance(item, dict):
+                    writer.write(b'{"error": "invalid json"}\n')
+                    continue
+
+                if item.get('cmd') == 'stats':
+                    writer.write((json.dumps(self.stats()) + '\n').encode('utf-8'))
+                    continue
+
+                # Không chờ kết quả mới đọc dòng tiếp -> client gửi dồn vẫn được gom chung lô
+                task = asyncio.create_task(self.answer(item, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if tasks: await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    # --------------------------------------------------------------------------
+    # 6. CHẠY SERVICE
+    # --------------------------------------------------------------------------
+    async def start(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        self.queue = asyncio.Queue()
+        self.stopping = False
+        self.started_at = time.perf_counter()
+        self.background = [asyncio.create_task(self.batch_worker())]
+        if STATS_INTERVAL_S:
+            self.background.append(asyncio.create_task(self.stats_reporter()))
+        if self.hot_reload:
+            self.background.append(asyncio.create_task(self.watch_resources()))
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"✅ [SERVICE] Đang lắng nghe {host}:{port} "
+              f"(lô tối đa {self.max_batch_size}, chờ tối đa {self.max_wait * 1000:g} ms, "
+              f"từ điển {self.pipeline[1].version}{', hot-reload' if self.hot_reload else ''})")
+        return self.server
+
+    async def stop(self):
+        self.stopping = True
+        self.server.close()
+        # Request còn trong hàng đợi -> báo lỗi ngay thay vì để client chờ tới khi mất kết nối
+        pending = []
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        self.fail_pending(pending)
+        for task in self.background:
+            task.cancel()
+        await asyncio.gather(*self.background, return_exceptions=True)
+        # Sau khi mọi future đã có kết quả: handle_client trả lời xong, kết nối đóng được
+        await self.server.wait_closed()
+        self.executor.shutdown(wait=False)
+        self.reload_executor.shutdown(wait=False)
+
+    async def serve_forever(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+if __name__ == "__main__":
+    def arg(name, default, cast):
+        if name in sys.argv: return cast(sys.argv[sys.argv.index(name) + 1])
+        return default
+
+    service = ScoringService(max_batch_size=arg('--max-batch', MAX_BATCH_SIZE, int),
+                             max_wait_ms=arg('--max-wait-ms', MAX_WAIT_MS, float),
+                             hot_reload=HOT_RELOAD or '--reload' in sys.argv)
+    try:
+        asyncio.run(service.serve_forever(arg('--host', SERVICE_HOST, str), arg('--port', SERVICE_PORT, int)))
+    except KeyboardInterrupt:
+        print("\n⏹️ [SERVICE] Đã dừng.")
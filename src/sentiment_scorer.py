@@ -1,7 +1,10 @@
 import pandas as pd
+import numpy as np
 import re
 import os
 import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 # ==============================================================================
 # [HEADER FIX PATH]
@@ -11,7 +14,7 @@ project_root = os.path.dirname(current_dir)
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from src.utils import ConfigLoader
+from src.utils import ConfigLoader, KeywordAutomaton, ScoreStore
 
 # ==============================================================================
 # CẤU HÌNH
@@ -23,11 +26,43 @@ OUTPUT_REPORT_DIR = os.path.join(BASE_DIR, 'data', 'reports')
 INPUT_FILENAME = 'processed_data.csv'      
 OUTPUT_FILENAME = 'final_sentiment_report.csv'
 
+# Bảng chiều bài viết do DataMerger sinh ra (nội dung bài tra theo post_fb_id)
+INPUT_DIM_DIR = os.path.join(BASE_DIR, 'data', 'dimensions')
+POSTS_DIM_FILENAME = 'posts_dim.csv'
+
+# Cột trả về của API score_batch (mỗi dòng 1 segment)
+BATCH_COLUMNS = ['input_index', 'segment_no', 'segment_content', 'is_split', 'topic_code', 'reaction_label',
+                 'score_text', 'score_react', 'final_score', 'sentiment_label', 'priority_level', 'dict_version']
+
+# Kho điểm bền vững: chỉ chấm lại comment có input/từ điển thay đổi (tắt bằng --no-store)
+SCORE_STORE_DIR = os.path.join(BASE_DIR, 'data', 'cache')
+SCORE_STORE_FILENAME = 'score_store.sqlite'
+USE_SCORE_STORE = True
+SCORE_STORE_MAX_ENTRIES = 1_000_000
+SCORE_LOGIC_VERSION = '1'   # Tăng khi đổi logic tách đoạn/điểm text/topic để vô hiệu điểm đã lưu
+
+# Chấm song song (--workers N). Cần start method 'fork' để worker dùng chung matcher đã compile
+DEFAULT_WORKERS = 1
+MIN_ROWS_PER_CHUNK = 2000   # Ít comment hơn thì chạy tuần tự cho đỡ chi phí khởi tạo pool
+CHUNKS_PER_WORKER = 4       # Chia nhỏ chunk để cân tải giữa các worker
+
+# ==============================================================================
+# WORKER (Kế thừa Scorer của tiến trình cha qua fork - copy-on-write, không compile lại)
+# ==============================================================================
+_fork_scorer = None
+
+def _analyze_segment_chunk(chunk):
+    segments, contexts, with_text = chunk
+    return _fork_scorer.analyze_segments(segments, contexts, with_text)
+
 class SentimentScorer:
-    def __init__(self):
+    def __init__(self, config_loader=None):
         print("🔧 [SCORER] Đang khởi tạo bộ chấm điểm...")
-        self.config_loader = ConfigLoader.load()
+        self.verbose = True     # Tắt log từng lượt chấm khi dùng như thư viện (score_batch, service)
+        self.config_loader = config_loader or ConfigLoader.load()
         self.config = self.config_loader.config
+        # Version id của bộ từ điển/config đang dùng (gắn vào từng dòng kết quả score_batch)
+        self.version = self.config_loader.version
         
         # 1. Load config
         self.weights = self.config.get('weights', {'text_content': 0.7, 'reaction': 0.3})
@@ -40,12 +75,60 @@ class SentimentScorer:
         self.topic_keywords = self.config_loader.get_dict('topic_keywords')
         self.pivot_keywords = self.config_loader.get_dict('pivot_keywords')
         
-        # 3. Regex tách câu
-        if self.pivot_keywords:
-            sorted_pivots = sorted(self.pivot_keywords, key=len, reverse=True)
-            self.split_pattern = r'(?:' + '|'.join([re.escape(k) for k in sorted_pivots]) + r')'
-        else:
-            self.split_pattern = None
+        # 3. Regex tách câu: compile mỗi lần khởi động (unpickle từ bundle cũng là re.compile lại, không lợi gì)
+        self.split_pattern = self.compile_split_pattern()
+        # 4. Automaton keyword cảm xúc/emoji/topic
+        # (dựng 1 lần cho mỗi version từ điển, lần khởi động sau lấy thẳng từ bundle của ConfigLoader)
+        self.apply_keyword_matchers(self.config_loader.get_compiled('scorer_matchers', self.compile_keyword_matchers))
+        self.config_loader.save_bundle()
+
+    def compile_split_pattern(self):
+        if not self.pivot_keywords: return None
+        sorted_pivots = sorted(self.pivot_keywords, key=len, reverse=True)
+        return re.compile(r'(?:' + '|'.join([re.escape(k) for k in sorted_pivots]) + r')')
+
+    def compile_keyword_matchers(self):
+        """Compile toàn bộ keyword cảm xúc + token emoji + keyword topic thành automaton"""
+        keyword_list = []
+        keyword_scores = []
+        for label, data in self.sentiment_keywords.items():
+            for kw in data['keywords']:
+                keyword_list.append(kw)
+                keyword_scores.append(data['score'])
+
+        # Topic: keyword -> thứ tự topic trong từ điển (topic đứng trước thắng)
+        topic_list = []
+        topic_names = list(self.topic_keywords.keys())
+        topic_rank = []
+        for rank, topic in enumerate(topic_names):
+            for kw in self.topic_keywords[topic]:
+                topic_list.append(kw)
+                topic_rank.append(rank)
+
+        return {
+            'keyword_matcher': KeywordAutomaton(keyword_list),
+            'keyword_scores': keyword_scores,
+            'emoji_matcher': KeywordAutomaton(list(self.emoji_scores.keys())),
+            'emoji_values': list(self.emoji_scores.values()),
+            'topic_matcher': KeywordAutomaton(topic_list),
+            'topic_names': topic_names,
+            'topic_rank': topic_rank,
+        }
+
+    def apply_keyword_matchers(self, matchers):
+        self.keyword_matcher = matchers['keyword_matcher']
+        self.keyword_scores = matchers['keyword_scores']
+        self.emoji_matcher = matchers['emoji_matcher']
+        self.emoji_values = matchers['emoji_values']
+        self.topic_matcher = matchers['topic_matcher']
+        self.topic_names = matchers['topic_names']
+        self.topic_rank = matchers['topic_rank']
+        # Memo topic theo nội dung bài viết (mỗi context chỉ phân loại 1 lần/lượt chạy)
+        self.context_topics = {}
+
+    def build_keyword_matchers(self):
+        """Dựng lại automaton từ từ điển hiện tại của Scorer (gọi lại khi đổi từ điển trên instance)"""
+        self.apply_keyword_matchers(self.compile_keyword_matchers())
 
     # --------------------------------------------------------------------------
     # 1. LOGIC TÁCH ĐOẠN
@@ -55,7 +138,7 @@ class SentimentScorer:
         if text == '[POST_REACTION]': return [text]
         if not self.split_pattern: return [text]
 
-        raw_segments = re.split(self.split_pattern, text)
+        raw_segments = self.split_pattern.split(text)
         segments = [seg.strip() for seg in raw_segments if seg.strip()]
         return segments if segments else [text]
 
@@ -65,40 +148,36 @@ class SentimentScorer:
     def calculate_text_score(self, text):
         if text == '[POST_REACTION]': return 0.0
         score = 0.0
-        text_lower = text.lower()
-        
-        for label, data in self.sentiment_keywords.items():
-            base_score = data['score']
-            for kw in data['keywords']:
-                if kw in text_lower:
-                    score += base_score
-        
-        for token, val in self.emoji_scores.items():
-            count = text.count(token)
-            if count > 0: score += (val * count)
-        
+
+        # Cộng theo đúng thứ tự keyword trong từ điển (giữ nguyên kết quả cộng số thực)
+        for kw_id in sorted(self.keyword_matcher.find_ids(text.lower())):
+            score += self.keyword_scores[kw_id]
+
+        for emoji_id, count in sorted(self.emoji_matcher.count_ids(text).items()):
+            score += (self.emoji_values[emoji_id] * count)
+
         return max(-2.0, min(2.0, score))
 
     # --------------------------------------------------------------------------
     # 3. LOGIC TOPIC
     # --------------------------------------------------------------------------
+    def match_topic(self, text):
+        kw_ids = self.topic_matcher.find_ids(str(text).lower())
+        if not kw_ids: return 'TOPIC_OTHER'
+        return self.topic_names[min(self.topic_rank[i] for i in kw_ids)]
+
     def detect_topic(self, text, context_content=None):
-        target_text = text
         # Nếu là reaction, dùng context để detect topic
         if text == '[POST_REACTION]':
             if pd.isna(context_content) or str(context_content).strip() == "":
                 return 'TOPIC_OTHER'
-            target_text = str(context_content)
-        
-        target_text_lower = str(target_text).lower()
-        detected_topics = []
-        for topic, keywords in self.topic_keywords.items():
-            for kw in keywords:
-                if kw in target_text_lower:
-                    detected_topics.append(topic)
-                    break 
-        if not detected_topics: return 'TOPIC_OTHER'
-        return detected_topics[0]
+            topic = self.context_topics.get(context_content)
+            if topic is None:
+                topic = self.match_topic(context_content)
+                self.context_topics[context_content] = topic
+            return topic
+
+        return self.match_topic(text)
 
     # --------------------------------------------------------------------------
     # 4. LOGIC ĐIỂM FINAL
@@ -119,6 +198,22 @@ class SentimentScorer:
         final = (text_score * w_text) + (effective_reaction * w_react)
         return round(final, 2)
 
+    def calculate_final_scores(self, text_scores, reaction_scores, is_split):
+        """Bản theo cột của calculate_final_score (cùng luật, cùng kết quả)"""
+        t = np.asarray(text_scores, dtype=float)
+        r = np.asarray(reaction_scores, dtype=float)
+        split = np.asarray(is_split, dtype=bool)
+
+        effective = np.where(split & (t > 0) & (r < 0), 0.0, r)
+        w_text = self.weights.get('text_content', 0.7)
+        w_react = self.weights.get('reaction', 0.3)
+        weighted = (t * w_text) + (effective * w_react)
+        # round() của Python (không phải np.round) -> làm tròn y hệt bản từng dòng; chỉ gọi trên giá trị duy nhất
+        values, inverse = np.unique(weighted, return_inverse=True)
+        rounded = np.array([round(v, 2) for v in values.tolist()], dtype=float)[inverse.reshape(-1)]
+
+        return np.select([(t == 0) & (r != 0), (t > 0) & (effective < 0)], [r, effective], default=rounded)
+
     # --------------------------------------------------------------------------
     # 5. LOGIC LABEL & PRIORITY
     # --------------------------------------------------------------------------
@@ -137,10 +232,310 @@ class SentimentScorer:
         if topic == 'TOPIC_PRODUCT' and score >= 1.5: return 'OPPORTUNITY'
         return 'NORMAL'
 
+    def assign_labels(self, scores):
+        """Bản theo cột của assign_label (numpy.select, cùng thứ tự điều kiện)"""
+        s = np.asarray(scores, dtype=float)
+        conditions = [
+            s <= self.thresholds.get('critical', -2.0),
+            s <= self.thresholds.get('high', -1.0),
+            s < 0,
+            s >= 1.5,
+            s > 0,
+        ]
+        choices = ["PANIC", "NEGATIVE", "SKEPTICAL", "ADVOCACY", "POSITIVE"]
+        return np.select(conditions, choices, default="NEUTRAL").astype(object)
+
+    def assign_priorities(self, scores, topics):
+        """Bản theo cột của assign_priority"""
+        s = np.asarray(scores, dtype=float)
+        t = np.asarray(topics, dtype=object)
+        conditions = [
+            (t == 'TOPIC_TRUST') | (s <= -2.0),
+            np.isin(t, ['TOPIC_DEPOSIT', 'TOPIC_WITHDRAW']) & (s <= -1.0),
+            (t == 'TOPIC_EKYC') & (s < 0),
+            (t == 'TOPIC_PRODUCT') & (s >= 1.5),
+        ]
+        choices = ['CRITICAL', 'HIGH', 'MEDIUM', 'OPPORTUNITY']
+        return np.select(conditions, choices, default='NORMAL').astype(object)
+
+    # --------------------------------------------------------------------------
+    # 6. JOIN NỘI DUNG BÀI VIẾT (POSTS DIMENSION)
+    # --------------------------------------------------------------------------
+    def load_post_context(self):
+        """Đọc posts_dim.csv -> dict post_fb_id -> context_content"""
+        dim_path = os.path.join(INPUT_DIM_DIR, POSTS_DIM_FILENAME)
+        if not os.path.exists(dim_path):
+            print(f"⚠️ Không tìm thấy bảng chiều bài viết: {dim_path}")
+            return {}
+        df_dim = pd.read_csv(dim_path, encoding='utf-8-sig', dtype=str)
+        return dict(zip(df_dim['post_fb_id'], df_dim['context_content']))
+
+    def attach_post_context(self, df):
+        """Gắn context_content cho các dòng [POST_REACTION] (chỉ nơi cần dùng/hiển thị)"""
+        if 'context_content' in df.columns or 'post_fb_id' not in df.columns:
+            return df
+        post_context = self.load_post_context()
+        # Chỉ reaction lẻ mới mang ngữ cảnh bài viết (comment rỗng vẫn giữ context trống như cũ)
+        if 'source_channel' in df.columns:
+            is_reaction = df['source_channel'] == 'Fanpage_Post_Reaction'
+        else:
+            is_reaction = df['processed_text'] == '[POST_REACTION]'
+        df['context_content'] = df['post_fb_id'].where(is_reaction).map(post_context)
+        print(f"   🗂️ Đã join nội dung {len(post_context)} bài viết cho {int(is_reaction.sum())} reaction.")
+        return df
+
+    # --------------------------------------------------------------------------
+    # 7. CHẤM THEO CỘT (Segment -> Điểm, Topic, Label, Priority)
+    # --------------------------------------------------------------------------
+    def get_column(self, df, name, default):
+        if name in df.columns: return df[name]
+        return pd.Series(default, index=df.index, dtype=object)
+
+    def analyze_segments(self, segments, contexts, with_text=True):
+        """Phần tốn CPU (chạy từng đoạn): điểm text + topic"""
+        s_text = [self.calculate_text_score(seg) for seg in segments] if with_text else None
+        topics = [self.detect_topic(seg, ctx) for seg, ctx in zip(segments, contexts)]
+        return s_text, topics
+
+    def analyze_segments_parallel(self, segments, contexts, workers, with_text=True):
+        """Chia list segment thành các chunk liên tiếp, chấm trên nhiều tiến trình, ghép lại đúng thứ tự"""
+        n_chunks = min(workers * CHUNKS_PER_WORKER, max(1, len(segments) // MIN_ROWS_PER_CHUNK))
+        if workers <= 1 or n_chunks <= 1:
+            return self.analyze_segments(segments, contexts, with_text)
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            print("   ⚠️ Hệ điều hành không hỗ trợ fork -> Chấm tuần tự.")
+            return self.analyze_segments(segments, contexts, with_text)
+
+        chunk_size = -(-len(segments) // n_chunks)
+        chunks = [(segments[i:i + chunk_size], contexts[i:i + chunk_size], with_text)
+                  for i in range(0, len(segments), chunk_size)]
+        if self.verbose: print(f"   🧵 Chấm song song: {workers} worker, {len(chunks)} chunk x ~{chunk_size} đoạn.")
+
+        global _fork_scorer
+        _fork_scorer = self
+        s_text = [] if with_text else None
+        topics = []
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+                # map() trả kết quả theo đúng thứ tự chunk
+                for chunk_text, chunk_topics in pool.map(_analyze_segment_chunk, chunks):
+                    if with_text: s_text.extend(chunk_text)
+                    topics.extend(chunk_topics)
+        finally:
+            _fork_scorer = None
+        return s_text, topics
+
+    def combine_scores(self, s_text, reactions, topics, is_split):
+        """Phần rẻ (theo cột): điểm reaction -> điểm final -> label, priority"""
+        s_text = np.asarray(s_text, dtype=float)
+        topics = np.asarray(topics, dtype=object)
+        s_react = np.array([self.reaction_scores.get(r, 0.0) for r in reactions], dtype=float)
+        final_scores = self.calculate_final_scores(s_text, s_react, is_split)
+        return pd.DataFrame({
+            'topic_code': topics,
+            'score_text': s_text,
+            'score_react': s_react,
+            'final_score': final_scores,
+            'sentiment_label': self.assign_labels(final_scores),
+            'priority_level': self.assign_priorities(final_scores, topics)
+        })
+
+    def score_segments(self, segments, reactions, contexts, is_split):
+        """Chấm một loạt segment. Chỉ điểm text + topic còn chạy từng đoạn, phần còn lại theo cột."""
+        s_text, topics = self.analyze_segments(segments, contexts)
+        return self.combine_scores(s_text, reactions, topics, is_split)
+
+    def segment_comments(self, df_comments, segments):
+        """Explode theo list segment của từng dòng: mỗi dòng kết quả là 1 segment (kèm segment_id)"""
+        df_seg = pd.DataFrame({
+            'row_pos': np.arange(len(df_comments)),
+            'original_record_id': self.get_column(df_comments, 'record_id', '').astype(str),
+            'social_user_id': self.get_column(df_comments, 'social_user_id', ''),
+            'created_time': self.get_column(df_comments, 'timestamp', ''),
+            'reaction_label': self.get_column(df_comments, 'reaction_label', 'NONE'),
+            'context_content': self.get_column(df_comments, 'context_content', ''),
+            'segment': segments,
+            'is_split': segments.map(len) > 1,
+        }).explode('segment')
+
+        # SEGMENT ID: SEG_015 (không tách) | SEG_015_A, SEG_015_B... (có tách)
+        seg_no = df_seg.groupby(level=0, sort=False).cumcount()
+        rec_suffix = df_seg['original_record_id'].str.split('_').str[-1]
+        letter_suffix = ('_' + (seg_no + 65).map(chr)).where(df_seg['is_split'], '')
+        df_seg['segment_id'] = 'SEG_' + rec_suffix + letter_suffix
+        return df_seg.reset_index(drop=True)
+
+    def score_fingerprints(self):
+        """Fingerprint phần từ điển sinh ra từng nhóm cột đắt (lưu trong ScoreStore)"""
+        return {
+            'text': ScoreStore.fingerprint(SCORE_LOGIC_VERSION, self.pivot_keywords,
+                                           self.sentiment_keywords, self.emoji_scores),
+            'topic': ScoreStore.fingerprint(SCORE_LOGIC_VERSION, self.pivot_keywords, self.topic_keywords),
+        }
+
+    def score_comment_rows(self, df_comments, workers=DEFAULT_WORKERS, store=None):
+        """
+        Chấm comment: tách đoạn -> explode -> điểm text + topic (có thể song song) -> phần còn lại theo cột.
+        Có store: dòng có khóa + fingerprint còn khớp dùng lại segments/score_text/topic đã lưu;
+        score_react/final/label/priority luôn tính lại theo cột (rẻ) nên luôn theo weights/thresholds mới.
+        """
+        texts = self.get_column(df_comments, 'processed_text', '')
+        reactions = self.get_column(df_comments, 'reaction_label', 'NONE')
+        contexts = self.get_column(df_comments, 'context_content', '')
+
+        # 1. Tra kho điểm
+        fingerprints = self.score_fingerprints()
+        keys = []
+        entries = [None] * len(df_comments)
+        if store is not None:
+            keys = [store.make_key(t, r, '' if pd.isna(c) else c) for t, r, c in zip(texts, reactions, contexts)]
+            found = store.get_many(keys)
+            entries = [found.get(k) for k in keys]
+        text_ok = np.array([e is not None and e['text_fp'] == fingerprints['text'] for e in entries], dtype=bool)
+        topic_ok = text_ok & np.array([e is not None and e['topic_fp'] == fingerprints['topic'] for e in entries],
+                                      dtype=bool)
+
+        # 2. Tách đoạn (dùng lại segments đã lưu nếu còn hợp lệ)
+        seg_lists = [e['segments'] if ok else self.split_text(t) for e, ok, t in zip(entries, text_ok, texts)]
+        df_seg = self.segment_comments(df_comments, pd.Series(seg_lists, index=df_comments.index, dtype=object))
+        row_pos = df_seg['row_pos'].to_numpy()
+        segments = df_seg['segment'].tolist()
+        seg_contexts = df_seg['context_content'].tolist()
+
+        # 3. Điểm text + topic: lấy từ kho hoặc tính lại đúng phần bị lệch
+        s_text = np.empty(len(df_seg), dtype=float)
+        topics = np.empty(len(df_seg), dtype=object)
+        s_text[text_ok[row_pos]] = [v for e, ok in zip(entries, text_ok) if ok for v in e['text_scores']]
+        topics[topic_ok[row_pos]] = [v for e, ok in zip(entries, topic_ok) if ok for v in e['topics']]
+
+        need_text = np.flatnonzero(~text_ok[row_pos])
+        if len(need_text):
+            new_text, new_topics = self.analyze_segments_parallel(
+                [segments[i] for i in need_text], [seg_contexts[i] for i in need_text], workers)
+            s_text[need_text] = new_text
+            topics[need_text] = new_topics
+        need_topic = np.flatnonzero(text_ok[row_pos] & ~topic_ok[row_pos])
+        if len(need_topic):
+            _, new_topics = self.analyze_segments_parallel(
+                [segments[i] for i in need_topic], [seg_contexts[i] for i in need_topic], workers, with_text=False)
+            topics[need_topic] = new_topics
+
+        # 4. Lưu lại các dòng vừa tính
+        if store is not None:
+            stale_rows = np.flatnonzero(~topic_ok)
+            offsets = np.concatenate([[0], np.cumsum([len(seg) for seg in seg_lists])])
+            store.put_many([
+                (keys[i], fingerprints['text'], seg_lists[i], s_text[offsets[i]:offsets[i + 1]].tolist(),
+                 fingerprints['topic'], topics[offsets[i]:offsets[i + 1]].tolist())
+                for i in stale_rows])
+            if self.verbose: print(f"   ♻️ [SCORE STORE] {len(df_comments)} comment: dùng lại {int(topic_ok.sum())} | "
+                  f"chấm lại {int((~text_ok).sum())} | chỉ tính lại topic {int((text_ok & ~topic_ok).sum())}")
+
+        # 5. Phần rẻ theo cột + nội dung hiển thị
+        df_scores = self.combine_scores(s_text, df_seg['reaction_label'], topics, df_seg['is_split'])
+        # Nếu là Reaction -> Hiển thị Nội dung bài Post (Context), Comment -> Hiển thị Segment
+        is_reaction = df_seg['segment'] == '[POST_REACTION]'
+        df_seg['segment_content'] = df_seg['segment'].where(~is_reaction, df_seg['context_content'])
+        return pd.concat([df_seg.drop(columns=['row_pos']), df_scores], axis=1)
+
     # --------------------------------------------------------------------------
-    # 6. MAIN RUN
+    # 8. CHẤM REACTION THEO NHÓM (Group & Broadcast)
     # --------------------------------------------------------------------------
-    def run_analysis(self):
+    def score_reaction_rows(self, df_react):
+        """
+        Điểm của 1 reaction lẻ chỉ phụ thuộc (reaction_label, context_content)
+        -> chấm mỗi tổ hợp 1 lần rồi phát lại kết quả cho mọi dòng trong nhóm.
+        """
+        reactions = self.get_column(df_react, 'reaction_label', 'NONE')
+        contexts = self.get_column(df_react, 'context_content', '')
+        keys = pd.DataFrame({'reaction_label': reactions, 'context_content': contexts})
+        group_codes = keys.groupby(['reaction_label', 'context_content'], dropna=False, sort=False).ngroup()
+        # ngroup(sort=False) đánh số nhóm theo thứ tự xuất hiện, khớp thứ tự của drop_duplicates
+        unique_keys = keys.drop_duplicates()
+
+        df_groups = self.score_segments(['[POST_REACTION]'] * len(unique_keys), unique_keys['reaction_label'],
+                                        unique_keys['context_content'], False)
+        if self.verbose: print(f"   📡 {len(df_react)} reaction lẻ -> chấm {len(df_groups)} nhóm (reaction, bài viết).")
+
+        record_ids = self.get_column(df_react, 'record_id', '').astype(str)
+        df_rows = pd.DataFrame({
+            'segment_id': 'SEG_' + record_ids.str.split('_').str[-1],
+            'original_record_id': record_ids,
+            'social_user_id': self.get_column(df_react, 'social_user_id', ''),
+            'created_time': self.get_column(df_react, 'timestamp', ''),
+            'segment_content': contexts,   # Reaction -> Hiển thị nội dung bài Post
+            'is_split': False,
+            'reaction_label': reactions,
+        }).reset_index(drop=True)
+        df_scores = df_groups.iloc[group_codes.to_numpy()].reset_index(drop=True)
+        return pd.concat([df_rows, df_scores], axis=1)
+
+    # --------------------------------------------------------------------------
+    # 9. CHẤM CẢ BẢNG / THEO LÔ (Không đọc/ghi file)
+    # --------------------------------------------------------------------------
+    def score_frame(self, df, workers=DEFAULT_WORKERS, store=None):
+        """Chấm một DataFrame dạng processed_data (đã có context_content) -> bảng segment chưa sắp xếp"""
+        self.context_topics = {}
+
+        # Reaction lẻ -> chấm theo nhóm; Comment -> tách đoạn + chấm theo cột (có thể song song)
+        if 'processed_text' in df.columns:
+            is_reaction = df['processed_text'] == '[POST_REACTION]'
+        else:
+            is_reaction = pd.Series(False, index=df.index)
+        df_react = df[is_reaction]
+        df_comments = df[~is_reaction]
+
+        frames = []
+        if not df_comments.empty:
+            frames.append(self.score_comment_rows(df_comments, workers, store))
+        if not df_react.empty:
+            frames.append(self.score_reaction_rows(df_react))
+
+        df_result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+        cols_order = [
+            'segment_id', 'original_record_id', 'social_user_id', 'created_time', 
+            'segment_content', 'is_split', 'topic_code', 'reaction_label', 
+            'score_text', 'score_react', 'final_score', 'sentiment_label', 'priority_level'
+        ]
+        final_cols = [c for c in cols_order if c in df_result.columns]
+        return df_result[final_cols]
+
+    def score_batch(self, texts, reactions=None, contexts=None, workers=DEFAULT_WORKERS, store=None):
+        """
+        API thư viện: chấm trực tiếp trong bộ nhớ, không đọc/ghi file.
+        - texts    : list processed_text (đã chuẩn hóa). None/rỗng -> '[POST_REACTION]'.
+        - reactions: list reaction_label (mặc định 'NONE').
+        - contexts : list nội dung bài viết (dùng cho topic của reaction lẻ).
+        Trả về DataFrame (cột BATCH_COLUMNS) mỗi dòng 1 segment, theo đúng thứ tự input.
+        """
+        texts = ['[POST_REACTION]' if pd.isna(t) or str(t).strip() == '' else t for t in texts]
+        n = len(texts)
+        reactions = ['NONE'] * n if reactions is None else list(reactions)
+        contexts = [''] * n if contexts is None else list(contexts)
+        if not (len(reactions) == len(contexts) == n):
+            raise ValueError("texts, reactions, contexts phải có cùng độ dài")
+
+        df = pd.DataFrame({
+            'record_id': [f"IN_{i}" for i in range(n)],
+            'processed_text': texts,
+            'reaction_label': reactions,
+            'context_content': contexts,
+        })
+        df_result = self.score_frame(df, workers, store)
+        if df_result.empty:
+            return pd.DataFrame(columns=BATCH_COLUMNS)
+
+        df_result.insert(0, 'input_index', df_result['original_record_id'].str[3:].astype(int))
+        df_result = df_result.sort_values(['input_index', 'segment_id'], kind='stable').reset_index(drop=True)
+        df_result.insert(1, 'segment_no', df_result.groupby('input_index').cumcount())
+        df_result['dict_version'] = self.version
+        return df_result[BATCH_COLUMNS]
+
+    # --------------------------------------------------------------------------
+    # 10. MAIN RUN
+    # --------------------------------------------------------------------------
+    def run_analysis(self, workers=DEFAULT_WORKERS, use_store=USE_SCORE_STORE):
         print("\n📊 [SCORER] BẮT ĐẦU CHẤM ĐIỂM CHI TIẾT...")
         
         input_path = os.path.join(INPUT_CLEAN_DIR, INPUT_FILENAME)
@@ -148,81 +543,20 @@ class SentimentScorer:
             print(f"❌ Lỗi: Không tìm thấy file {input_path}")
             return
             
-        df = pd.read_csv(input_path, encoding='utf-8-sig')
+        df = pd.read_csv(input_path, encoding='utf-8-sig', dtype={'post_fb_id': str})
         print(f"   ↳ Đã đọc {len(df)} dòng dữ liệu.")
-        
-        results = []
-
-        for idx, row in df.iterrows():
-            record_id = str(row.get('record_id', ''))
-            processed_text = row.get('processed_text', '') 
-            reaction_label = row.get('reaction_label', 'NONE')
-            context_content = row.get('context_content', '')
-            social_user = row.get('social_user_id', '')
-            created_time = row.get('timestamp', '')
-            
-            # --- TÁCH ĐOẠN ---
-            segments = self.split_text(processed_text)
-            is_split = len(segments) > 1
-            
-            # --- LẤY SỐ HIỆU ID (VD: 015) ---
-            try:
-                rec_suffix = record_id.split('_')[-1]
-            except:
-                rec_suffix = record_id
-
-            # --- VÒNG LẶP XỬ LÝ ---
-            for i, seg in enumerate(segments):
-                # 1. TẠO SEGMENT ID (A, B, C...)
-                if is_split:
-                    letter_suffix = chr(65 + i) 
-                    segment_id = f"SEG_{rec_suffix}_{letter_suffix}"
-                else:
-                    segment_id = f"SEG_{rec_suffix}"
-
-                # 2. TÍNH TOÁN
-                s_text = self.calculate_text_score(seg)
-                s_react = self.reaction_scores.get(reaction_label, 0.0)
-                final_score = self.calculate_final_score(s_text, s_react, is_split)
-                topic = self.detect_topic(seg, context_content)
-                label = self.assign_label(final_score)
-                priority = self.assign_priority(final_score, topic)
-                
-                # 3. [UPDATE] LOGIC HIỂN THỊ NỘI DUNG (Content Logic)
-                # Nếu là Reaction -> Hiển thị Nội dung bài Post (Context)
-                # Nếu là Comment  -> Hiển thị Comment của khách (Segment)
-                display_content = seg
-                if seg == '[POST_REACTION]':
-                    display_content = context_content
-
-                # 4. ĐÓNG GÓI
-                results.append({
-                    'segment_id': segment_id,
-                    'original_record_id': record_id,
-                    'social_user_id': social_user,
-                    'created_time': created_time,
-                    'segment_content': display_content, # <-- Dùng biến hiển thị mới
-                    'is_split': is_split,
-                    'topic_code': topic,
-                    'reaction_label': reaction_label,
-                    'score_text': s_text,
-                    'score_react': s_react,
-                    'final_score': final_score,
-                    'sentiment_label': label,
-                    'priority_level': priority
-                })
+        df = self.attach_post_context(df)
 
-        # --- LƯU FILE ---
-        df_result = pd.DataFrame(results)
-        
-        cols_order = [
-            'segment_id', 'original_record_id', 'social_user_id', 'created_time', 
-            'segment_content', 'is_split', 'topic_code', 'reaction_label', 
-            'score_text', 'score_react', 'final_score', 'sentiment_label', 'priority_level'
-        ]
-        final_cols = [c for c in cols_order if c in df_result.columns]
-        df_result = df_result[final_cols]
+        store = None
+        if use_store:
+            store = ScoreStore(os.path.join(SCORE_STORE_DIR, SCORE_STORE_FILENAME),
+                               max_entries=SCORE_STORE_MAX_ENTRIES)
+        try:
+            df_result = self.score_frame(df, workers, store)
+        finally:
+            if store is not None: store.close()
 
+        # --- LƯU FILE ---
         os.makedirs(OUTPUT_REPORT_DIR, exist_ok=True)
         output_path = os.path.join(OUTPUT_REPORT_DIR, OUTPUT_FILENAME)
         
@@ -240,5 +574,9 @@ class SentimentScorer:
         except: pass
 
 if __name__ == "__main__":
+    workers = DEFAULT_WORKERS
+    if '--workers' in sys.argv:
+        workers = int(sys.argv[sys.argv.index('--workers') + 1])
+
     scorer = SentimentScorer()
-    scorer.run_analysis()
\ No newline at end of file
+    scorer.run_analysis(workers=workers, use_store='--no-store' not in sys.argv)
\ No newline at end of file
@@ -1 +1,6 @@
-from .config_loader import ConfigLoader
\ No newline at end of file
+from .config_loader import ConfigLoader
+from .text_normalizer import TextNormalizer
+from .pii_masker import PIIMasker
+from .text_cache import ProcessedTextCache
+from .keyword_automaton import KeywordAutomaton
+from .score_store import ScoreStore
\ No newline at end of file
@@ -2,18 +2,74 @@ import yaml
 import json
 import os
 import sys
+import gc
+import pickle
+import hashlib
 
 # Tìm đường dẫn gốc dự án
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(current_dir))
 
+RESOURCE_DIR = os.path.join(project_root, 'resources')
+
+# Bundle tài nguyên đã parse + đối tượng đã dựng từ chúng (automaton, bảng tra của bộ chuẩn hóa)
+# -> lần khởi động sau chỉ cần unpickle 1 file thay vì đọc YAML/JSON và dựng lại automaton.
+# Không lưu regex: unpickle re.Pattern chính là re.compile lại, không tiết kiệm được gì
+BUNDLE_CACHE_DIR = os.path.join(project_root, 'data', 'cache')
+BUNDLE_FILENAME = 'resource_bundle.pkl'
+USE_BUNDLE_CACHE = True
+# Code sinh ra các đối tượng compile: file này đổi -> bỏ phần compiled trong bundle, dựng lại
+COMPILED_CODE_FILES = [
+    os.path.join(project_root, 'src', 'utils', 'text_normalizer.py'),
+    os.path.join(project_root, 'src', 'utils', 'keyword_automaton.py'),
+    os.path.join(project_root, 'src', 'sentiment_scorer.py'),
+]
+
 class ConfigLoader:
     _instance = None
 
-    def __init__(self):
-        self.resource_path = os.path.join(project_root, 'resources')
+    def __init__(self, strict=False, use_bundle=USE_BUNDLE_CACHE):
+        self.resource_path = RESOURCE_DIR
         self.dict_path = os.path.join(self.resource_path, 'dictionaries')
-        
+        # strict=True (dùng khi hot-reload): file lỗi -> raise thay vì trả về từ điển rỗng
+        self.strict = strict
+        self.bundle_path = os.path.join(BUNDLE_CACHE_DIR, BUNDLE_FILENAME) if use_bundle else None
+        # name -> đối tượng đã compile từ bộ tài nguyên này (xem get_compiled)
+        self.compiled = {}
+        # File tài nguyên đọc lỗi (chế độ không strict, đã thay bằng từ điển rỗng) -> không ghi bundle
+        self.load_errors = []
+        # Bundle trên đĩa cũ hơn trạng thái hiện tại -> save_bundle() ghi lại
+        self.bundle_dirty = False
+
+        # 0. Snapshot (mtime, size) chụp TRƯỚC khi đọc: file đổi giữa chừng -> lần sau lệch snapshot, đọc lại
+        self.snapshot = self.resource_snapshot()
+        # strict (hot-reload) luôn đọc lại từ resources/ để file lỗi chắc chắn raise, không tin bundle
+        bundle = None if strict else self._read_bundle()
+        if bundle is not None and bundle['snapshot'] == self.snapshot:
+            # Không file nào đổi -> tin version trong bundle, khỏi hash nội dung
+            self.version = bundle['version']
+        else:
+            # Version id của bộ tài nguyên (hash nội dung config.yaml + toàn bộ từ điển)
+            self.version = self._compute_version()
+            # Chỉ đổi mtime (checkout, touch...) mà nội dung y nguyên -> bundle vẫn dùng được
+            if bundle is not None and bundle['version'] != self.version:
+                bundle = None
+
+        if bundle is not None:
+            resources = bundle['resources']
+            self.config = resources['config']
+            self.emoji_map = resources['emoji_map']
+            self.teencode = resources['teencode']
+            self.reaction_map = resources['reaction_map']
+            self.dictionaries = resources['dictionaries']
+            if bundle['code_snapshot'] == self.code_snapshot():
+                self.compiled = bundle['compiled']
+            if bundle['snapshot'] != self.snapshot:
+                self.bundle_dirty = True
+            print(f"⚡ [CONFIG] Dùng bundle đã compile (version {self.version}, "
+                  f"{len(self.compiled)} đối tượng compile sẵn).")
+            return
+
         # 1. Load Config YAML
         self.config = self._load_yaml_config()
         
@@ -30,6 +86,7 @@ class ConfigLoader:
             'topic_keywords': self._load_json_dict('topic_keywords.json'),
             'pivot_keywords': self._load_json_dict('pivot_keywords.json')
         }
+        self.bundle_dirty = True
         
         print(f"✅ [CONFIG] Đã tải: config.yaml")
         print(f"✅ [CONFIG] Đã tải Reaction Map: {len(self.reaction_map)} rules.")
@@ -41,13 +98,126 @@ class ConfigLoader:
             cls._instance = cls()
         return cls._instance
 
+    @classmethod
+    def reload(cls):
+        """Đọc lại toàn bộ resources/ (strict). File lỗi -> raise. Chưa thay singleton cho tới khi activate()"""
+        return cls(strict=True)
+
+    def activate(self):
+        ConfigLoader._instance = self
+        return self
+
+    @staticmethod
+    def resource_files():
+        dict_path = os.path.join(RESOURCE_DIR, 'dictionaries')
+        files = [os.path.join(RESOURCE_DIR, 'config.yaml')]
+        if os.path.isdir(dict_path):
+            files += [os.path.join(dict_path, f) for f in sorted(os.listdir(dict_path)) if f.endswith('.json')]
+        return [f for f in files if os.path.exists(f)]
+
+    @classmethod
+    def resource_snapshot(cls):
+        """(mtime, size) của từng file tài nguyên -> so sánh để phát hiện thay đổi"""
+        snapshot = {}
+        for path in cls.resource_files():
+            try:
+                stat = os.stat(path)
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                pass
+        return snapshot
+
+    @staticmethod
+    def code_snapshot():
+        snapshot = {}
+        for path in COMPILED_CODE_FILES:
+            try:
+                stat = os.stat(path)
+                snapshot[os.path.basename(path)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                pass
+        return snapshot
+
+    # --------------------------------------------------------------------------
+    # BUNDLE ĐÃ COMPILE
+    # --------------------------------------------------------------------------
+    def get_compiled(self, name, builder):
+        """
+        Lấy đối tượng compile sẵn theo tên; chưa có -> builder() (kết quả None cũng được giữ lại).
+        Không ghi đĩa ở đây: bên gọi compile xong hết thì gọi save_bundle() 1 lần.
+        """
+        if name not in self.compiled:
+            self.compiled[name] = builder()
+            self.bundle_dirty = True
+        return self.compiled[name]
+
+    def save_bundle(self):
+        """Ghi bundle nếu có thay đổi. Có file tài nguyên đọc lỗi -> không ghi (tránh cache từ điển rỗng)"""
+        if not self.bundle_dirty: return
+        if self.load_errors:
+            print(f"⚠️ [CONFIG] Không ghi bundle vì lỗi đọc: {', '.join(self.load_errors)}")
+            return
+        self._write_bundle()
+        self.bundle_dirty = False
+
+    def _read_bundle(self):
+        if not self.bundle_path or not os.path.exists(self.bundle_path):
+            return None
+        # Unpickle hàng trăm nghìn dict/tuple của automaton -> GC vòng tham chiếu chạy liên tục vô ích, tạm tắt
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(self.bundle_path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            # Bundle hỏng/khác định dạng -> bỏ qua, đọc lại từ resources/
+            print(f"⚠️ [CONFIG] Bỏ qua bundle lỗi: {e}")
+            return None
+        finally:
+            if gc_was_enabled: gc.enable()
+
+    def _write_bundle(self):
+        if not self.bundle_path: return
+        bundle = {
+            'snapshot': self.snapshot,
+            'version': self.version,
+            'code_snapshot': self.code_snapshot(),
+            'resources': {
+                'config': self.config,
+                'emoji_map': self.emoji_map,
+                'teencode': self.teencode,
+                'reaction_map': self.reaction_map,
+                'dictionaries': self.dictionaries,
+            },
+            'compiled': self.compiled,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.bundle_path), exist_ok=True)
+            # Ghi file tạm rồi os.replace -> tiến trình khác không bao giờ đọc phải bundle ghi dở
+            tmp_path = f"{self.bundle_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.bundle_path)
+        except Exception as e:
+            print(f"⚠️ [CONFIG] Không ghi được bundle: {e}")
+
+    def _compute_version(self):
+        digest = hashlib.sha1()
+        for path in self.resource_files():
+            digest.update(os.path.relpath(path, self.resource_path).encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()[:12]
+
     def _load_yaml_config(self):
         try:
             config_path = os.path.join(self.resource_path, 'config.yaml')
             with open(config_path, 'r', encoding='utf-8') as f:
                 return yaml.safe_load(f)
         except Exception as e:
+            if self.strict: raise
             print(f"❌ Lỗi load config.yaml: {e}")
+            self.load_errors.append('config.yaml')
             return {}
 
     def _load_json_dict(self, filename):
@@ -60,7 +230,9 @@ class ConfigLoader:
             with open(path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
+            if self.strict: raise
             print(f"❌ Lỗi load {filename}: {e}")
+            self.load_errors.append(filename)
             return {}
 
     def get_dict(self, key):
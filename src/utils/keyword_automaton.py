@@ -0,0 +1,122 @@
+import re
+from collections import deque
+
+class KeywordAutomaton:
+    """
+    Automaton Aho–Corasick: tìm MỌI keyword trong câu bằng MỘT lượt quét tuyến tính.
+    Chi phí mỗi câu ~ độ dài câu + số lần khớp, không phụ thuộc số keyword trong từ điển.
+    - Mỗi keyword có id = vị trí trong list đầu vào (keyword trùng nhau vẫn giữ đủ id).
+    - find_ids(): tập id xuất hiện trong câu (tương đương `kw in text`).
+    - count_ids(): số lần xuất hiện không chồng lấn của từng id (tương đương `text.count(kw)`).
+    """
+
+    def __init__(self, patterns):
+        self.patterns = [str(p) for p in patterns]
+        self.lengths = [len(p) for p in self.patterns]
+        # Keyword rỗng luôn "có mặt" -> xử lý riêng, không đưa vào trie
+        self.empty_ids = tuple(i for i, p in enumerate(self.patterns) if not p)
+
+        # 1. Dựng trie
+        self.goto = [{}]
+        outputs = [[]]
+        for pid, pattern in enumerate(self.patterns):
+            if not pattern: continue
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(pid)
+
+        # 2. Liên kết fail (BFS theo độ sâu) + gộp output của hậu tố
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                outputs[nxt].extend(outputs[self.fail[nxt]])
+                queue.append(nxt)
+        self.outputs = [tuple(o) for o in outputs]
+
+        self.start_pattern = self.compile_start_pattern()
+
+    def compile_start_pattern(self):
+        # Ký tự đầu của mọi keyword: dùng để nhảy cóc qua đoạn text không thể khớp
+        first_chars = ''.join(re.escape(c) for c in sorted(self.goto[0]))
+        return re.compile(f'[{first_chars}]' if first_chars else r'(?!)')
+
+    # Pickle: giữ trie + fail + output (phần tốn công dựng), bỏ regex nhảy cóc -> compile lại từ goto[0]
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['start_pattern']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.start_pattern = self.compile_start_pattern()
+
+    # --------------------------------------------------------------------------
+    # QUÉT
+    # --------------------------------------------------------------------------
+    def iter_matches(self, text):
+        """Sinh (vị trí kết thúc, id) cho mọi lần khớp, theo thứ tự vị trí kết thúc tăng dần"""
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        root = goto[0]
+        find_start = self.start_pattern.search
+        state = 0
+        i = 0
+        n = len(text)
+        while i < n:
+            if not state:
+                # Đang ở gốc -> nhảy thẳng tới ký tự có thể bắt đầu 1 keyword
+                m = find_start(text, i)
+                if m is None: return
+                i = m.start()
+                state = root[text[i]]
+            else:
+                ch = text[i]
+                nxt = goto[state].get(ch)
+                while nxt is None and state:
+                    state = fail[state]
+                    nxt = goto[state].get(ch)
+                state = nxt or 0
+            if outputs[state]:
+                for pid in outputs[state]:
+                    yield i, pid
+            i += 1
+
+    def find_ids(self, text):
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        found = set(self.empty_ids)
+        state = 0
+        for ch in text:
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt or 0
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+    def count_ids(self, text):
+        counts = {pid: len(text) + 1 for pid in self.empty_ids}
+        last_end = {}
+        lengths = self.lengths
+        # Cùng 1 keyword: các lần khớp đến theo thứ tự vị trí -> đếm tham lam từ trái sang
+        # sẽ cho đúng số lần không chồng lấn như str.count
+        for i, pid in self.iter_matches(text):
+            start = i - lengths[pid] + 1
+            if start >= last_end.get(pid, 0):
+                counts[pid] = counts.get(pid, 0) + 1
+                last_end[pid] = i + 1
+        return counts
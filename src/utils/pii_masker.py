@@ -0,0 +1,106 @@
+import re
+
+# ==============================================================================
+# LUẬT CHE PII (Thứ tự = Độ ưu tiên: luật trước được áp dụng trước)
+# ==============================================================================
+PII_RULES = [
+    ('PHONE', r'(03|05|07|08|09|01[2|6|8|9])+([0-9]{8})\b'),
+    ('ID_CARD', r'\b\d{9}\b|\b\d{12}\b'),
+    ('BANK_ACC', r'\b\d{10,16}\b'),
+    ('EMAIL', r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+    ('MONEY', r'(?i:\b\d+([.,]\d+)*\s?(k|tr|triệu|đ|vnd|vnđ)\b)'),
+]
+
+# Mọi luật đều cần ít nhất 1 chữ số hoặc '@' -> câu không có thì bỏ qua luôn
+CANDIDATE_PATTERN = re.compile(r'[\d@]')
+# Ký tự đầu hợp lệ của mọi match: chữ số (PHONE/ID/BANK/MONEY) hoặc ký tự local-part (EMAIL).
+# Lookahead này loại nhanh các vị trí khác trước khi regex phải thử từng nhánh.
+FIRST_CHAR_GUARD = r'(?=[0-9A-Za-z._%+-])'
+FIRST_CHAR_GUARD_NO_EMAIL = r'(?=\d)'
+WORD_CHAR_PATTERN = re.compile(r'\w')
+# PHONE/ID/BANK chỉ gồm chữ số (và '|' do lớp ký tự [2|6|8|9] của PHONE)
+DIGIT_RUN_PATTERN = re.compile(r'[\d|]*')
+
+class PIIMasker:
+    """
+    Che PII bằng MỘT regex hợp nhất (alternation có named group, xếp theo độ ưu tiên).
+    Kết quả giống hệt chạy 5 lệnh sub tuần tự. Hai tình huống hiếm mà quét 1 lượt
+    có thể lệch thứ tự ưu tiên sẽ được phát hiện và xử lý bằng bản tuần tự:
+    - Một match ưu tiên thấp bao trùm vị trí bắt đầu của luật ưu tiên cao hơn.
+    - Token thay thế làm đổi ranh giới từ (\b) ở mép: PHONE bắt đầu giữa một từ,
+      hoặc EMAIL dính sát token của luật ưu tiên cao hơn.
+    """
+
+    def __init__(self):
+        rules = PII_RULES
+        self.rules = [(name, re.compile(pattern)) for name, pattern in rules]
+        self.rank = {name: i for i, (name, _) in enumerate(self.rules)}
+        self.combined = re.compile(FIRST_CHAR_GUARD + '(?:' + '|'.join(
+            f'(?P<{name}>{pattern})' for name, pattern in rules) + ')')
+        # Câu không có '@' (phần lớn comment) -> bỏ hẳn nhánh EMAIL khỏi lượt quét
+        self.combined_no_email = re.compile(FIRST_CHAR_GUARD_NO_EMAIL + '(?:' + '|'.join(
+            f'(?P<{name}>{pattern})' for name, pattern in rules if name != 'EMAIL') + ')')
+        self.fallback_count = 0
+
+    def mask_sequential(self, text):
+        """Bản tham chiếu: áp dụng lần lượt từng luật trên toàn câu"""
+        if not isinstance(text, str): return ""
+        for name, pattern in self.rules:
+            text = pattern.sub(f'[{name}]', text)
+        return text
+
+    def has_conflict(self, text, matches):
+        email_rank = self.rank.get('EMAIL', len(self.rules))
+        prev_match = None
+        next_email = None       # Cache: EMAIL gần nhất phía sau (vị trí các match tăng dần)
+        for m in matches:
+            start, end = m.start(), m.end()
+            rank = self.rank[m.lastgroup]
+
+            # 1. Match bắt đầu giữa một từ (chỉ PHONE không có \b đầu) -> token tạo \b mới bên trái
+            if start > 0 and WORD_CHAR_PATTERN.match(text, start - 1) and WORD_CHAR_PATTERN.match(text, start):
+                return True
+
+            # 2. Luật ưu tiên cao hơn bắt đầu bên trong match này.
+            #    PHONE/ID/BANK chỉ gồm chữ số/'|' -> chỉ cần tìm tới hết dãy số liền sau mép phải.
+            #    EMAIL (VD: '5 tr@gmail.com' trong MONEY) có thể kéo dài tùy ý -> tìm hết câu.
+            if rank > 0:
+                window_end = DIGIT_RUN_PATTERN.match(text, end).end()
+                for name, pattern in self.rules[:rank]:
+                    if name == 'EMAIL':
+                        if next_email is None or (next_email and next_email.start() <= start):
+                            next_email = pattern.search(text, start + 1) or False
+                        if next_email and next_email.start() < end:
+                            return True
+                    elif pattern.search(text, start + 1, window_end):
+                        return True
+
+            # 3. EMAIL dính sát token của luật đứng trước nó -> \b ở mép bị mất
+            if prev_match is not None and prev_match.end() == start:
+                prev_rank = self.rank[prev_match.lastgroup]
+                if rank == email_rank and prev_rank < email_rank and not WORD_CHAR_PATTERN.match(text, start):
+                    return True
+                if prev_rank == email_rank and rank < email_rank and text[start - 1] == '|':
+                    return True
+            prev_match = m
+        return False
+
+    def mask(self, text):
+        if not isinstance(text, str): return ""
+        if not CANDIDATE_PATTERN.search(text): return text
+
+        combined = self.combined if '@' in text else self.combined_no_email
+        matches = list(combined.finditer(text))
+        if not matches: return text
+        if self.has_conflict(text, matches):
+            self.fallback_count += 1
+            return self.mask_sequential(text)
+
+        parts = []
+        last = 0
+        for m in matches:
+            parts.append(text[last:m.start()])
+            parts.append(f'[{m.lastgroup}]')
+            last = m.end()
+        parts.append(text[last:])
+        return ''.join(parts)
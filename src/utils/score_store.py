@@ -0,0 +1,84 @@
+import os
+import time
+import json
+import sqlite3
+import hashlib
+
+SQL_BATCH_SIZE = 900    # SQLite giới hạn số tham số '?' trong 1 câu lệnh
+
+class ScoreStore:
+    """
+    Kho điểm bền vững (SQLite) cho Scorer, khóa theo (hash processed_text, reaction_label, hash context).
+    Mỗi dòng lưu các cột tốn CPU kèm fingerprint của phần từ điển/config sinh ra chúng:
+    - text_fp : segments + score_text (pivot_keywords, sentiment_keywords, emoji_scores)
+    - topic_fp: topic_code (pivot_keywords, topic_keywords)
+    Fingerprint lệch -> Scorer chỉ tính lại đúng nhóm cột đó cho dòng đó.
+    """
+
+    def __init__(self, db_path, max_entries=1_000_000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores (key TEXT PRIMARY KEY, text_fp TEXT, segments TEXT, "
+            "text_scores TEXT, topic_fp TEXT, topics TEXT, last_used REAL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_last_used ON scores (last_used)")
+        self.conn.commit()
+
+    @staticmethod
+    def fingerprint(*parts):
+        # Không sort_keys: thứ tự topic trong từ điển quyết định topic nào thắng
+        raw = json.dumps(parts, ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def make_key(text, reaction_label, context):
+        text_hash = hashlib.sha1(str(text).encode('utf-8')).hexdigest()
+        context_hash = hashlib.sha1(str(context).encode('utf-8')).hexdigest()
+        return f"{text_hash}|{reaction_label}|{context_hash}"
+
+    def get_many(self, keys):
+        """Trả về dict key -> {text_fp, segments, text_scores, topic_fp, topics}"""
+        key_list = list(dict.fromkeys(keys))
+        found = {}
+        for i in range(0, len(key_list), SQL_BATCH_SIZE):
+            batch = key_list[i:i + SQL_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.conn.execute(
+                f"SELECT key, text_fp, segments, text_scores, topic_fp, topics FROM scores "
+                f"WHERE key IN ({placeholders})", batch).fetchall()
+            for key, text_fp, segments, text_scores, topic_fp, topics in rows:
+                found[key] = {
+                    'text_fp': text_fp,
+                    'segments': json.loads(segments),
+                    'text_scores': json.loads(text_scores),
+                    'topic_fp': topic_fp,
+                    'topics': json.loads(topics),
+                }
+
+        now = time.time()
+        self.conn.executemany("UPDATE scores SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+        self.conn.commit()
+        return found
+
+    def put_many(self, rows):
+        """rows: (key, text_fp, segments, text_scores, topic_fp, topics). Dọn LRU nếu vượt giới hạn"""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO scores (key, text_fp, segments, text_scores, topic_fp, topics, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(key, text_fp, json.dumps(segments, ensure_ascii=False), json.dumps(text_scores),
+              topic_fp, json.dumps(topics, ensure_ascii=False), now)
+             for key, text_fp, segments, text_scores, topic_fp, topics in rows])
+        total = self.conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+        if total > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM scores WHERE key IN (SELECT key FROM scores ORDER BY last_used LIMIT ?)",
+                (total - self.max_entries,))
+            print(f"   🧹 [SCORE STORE] Đã xóa {total - self.max_entries} dòng cũ nhất (LRU).")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
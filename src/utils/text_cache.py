@@ -0,0 +1,85 @@
+import os
+import time
+import sqlite3
+import hashlib
+
+SQL_BATCH_SIZE = 900    # SQLite giới hạn số tham số '?' trong 1 câu lệnh
+
+class ProcessedTextCache:
+    """
+    Bộ nhớ đệm trên đĩa (SQLite): hash(text thô) -> processed_text.
+    - Khóa gồm hash nội dung + phiên bản từ điển (emoji_map/teencode/luật PII).
+    - Phiên bản thay đổi -> tự xóa toàn bộ cache cũ khi mở.
+    - Vượt max_entries -> xóa các dòng lâu không dùng nhất (LRU theo last_used).
+    """
+
+    def __init__(self, db_path, version, max_entries=500_000):
+        self.db_path = db_path
+        self.version = version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT, last_used REAL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used)")
+
+        row = self.conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        if row is None or row[0] != version:
+            if row is not None:
+                print("   ♻️ [CACHE] Từ điển đã thay đổi -> Xóa cache processed_text cũ.")
+            self.conn.execute("DELETE FROM entries")
+            self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('version', ?)", (version,))
+        self.conn.commit()
+
+    def make_key(self, text):
+        return hashlib.sha1(f"{self.version}\x00{text}".encode('utf-8')).hexdigest()
+
+    def get_many(self, texts):
+        """Trả về dict text -> processed_text cho các text đã có trong cache"""
+        keys = {self.make_key(t): t for t in texts}
+        found = {}
+        key_list = list(keys)
+        for i in range(0, len(key_list), SQL_BATCH_SIZE):
+            batch = key_list[i:i + SQL_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.conn.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({placeholders})", batch).fetchall()
+            for key, value in rows:
+                found[keys[key]] = value
+
+        now = time.time()
+        self.conn.executemany("UPDATE entries SET last_used = ? WHERE key = ?",
+                              [(now, self.make_key(t)) for t in found])
+        self.conn.commit()
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """Lưu các cặp (text, processed_text), sau đó dọn LRU nếu vượt giới hạn"""
+        now = time.time()
+        self.conn.executemany("INSERT OR REPLACE INTO entries (key, value, last_used) VALUES (?, ?, ?)",
+                              [(self.make_key(t), v, now) for t, v in items])
+        total = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if total > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY last_used LIMIT ?)",
+                (total - self.max_entries,))
+            print(f"   🧹 [CACHE] Đã xóa {total - self.max_entries} dòng cũ nhất (LRU).")
+        self.conn.commit()
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self):
+        total = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        print(f"   📦 [CACHE] Hit: {self.hits} | Miss: {self.misses} | "
+              f"Hit-rate: {self.hit_rate():.1%} | Đang lưu: {total} text.")
+
+    def close(self):
+        self.conn.close()
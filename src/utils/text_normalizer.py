@@ -0,0 +1,130 @@
+import re
+import html
+
+# ==============================================================================
+# REGEX CỐ ĐỊNH (Compile 1 lần cho cả tiến trình)
+# ==============================================================================
+TAG_PATTERN = re.compile(r'<[^>]+>')
+URL_PATTERN = re.compile(r'http\S+|www\.\S+')
+
+class TextNormalizer:
+    """
+    Bộ chuẩn hóa text biên dịch sẵn từ emoji_map.json + teencode.json.
+    Emoji -> Token, Teencode (kể cả cụm nhiều từ) và gộp khoảng trắng được làm
+    trong MỘT lượt quét. Chi phí mỗi câu không phụ thuộc kích thước từ điển:
+    - Emoji: tra dict theo ký tự đầu + độ dài key (longest match).
+    - Teencode: tra dict theo tuple từ, tối đa bằng số từ của cụm dài nhất.
+    """
+
+    def __init__(self, emoji_map, teencode_map):
+        self.emoji_map = dict(emoji_map or {})
+
+        # Ký tự đầu của emoji -> danh sách độ dài key (giảm dần)
+        lengths = {}
+        for icon in self.emoji_map:
+            if icon:
+                lengths.setdefault(icon[0], set()).add(len(icon))
+        self.emoji_lengths = {c: sorted(ls, reverse=True) for c, ls in lengths.items()}
+
+        self.token_pattern = self.compile_token_pattern()
+
+        # Teencode: key (tuple từ) -> list từ thay thế
+        self.teencode_phrases = {}
+        for key, value in (teencode_map or {}).items():
+            key_words = tuple(str(key).split())
+            if key_words:
+                self.teencode_phrases[key_words] = str(value).split()
+        self.max_phrase_len = max((len(k) for k in self.teencode_phrases), default=1)
+        self.teencode_words = {k[0]: ' '.join(v) for k, v in self.teencode_phrases.items() if len(k) == 1}
+
+    def compile_token_pattern(self):
+        # Token: (1) khoảng trắng | (2) chuỗi chữ/số | (3) 1 ký tự còn lại (dấu câu, có thể là đầu emoji)
+        # Emoji hầu như không phải chữ/số (\w) -> nhóm (2) không cần liệt kê cả bộ emoji.
+        # Chỉ loại khỏi (2) số ít emoji bắt đầu bằng chữ/số (VD: keycap 1️⃣).
+        word_starts = ''.join(re.escape(c) for c in sorted(self.emoji_lengths) if re.match(r'\w', c))
+        return re.compile(rf'(\s+)|([^\W{word_starts}]+)|(.)', re.DOTALL)
+
+    # Pickle (bundle của ConfigLoader): chỉ giữ bảng tra emoji/teencode, regex token dựng lại khi nạp
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['token_pattern']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.token_pattern = self.compile_token_pattern()
+
+    # --------------------------------------------------------------------------
+    # 1. TÁCH TỪ + THAY EMOJI (1 lượt quét)
+    # --------------------------------------------------------------------------
+    def tokenize(self, text):
+        words = []
+        parts = []
+        pos = 0
+        end = len(text)
+        match_token = self.token_pattern.match
+        while pos < end:
+            m = match_token(text, pos)
+            space, chunk, char = m.groups()
+            if space is not None:
+                if parts:
+                    words.append(''.join(parts))
+                    parts = []
+                pos = m.end()
+            elif chunk is not None:
+                parts.append(chunk)
+                pos = m.end()
+            else:
+                token = None
+                for length in self.emoji_lengths.get(char, ()):
+                    token = self.emoji_map.get(text[pos:pos + length])
+                    if token is not None:
+                        pos += length
+                        break
+                if token is None:
+                    # Không khớp emoji nào -> ký tự thường, thuộc từ hiện tại
+                    parts.append(char)
+                    pos += 1
+                else:
+                    if parts:
+                        words.append(''.join(parts))
+                        parts = []
+                    words.extend(str(token).split())
+        if parts:
+            words.append(''.join(parts))
+        return words
+
+    # --------------------------------------------------------------------------
+    # 2. THAY TEENCODE (Ưu tiên cụm dài nhất)
+    # --------------------------------------------------------------------------
+    def apply_teencode(self, words):
+        if self.max_phrase_len == 1:
+            return [self.teencode_words.get(w, w) for w in words]
+
+        result = []
+        i = 0
+        total = len(words)
+        while i < total:
+            for n in range(min(self.max_phrase_len, total - i), 0, -1):
+                replacement = self.teencode_phrases.get(tuple(words[i:i + n]))
+                if replacement is not None:
+                    result.extend(replacement)
+                    i += n
+                    break
+            else:
+                result.append(words[i])
+                i += 1
+        return result
+
+    # --------------------------------------------------------------------------
+    # 3. HÀM CHÍNH
+    # --------------------------------------------------------------------------
+    def normalize(self, text):
+        if not isinstance(text, str): return ""
+
+        text = html.unescape(text.lower())
+        text = TAG_PATTERN.sub('', text)
+        text = URL_PATTERN.sub('', text)
+
+        words = self.apply_teencode(self.tokenize(text))
+        return ' '.join(w for w in words if w)
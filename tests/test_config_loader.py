@@ -0,0 +1,42 @@
+import os
+import sys
+import pickle
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.utils import config_loader, ConfigLoader
+from src.data_processor import DataProcessor
+from src.sentiment_scorer import SentimentScorer
+
+TEXTS = ['App ko rút dc tiền 😡 nhưng lãi suất ok', 'uy tín lắm mn ơi ❤️', 'nạp tiền bị lỗi']
+
+
+def start(bundle_dir, monkeypatch):
+    monkeypatch.setattr(config_loader, 'BUNDLE_CACHE_DIR', str(bundle_dir))
+    loader = ConfigLoader()
+    return loader, DataProcessor(loader), SentimentScorer(loader)
+
+
+# ==============================================================================
+# 1. BUNDLE: chỉ lưu bảng tra/automaton, không lưu regex
+# ==============================================================================
+def test_bundle_has_no_regex_and_scores_like_fresh_build(tmp_path, monkeypatch):
+    cold_loader, cold_processor, cold_scorer = start(tmp_path, monkeypatch)
+    assert not cold_loader.load_errors
+    bundle_path = tmp_path / config_loader.BUNDLE_FILENAME
+    data = bundle_path.read_bytes()
+    # re.Pattern được pickle qua re._compile -> bundle không được chứa lời gọi này
+    assert b'_compile' not in data
+    assert set(pickle.loads(data)['compiled']) == {'text_normalizer', 'scorer_matchers'}
+
+    warm_loader, warm_processor, warm_scorer = start(tmp_path, monkeypatch)
+    assert warm_loader.compiled and not warm_loader.bundle_dirty
+    texts = cold_processor.process_texts(TEXTS)
+    assert warm_processor.process_texts(TEXTS) == texts
+    assert warm_scorer.score_batch(texts).equals(cold_scorer.score_batch(texts))
@@ -0,0 +1,280 @@
+import os
+import sys
+import csv
+import json
+import time
+import asyncio
+import threading
+from collections import defaultdict
+
+import pytest
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src import run_crawler
+from src.crawler import get_comments, FacebookCommentCrawler, FacebookReactionCrawler
+from src.crawler.adaptive_scroller import AdaptiveScroller
+
+# ==============================================================================
+# TRANG GIẢ (thay Playwright: không cần Chromium)
+# ==============================================================================
+class FakeRequest:
+    resource_type = 'fetch'
+    method = 'GET'
+
+    def __init__(self, url):
+        self.url = url
+
+
+class FakeResponse:
+    def __init__(self, request, body):
+        self.request = request
+        self.body = body
+
+    async def text(self):
+        return self.body
+
+
+class FakeLocator:
+    first = property(lambda self: self)
+
+    async def is_visible(self):
+        return False
+
+
+class FakeKeyboard:
+    async def press(self, key):
+        pass
+
+
+class FakePage:
+    """
+    Mỗi lần goto(link) gửi 1 request comment; response về sau `delay(post_id)` giây
+    -> response chậm đến khi tab đã chuyển sang bài khác.
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.handlers = defaultdict(list)
+        self.keyboard = FakeKeyboard()
+        self.pending = set()
+
+    def on(self, event, handler):
+        self.handlers[event].append(handler)
+
+    def emit(self, event, obj):
+        for handler in self.handlers[event]:
+            result = handler(obj)
+            if asyncio.iscoroutine(result):
+                task = asyncio.ensure_future(result)
+                self.pending.add(task)
+                task.add_done_callback(self.pending.discard)
+
+    async def respond_later(self, request, post_id):
+        await asyncio.sleep(self.delay(post_id))
+        comments = [{'__typename': 'Comment', 'id': f"{post_id}{i}", 'body': {'text': f"comment {i} của {post_id}"},
+                     'author': {'id': f"{i}", 'name': f"user {i}"}} for i in range(2)]
+        self.emit('response', FakeResponse(request, 'for (;;);' + json.dumps({'data': comments}, ensure_ascii=False)))
+        self.emit('requestfinished', request)
+
+    async def goto(self, link):
+        request = FakeRequest(link)
+        self.emit('request', request)
+        task = asyncio.ensure_future(self.respond_later(request, link.rsplit('/', 1)[-1]))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    def locator(self, query):
+        return FakeLocator()
+
+
+class FakeSession:
+    def __init__(self, delay=lambda post_id: 0.01):
+        self.delay = delay
+        self.pages = []
+
+    async def new_page(self, user=None, blocker=None):
+        page = FakePage(self.delay)
+        self.pages.append(page)
+        return page
+
+    async def release_page(self, page):
+        # Đợi response còn đang bay để kiểm tra được bài của chúng (trình duyệt thật sẽ bỏ chúng khi đóng tab)
+        while page.pending:
+            await asyncio.gather(*list(page.pending))
+
+
+# ==============================================================================
+# 1. COMMENT NHIỀU TAB: post_id gắn theo request, không theo bài tab đang mở
+# ==============================================================================
+def test_comments_keep_post_id_across_tabs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(get_comments, 'SCROLL_MAX_WAIT', 0.1)
+    monkeypatch.setattr(get_comments, 'MAX_RETRIES', 1)
+
+    post_ids = [f"POST_{i:03d}" for i in range(1, 9)]
+    # Bài lẻ trả response chậm hơn thời gian tab ở lại bài (~0.2s) -> đến khi tab đã mở bài sau
+    session = FakeSession(delay=lambda post_id: 0.5 if int(post_id[-1]) % 2 else 0.01)
+    queue = asyncio.Queue()
+    for post_id in post_ids:
+        queue.put_nowait({'post_id': post_id, 'post_link': f"http://fb.test/post/{post_id}"})
+    queue.put_nowait(None)
+
+    crawler = FacebookCommentCrawler(max_tabs=3, block_resources=False)
+    asyncio.run(crawler.run(post_queue=queue, session=session))
+
+    with open(crawler.output_path, encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    assert len(session.pages) == 3
+    assert sorted(r['post_id'] for r in rows) == sorted(post_ids * 2)
+    assert all(r['original_text'].endswith(f"của {r['post_id']}") for r in rows)
+
+
+# ==============================================================================
+# 2. PIPELINE: sentinel None dừng mọi giai đoạn khi 1 giai đoạn lỗi
+# ==============================================================================
+NUM_POSTS = 6
+PIPELINE_TIMEOUT = 10
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Hàng đợi nhỏ hơn số bài -> bên nhận chết mà không rút hàng đợi thì crawler post kẹt ở put()
+    monkeypatch.setattr(run_crawler, 'PIPELINE_QUEUE_SIZE', 1)
+    seen = {'comments': [], 'reactions': []}
+
+    async def comment_post(self, page, tab, post, index, total):
+        seen['comments'].append(post['post_id'])
+
+    async def reaction_post(self, page, post, index, total):
+        seen['reactions'].append(post['post_id'])
+
+    monkeypatch.setattr(FacebookCommentCrawler, 'crawl_post', comment_post)
+    monkeypatch.setattr(FacebookReactionCrawler, 'crawl_post', reaction_post)
+    monkeypatch.setattr(FacebookReactionCrawler, 'listen_reactions', lambda self, page: None)
+
+    manager = run_crawler.CrawlerManager('http://fb.test/page', NUM_POSTS, comment_tabs=2, block_resources=False)
+    manager.session = FakeSession()
+    return manager, seen, monkeypatch
+
+
+def fake_post_run(fail_after=None):
+    async def run(self, post_queues=None, session=None):
+        for i in range(NUM_POSTS):
+            if i == fail_after: raise RuntimeError("post crawler lỗi")
+            for queue in post_queues:
+                await queue.put({'post_id': f"POST_{i + 1:03d}", 'post_link': f"http://fb.test/post/{i + 1}"})
+    return run
+
+
+def run_pipeline(manager):
+    # Chạy ở luồng riêng: giai đoạn nào không dừng -> test báo lỗi sau PIPELINE_TIMEOUT thay vì treo
+    outcome = {}
+    def target():
+        try:
+            asyncio.run(manager.run_pipelined_crawl())
+        except BaseException as e:
+            outcome['error'] = e
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(PIPELINE_TIMEOUT)
+    assert not thread.is_alive(), "Pipeline treo: có giai đoạn không nhận được tín hiệu dừng"
+    if 'error' in outcome: raise outcome['error']
+
+
+def test_pipeline_stops_all_stages_when_producer_raises(pipeline):
+    manager, seen, monkeypatch = pipeline
+    monkeypatch.setattr(run_crawler.FacebookPostCrawler, 'run', fake_post_run(fail_after=3))
+
+    with pytest.raises(RuntimeError, match="post crawler lỗi"):
+        run_pipeline(manager)
+    assert sorted(seen['comments']) == seen['reactions'] == ['POST_001', 'POST_002', 'POST_003']
+
+
+def test_pipeline_drains_queue_when_consumer_raises(pipeline):
+    manager, seen, monkeypatch = pipeline
+    monkeypatch.setattr(run_crawler.FacebookPostCrawler, 'run', fake_post_run())
+
+    async def broken_reaction_post(self, page, post, index, total):
+        raise RuntimeError("reaction crawler lỗi")
+    monkeypatch.setattr(FacebookReactionCrawler, 'crawl_post', broken_reaction_post)
+
+    released = []
+    original_release = FakeSession.release_page
+    async def release_page(self, page):
+        released.append(page)
+        await original_release(self, page)
+    monkeypatch.setattr(FakeSession, 'release_page', release_page)
+
+    with pytest.raises(RuntimeError, match="reaction crawler lỗi"):
+        run_pipeline(manager)
+    # Crawler post không bị kẹt ở hàng đợi reaction đầy -> comment vẫn nhận đủ bài
+    assert len(seen['comments']) == NUM_POSTS
+    # Tab của giai đoạn lỗi cũng được trả về session
+    assert sorted(map(id, released)) == sorted(map(id, manager.session.pages))
+
+
+# ==============================================================================
+# 3. ADAPTIVE SCROLLER: chờ theo sự kiện thay vì sleep cố định
+# ==============================================================================
+def test_scroller_returns_as_soon_as_progress_grows():
+    async def main():
+        page, counter = FakePage(None), {'n': 0}
+        scroller = AdaptiveScroller(page, lambda: counter['n'], max_wait=5, idle_wait=5)
+        asyncio.get_running_loop().call_later(0.1, lambda: counter.update(n=3))
+        start = time.perf_counter()
+        grew = await scroller.wait(0)
+        return grew, time.perf_counter() - start
+    grew, elapsed = asyncio.run(main())
+    assert grew and elapsed < 1
+
+
+def test_scroller_waits_for_in_flight_request_then_idle():
+    async def main():
+        page = FakePage(None)
+        scroller = AdaptiveScroller(page, lambda: 0, max_wait=5, idle_wait=0.1)
+        request = FakeRequest('http://fb.test/api/graphql')
+        page.emit('request', request)
+        asyncio.get_running_loop().call_later(0.3, page.emit, 'requestfinished', request)
+        start = time.perf_counter()
+        grew = await scroller.wait(0)
+        return grew, time.perf_counter() - start
+    grew, elapsed = asyncio.run(main())
+    # Request còn chạy -> chưa coi là yên; xong request + idle_wait -> dừng, không chờ tới trần 5s
+    assert not grew and 0.3 <= elapsed < 1
+
+
+# ==============================================================================
+# 4. COMMENT NHIỀU TAB: 1 tab lỗi -> mọi tab vẫn được trả về session
+# ==============================================================================
+def test_comment_tabs_released_when_a_worker_raises(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    released = []
+
+    class TrackingSession(FakeSession):
+        async def release_page(self, page):
+            released.append(page)
+
+    async def crawl_post(self, page, tab, post, index, total):
+        if tab['no'] == 1: raise RuntimeError("tab 1 lỗi")
+        await asyncio.sleep(10)   # Tab khác còn đang cào khi tab 1 chết
+
+    monkeypatch.setattr(FacebookCommentCrawler, 'crawl_post', crawl_post)
+    queue = asyncio.Queue()
+    for i in range(6):
+        queue.put_nowait({'post_id': f"POST_{i:03d}", 'post_link': f"http://fb.test/post/{i}"})
+    queue.put_nowait(None)
+
+    session = TrackingSession()
+    crawler = FacebookCommentCrawler(max_tabs=3, block_resources=False)
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError, match="tab 1 lỗi"):
+        asyncio.run(crawler.run(post_queue=queue, session=session))
+    assert time.perf_counter() - start < 5
+    assert released == session.pages and len(released) == 3
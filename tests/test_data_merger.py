@@ -0,0 +1,230 @@
+import os
+import sys
+import random
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src import data_merger
+from src.data_merger import DataMerger
+
+# ==============================================================================
+# DỮ LIỆU CRAWLER GIẢ (ít user -> nhiều cặp (bài, user) trùng giữa comment và reaction)
+# ==============================================================================
+NUM_POSTS = 6
+NUM_USERS = 40
+REACTION_TYPES = ["Thích", "Yêu thích", "Haha", "Phẫn nộ", "Buồn", "Wow"]
+FIXED_NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return FIXED_NOW
+
+
+def make_crawler_frames(n_comments=300, n_reactions=900, seed=7):
+    rnd = random.Random(seed)
+    df_posts = pd.DataFrame({
+        'post_id': [f"POST_{i+1:03d}" for i in range(NUM_POSTS)],
+        'user_id': 'FB_admin',
+        'social_user': 'Page',
+        # Bài cuối không có nội dung -> reaction lẻ của bài đó bị bỏ
+        'context_content': [f"Nội dung bài {i+1}" for i in range(NUM_POSTS - 1)] + [""],
+        'post_link': [f"https://fb/{i+1}" for i in range(NUM_POSTS)],
+        'post_fb_id': [str(1000 + i) for i in range(NUM_POSTS)]
+    })
+    users = [f"FB_u{i}" for i in range(NUM_USERS)] + ['FB_admin']
+    df_comments = pd.DataFrame({
+        'comment_id': [f"COM_{i+1:03d}" for i in range(n_comments)],
+        'source_channel': 'Facebook',
+        'post_id': [f"POST_{rnd.randint(1, NUM_POSTS):03d}" for _ in range(n_comments)],
+        'timestamp': [rnd.choice(['2024-01-01 10:00:00', '']) for _ in range(n_comments)],
+        'user_id': [rnd.choice(users) for _ in range(n_comments)],
+        'social_user': 'User',
+        'original_text': [f"comment {i}" for i in range(n_comments)],
+        'comment_fb_id': [str(5000 + i) for i in range(n_comments)]
+    })
+    df_reactions = pd.DataFrame({
+        'reaction_id': [f"REAC_{i+1:03d}" for i in range(n_reactions)],
+        'post_id': [f"POST_{rnd.randint(1, NUM_POSTS):03d}" for _ in range(n_reactions)],
+        'user_id': [rnd.choice(users) for _ in range(n_reactions)],
+        'social_user': 'User',
+        'reaction_type': [rnd.choice(REACTION_TYPES) for _ in range(n_reactions)],
+        'reaction_fb_id': [str(9000 + i) for i in range(n_reactions)]
+    })
+    return df_posts, df_comments, df_reactions
+
+
+def write_crawler_files(folder, df_posts, df_comments, df_reactions):
+    for name, df in [('posts.csv', df_posts), ('comments.csv', df_comments), ('reactions.csv', df_reactions)]:
+        df.to_csv(os.path.join(folder, name), index=False, encoding='utf-8-sig')
+
+
+def make_merger(folder):
+    merger = DataMerger()
+    merger.posts_path = os.path.join(folder, 'posts.csv')
+    merger.comments_path = os.path.join(folder, 'comments.csv')
+    merger.reactions_path = os.path.join(folder, 'reactions.csv')
+    merger.output_path = os.path.join(folder, 'raw_fb_data.csv')
+    merger.state_path = os.path.join(folder, 'merge_state.json')
+    merger.posts_dim_path = os.path.join(folder, 'posts_dim.csv')
+    return merger
+
+
+def read_rows(path, drop=('record_id',)):
+    """Tập dòng của Master (bỏ record_id, sắp xếp) -> so sánh không phụ thuộc thứ tự nối"""
+    df = pd.read_csv(path, encoding='utf-8-sig', dtype=str, keep_default_na=False)
+    return sorted(df.drop(columns=list(drop)).itertuples(index=False, name=None))
+
+
+@pytest.fixture(autouse=True)
+def frozen_now(monkeypatch):
+    monkeypatch.setattr(data_merger, 'datetime', FrozenDatetime)
+
+
+# ==============================================================================
+# 1. INCREMENTAL: lần đầu + lần sau == merge toàn bộ 1 lần
+# ==============================================================================
+@pytest.mark.parametrize('max_memory_mb', [None, 0.01])
+@pytest.mark.parametrize('split', [0.2, 0.5, 0.8])
+def test_incremental_matches_full_merge(tmp_path, split, max_memory_mb):
+    df_posts, df_comments, df_reactions = make_crawler_frames()
+    full_dir, inc_dir = tmp_path / 'full', tmp_path / 'inc'
+    full_dir.mkdir(); inc_dir.mkdir()
+
+    write_crawler_files(full_dir, df_posts, df_comments, df_reactions)
+    make_merger(full_dir).run_merge()
+
+    # Lần 1: crawler mới có phần đầu mỗi file; lần 2: file đầy đủ (crawler nối thêm)
+    write_crawler_files(inc_dir, df_posts, df_comments[:int(len(df_comments) * split)],
+                        df_reactions[:int(len(df_reactions) * split)])
+    make_merger(inc_dir).run_merge(incremental=True, max_memory_mb=max_memory_mb)
+    write_crawler_files(inc_dir, df_posts, df_comments, df_reactions)
+    merger = make_merger(inc_dir)
+    merger.run_merge(incremental=True, max_memory_mb=max_memory_mb)
+
+    assert read_rows(inc_dir / 'raw_fb_data.csv') == read_rows(full_dir / 'raw_fb_data.csv')
+
+    # Chạy lại không có dữ liệu mới -> Master giữ nguyên
+    before = (inc_dir / 'raw_fb_data.csv').read_bytes()
+    make_merger(inc_dir).run_merge(incremental=True, max_memory_mb=max_memory_mb)
+    assert (inc_dir / 'raw_fb_data.csv').read_bytes() == before
+
+
+def test_incremental_relabels_and_retracts_old_rows(tmp_path):
+    df_posts, _, _ = make_crawler_frames()
+    comment = {'comment_id': 'COM_001', 'source_channel': 'Facebook', 'post_id': 'POST_001',
+               'timestamp': '2024-01-01 10:00:00', 'social_user': 'User'}
+    reaction = {'post_id': 'POST_001', 'social_user': 'User'}
+    df_comments = pd.DataFrame([
+        {**comment, 'user_id': 'FB_a', 'original_text': 'chưa thả cảm xúc', 'comment_fb_id': '1'},
+        {**comment, 'user_id': 'FB_b', 'original_text': 'comment sau reaction', 'comment_fb_id': '2'},
+    ])
+    df_reactions = pd.DataFrame([
+        {**reaction, 'reaction_id': 'REAC_001', 'user_id': 'FB_b', 'reaction_type': 'Buồn', 'reaction_fb_id': '10'},
+        {**reaction, 'reaction_id': 'REAC_002', 'user_id': 'FB_c', 'reaction_type': 'Thích', 'reaction_fb_id': '11'},
+        {**reaction, 'reaction_id': 'REAC_003', 'user_id': 'FB_a', 'reaction_type': 'Haha', 'reaction_fb_id': '12'},
+        {**reaction, 'reaction_id': 'REAC_004', 'user_id': 'FB_c', 'reaction_type': 'Wow', 'reaction_fb_id': '13'},
+    ])
+
+    # Lần 1: comment của FB_a (chưa có reaction), reaction lẻ của FB_b, FB_c
+    write_crawler_files(tmp_path, df_posts, df_comments[:1], df_reactions[:2])
+    make_merger(tmp_path).run_merge(incremental=True)
+    # Lần 2: FB_b comment, FB_a thả Haha, FB_c thả thêm reaction thứ 2 (cùng bài)
+    write_crawler_files(tmp_path, df_posts, df_comments, df_reactions)
+    make_merger(tmp_path).run_merge(incremental=True)
+
+    df = pd.read_csv(tmp_path / 'raw_fb_data.csv', encoding='utf-8-sig', dtype=str, keep_default_na=False)
+    rows = sorted(zip(df['record_id'], df['social_user_id'], df['source_channel'], df['reaction_label']))
+    assert rows == [
+        ('REC_001', 'FB_a', 'Fanpage_Comment', 'HAHA'),           # Gắn lại nhãn, record_id giữ nguyên
+        ('REC_003', 'FB_c', 'Fanpage_Post_Reaction', 'LIKE'),     # REC_002 (reaction lẻ FB_b) bị rút
+        ('REC_004', 'FB_b', 'Fanpage_Comment', 'SAD'),
+        ('REC_005', 'FB_c', 'Fanpage_Post_Reaction', 'WOW'),      # Cùng (bài, user), khác reaction_fb_id
+    ]
+
+
+def test_full_merge_does_not_write_watermark(tmp_path):
+    write_crawler_files(tmp_path, *make_crawler_frames())
+    merger = make_merger(tmp_path)
+    merger.run_merge(incremental=True)
+    assert os.path.exists(merger.state_path)
+
+    # Merge toàn bộ đánh lại record_id -> watermark cũ bị xóa, không ghi mới
+    merger.run_merge()
+    assert not os.path.exists(merger.state_path)
+
+
+# ==============================================================================
+# 2. HASH-JOIN: kết quả giống bản lặp iterrows + lọc mask ban đầu
+# ==============================================================================
+def reference_merge(merger):
+    """Bản lặp từng dòng trước hash-join (cột context_content thay bằng post_fb_id của bảng chiều)"""
+    df_posts = merger.load_csv(merger.posts_path)
+    df_comments = merger.load_csv(merger.comments_path)
+    df_reactions = merger.load_csv(merger.reactions_path)
+    admin_ids = set(df_posts['user_id'].astype(str).unique())
+    post_context_map = dict(zip(df_posts['post_id'].astype(str), df_posts['context_content']))
+    post_key_map = dict(zip(df_posts['post_id'].astype(str), df_posts['post_fb_id'].astype(str)))
+    now = FIXED_NOW.strftime("%Y-%m-%d %H:%M:%S")
+
+    records, processed_interactions = [], set()
+    for _, row in df_comments.iterrows():
+        post_id, user_id = str(row.get('post_id', '')), str(row.get('user_id', ''))
+        if user_id in admin_ids: continue
+        raw_reaction = "NONE"
+        react_rows = df_reactions[(df_reactions['post_id'].astype(str) == post_id) &
+                                  (df_reactions['user_id'].astype(str) == user_id)]
+        if not react_rows.empty:
+            raw_reaction = react_rows.iloc[0]['reaction_type']
+        cmt_time = row.get('timestamp', None)
+        records.append([cmt_time if not (pd.isna(cmt_time) or cmt_time == "") else now, user_id,
+                        'Fanpage_Comment', row.get('original_text', ''),
+                        merger.normalize_reaction(raw_reaction), post_key_map.get(post_id, post_id)])
+        processed_interactions.add((post_id, user_id))
+
+    for _, row in df_reactions.iterrows():
+        post_id, user_id = str(row.get('post_id', '')), str(row.get('user_id', ''))
+        if user_id in admin_ids or (post_id, user_id) in processed_interactions: continue
+        if post_context_map.get(post_id, None):
+            records.append([now, user_id, 'Fanpage_Post_Reaction', None,
+                            merger.normalize_reaction(row.get('reaction_type', 'NONE')), post_key_map.get(post_id, post_id)])
+
+    df = pd.DataFrame(records, columns=data_merger.MASTER_COLUMNS[1:])
+    df.insert(0, 'record_id', [f"REC_{i+1:03d}" for i in range(len(df))])
+    return df
+
+
+def test_hash_join_matches_row_by_row_merge(tmp_path):
+    write_crawler_files(tmp_path, *make_crawler_frames())
+    merger = make_merger(tmp_path)
+    merger.run_merge()
+
+    expected = reference_merge(merger)
+    actual = pd.read_csv(merger.output_path, encoding='utf-8-sig', dtype=str)
+    pd.testing.assert_frame_equal(actual, expected.astype(object).where(expected.notna()), check_dtype=False)
+
+
+# ==============================================================================
+# 3. STREAMING (OUT-OF-CORE) == MERGE TRONG RAM, TỪNG BYTE
+# ==============================================================================
+@pytest.mark.parametrize('max_memory_mb', [0.01, 0.1])
+def test_streaming_merge_is_byte_equal_to_in_memory(tmp_path, max_memory_mb, capsys):
+    write_crawler_files(tmp_path, *make_crawler_frames())
+    merger = make_merger(tmp_path)
+    merger.run_merge()
+    in_memory = open(merger.output_path, 'rb').read()
+
+    merger.run_merge(max_memory_mb=max_memory_mb)
+    assert 'Streaming' in capsys.readouterr().out
+    assert open(merger.output_path, 'rb').read() == in_memory
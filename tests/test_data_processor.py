@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pandas as pd
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.data_processor import DataProcessor
+
+# ==============================================================================
+# 1. record_id CỦA MERGER ĐƯỢC GIỮ NGUYÊN
+# ==============================================================================
+def test_assign_record_ids_keeps_merger_ids():
+    # Master sau incremental: REC_002 đã bị rút -> ID không liền mạch nhưng phải giữ nguyên
+    df = pd.DataFrame({'record_id': ['REC_001', 'REC_003', 'REC_005'], 'original_text': ['a', 'b', 'c']})
+    df = DataProcessor().assign_record_ids(df)
+    assert list(df.columns) == ['record_id', 'original_text']
+    assert list(df['record_id']) == ['REC_001', 'REC_003', 'REC_005']
+
+
+def test_assign_record_ids_fills_missing_and_duplicates():
+    # Gộp với file nguồn khác không có record_id + 1 ID trùng
+    df = pd.concat([
+        pd.DataFrame({'record_id': ['REC_001', 'REC_007', 'REC_001']}),
+        pd.DataFrame({'original_text': ['x', 'y']}),
+    ], ignore_index=True)
+    df = DataProcessor().assign_record_ids(df)
+    assert list(df['record_id']) == ['REC_001', 'REC_007', 'REC_008', 'REC_009', 'REC_010']
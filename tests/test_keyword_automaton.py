@@ -0,0 +1,66 @@
+import os
+import sys
+import random
+
+import pytest
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.utils import KeywordAutomaton
+
+# Keyword chồng lấn / lồng nhau / trùng lặp / rỗng -> các ca fail link và đếm không chồng lấn
+PATTERNS = ['a', 'aa', 'aaa', 'ab', 'aba', 'bab', 'b', 'ba', 'ab', 'c a', '']
+TEXTS = ['', 'a', 'aaaa', 'abababa', 'babab', 'c a c aa', 'xyz', 'aabaabaab']
+
+
+def expected_ids(patterns, text):
+    return {i for i, p in enumerate(patterns) if p in text}
+
+
+def expected_counts(patterns, text):
+    return {i: text.count(p) for i, p in enumerate(patterns) if text.count(p)}
+
+
+def random_texts(alphabet, n=300, max_len=30, seed=11):
+    rnd = random.Random(seed)
+    return [''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, max_len))) for _ in range(n)]
+
+
+# ==============================================================================
+# 1. find_ids == `kw in text`, count_ids == `text.count(kw)`
+# ==============================================================================
+@pytest.mark.parametrize('text', TEXTS)
+def test_matches_in_and_count_on_overlapping_patterns(text):
+    automaton = KeywordAutomaton(PATTERNS)
+    assert automaton.find_ids(text) == expected_ids(PATTERNS, text)
+    assert automaton.count_ids(text) == expected_counts(PATTERNS, text)
+
+
+def test_matches_in_and_count_on_random_texts():
+    automaton = KeywordAutomaton(PATTERNS)
+    for text in random_texts('abc '):
+        assert automaton.find_ids(text) == expected_ids(PATTERNS, text), text
+        assert automaton.count_ids(text) == expected_counts(PATTERNS, text), text
+
+
+def test_matches_in_and_count_on_vietnamese_keywords():
+    patterns = ['rút tiền', 'rút', 'tiền', 'lừa đảo', 'lừa', 'không rút được', 'rút được', 'được']
+    automaton = KeywordAutomaton(patterns)
+    words = ['rút', 'tiền', 'lừa', 'đảo', 'không', 'được', 'app']
+    rnd = random.Random(3)
+    for _ in range(300):
+        text = ' '.join(rnd.choice(words) for _ in range(rnd.randint(0, 12)))
+        assert automaton.find_ids(text) == expected_ids(patterns, text), text
+        assert automaton.count_ids(text) == expected_counts(patterns, text), text
+
+
+def test_no_patterns():
+    automaton = KeywordAutomaton([])
+    assert automaton.find_ids('bất kỳ') == set()
+    assert automaton.count_ids('bất kỳ') == {}
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pytest
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.utils import PIIMasker
+
+# Các ca quét 1 lượt lệch thứ tự ưu tiên -> has_conflict phải bắt được, trả về đúng kết quả tuần tự
+CONFLICT_CASES = [
+    # 1. PHONE bắt đầu giữa một từ (không có \b đầu)
+    ('abc0912345678 nha', 'abc[PHONE] nha'),
+    # 2. EMAIL (ưu tiên cao hơn) bắt đầu bên trong match MONEY
+    ('chuyển 5 tr@gmail.com rồi', 'chuyển 5 [EMAIL] rồi'),
+    # 3. EMAIL dính sát token PHONE phía trước -> \b ở mép bị mất
+    ('gọi 0912345678.a@gmail.com nhé', 'gọi [PHONE].[EMAIL] nhé'),
+    # 3'. PHONE dính sát EMAIL phía trước qua ký tự '|'
+    ('mail a@b.com|0912345678 nha', 'mail [EMAIL]|[PHONE] nha'),
+    ('email x@gmail.com0912345678', 'email [EMAIL][PHONE]'),
+]
+
+# Không xung đột -> đi đường quét 1 lượt
+PLAIN_CASES = [
+    ('sđt 0912345678, stk 1234567890123, 500k', 'sđt [PHONE], stk [BANK_ACC], [MONEY]'),
+    ('cccd 012345678901 xác thực mãi không qua', 'cccd [ID_CARD] xác thực mãi không qua'),
+    ('nạp 2.500.000 vnđ, mail nguyen.van.a@gmail.com', 'nạp [MONEY], mail [EMAIL]'),
+    ('app dùng ổn nhưng rút tiền hơi chậm', 'app dùng ổn nhưng rút tiền hơi chậm'),
+]
+
+
+@pytest.mark.parametrize('text, expected', CONFLICT_CASES)
+def test_conflict_falls_back_to_sequential(text, expected):
+    masker = PIIMasker()
+    assert masker.mask(text) == expected == masker.mask_sequential(text)
+    assert masker.fallback_count == 1
+
+
+@pytest.mark.parametrize('text, expected', PLAIN_CASES)
+def test_single_scan_matches_sequential(text, expected):
+    masker = PIIMasker()
+    assert masker.mask(text) == expected == masker.mask_sequential(text)
+    assert masker.fallback_count == 0
+
+
+def test_non_string_input():
+    assert PIIMasker().mask(None) == ''
@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import asyncio
+import threading
+
+import pytest
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.scoring_service import ScoringService, STOPPED_MESSAGE
+
+HOST = '127.0.0.1'
+STOP_TIMEOUT = 5
+
+
+# ==============================================================================
+# 1. GOM LÔ: request lỗi chỉ hỏng chính nó
+# ==============================================================================
+def test_malformed_request_does_not_fail_its_batch():
+    async def main():
+        service = ScoringService(max_batch_size=8, max_wait_ms=50)
+        await service.start(HOST, 0)
+        try:
+            good = [service.score({'id': i, 'text': 'rút tiền chậm quá', 'reaction': 'like'}) for i in range(3)]
+            bad = service.score({'id': 'x', 'text': {'nested': 1}})
+            return await asyncio.gather(*good, bad, return_exceptions=True)
+        finally:
+            await service.stop()
+    *good, bad = asyncio.run(main())
+    assert isinstance(bad, ValueError)
+    assert [r['id'] for r in good] == [0, 1, 2]
+    assert all(r['segments'] for r in good)
+
+
+# ==============================================================================
+# 2. DỪNG SERVICE: request đang chờ (trong hàng đợi hoặc lô đang chấm) nhận lỗi ngay
+# ==============================================================================
+def test_stop_fails_queued_and_in_flight_requests(monkeypatch):
+    release = threading.Event()
+    original = ScoringService.score_items
+    def slow_score_items(self, items):
+        release.wait(STOP_TIMEOUT)   # Lô đầu kẹt trong executor khi stop() được gọi
+        return original(self, items)
+    monkeypatch.setattr(ScoringService, 'score_items', slow_score_items)
+
+    async def main():
+        service = ScoringService(max_batch_size=2, max_wait_ms=1)
+        server = await service.start(HOST, 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection(HOST, port)
+        for i in range(5):
+            writer.write((json.dumps({'id': i, 'text': 'app lỗi'}) + '\n').encode('utf-8'))
+        await writer.drain()
+        await asyncio.sleep(0.2)
+
+        await asyncio.wait_for(service.stop(), STOP_TIMEOUT)
+        responses = [json.loads(await asyncio.wait_for(reader.readline(), STOP_TIMEOUT)) for _ in range(5)]
+        writer.close()
+        with pytest.raises(RuntimeError, match=STOPPED_MESSAGE):
+            await service.score({'text': 'sau khi dừng'})
+        return responses
+
+    try:
+        responses = asyncio.run(main())
+    finally:
+        release.set()
+    assert sorted(r['id'] for r in responses) == list(range(5))
+    assert all(r['error'] == STOPPED_MESSAGE for r in responses)
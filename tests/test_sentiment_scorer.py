@@ -0,0 +1,208 @@
+import os
+import sys
+import json
+import shutil
+
+import pandas as pd
+import pytest
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src import SentimentScorer
+from src.sentiment_scorer import BATCH_COLUMNS
+from src.utils import ConfigLoader, ScoreStore
+from src.utils import config_loader
+
+TEXTS = [
+    'app lừa đảo không rút được tiền',
+    'nạp tiền nhanh nhưng rút chậm quá',
+    'giao diện đẹp tuy nhiên hay lỗi lag, được cái lãi suất cao',
+    'bình thường',
+    '[POST_REACTION]',
+    'app lừa đảo không rút được tiền',     # Trùng input 0 -> cùng khóa trong kho điểm
+]
+REACTIONS = ['ANGRY', 'LIKE', 'NONE', 'HAHA', 'LOVE', 'LIKE']
+CONTEXTS = ['bài về rút tiền', '', '', 'bài về lãi suất', 'bài về nạp tiền momo', 'bài về rút tiền']
+
+
+@pytest.fixture
+def resource_dir(tmp_path, monkeypatch):
+    """Bản sao resources/ để sửa từ điển mà không đụng file thật"""
+    folder = tmp_path / 'resources'
+    shutil.copytree(config_loader.RESOURCE_DIR, folder)
+    monkeypatch.setattr(config_loader, 'RESOURCE_DIR', str(folder))
+    return folder
+
+
+def make_scorer():
+    scorer = SentimentScorer(ConfigLoader(use_bundle=False))
+    scorer.verbose = False
+    return scorer
+
+
+def edit_dictionary(resource_dir, filename, edit):
+    path = resource_dir / 'dictionaries' / filename
+    data = json.loads(path.read_text(encoding='utf-8'))
+    edit(data)
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+
+
+def stored_fingerprints(store):
+    return set(store.conn.execute("SELECT text_fp, topic_fp FROM scores").fetchall())
+
+
+# ==============================================================================
+# 1. KHO ĐIỂM: dùng lại khi từ điển giữ nguyên, chấm lại khi từ điển đổi
+# ==============================================================================
+def test_store_reuses_scores_when_dictionaries_unchanged(resource_dir, tmp_path, capsys):
+    scorer = make_scorer()
+    scorer.verbose = True
+    store = ScoreStore(str(tmp_path / 'store.sqlite'))
+    first = scorer.score_batch(TEXTS, REACTIONS, CONTEXTS, store=store)
+    second = scorer.score_batch(TEXTS, REACTIONS, CONTEXTS, store=store)
+    store.close()
+
+    out = capsys.readouterr().out
+    assert 'dùng lại 0 | chấm lại 5' in out
+    assert 'dùng lại 5 | chấm lại 0' in out
+    pd.testing.assert_frame_equal(first, second)
+    pd.testing.assert_frame_equal(second, scorer.score_batch(TEXTS, REACTIONS, CONTEXTS))
+
+
+def test_store_rescored_when_sentiment_dictionary_changes(resource_dir, tmp_path):
+    store = ScoreStore(str(tmp_path / 'store.sqlite'))
+    old_scorer = make_scorer()
+    old = old_scorer.score_batch(TEXTS, REACTIONS, CONTEXTS, store=store)
+    old_fp = old_scorer.score_fingerprints()
+
+    # 'bình thường' thành keyword tích cực -> điểm text của input 3 phải đổi
+    edit_dictionary(resource_dir, 'sentiment_keywords.json',
+                    lambda d: d.setdefault('positive', {'score': 1.0, 'keywords': []})['keywords'].append('bình thường'))
+    scorer = make_scorer()
+    new_fp = scorer.score_fingerprints()
+    assert scorer.version != old_scorer.version
+    assert new_fp['text'] != old_fp['text'] and new_fp['topic'] == old_fp['topic']
+
+    rescored = scorer.score_batch(TEXTS, REACTIONS, CONTEXTS, store=store)
+    assert stored_fingerprints(store) == {(new_fp['text'], new_fp['topic'])}
+    store.close()
+
+    pd.testing.assert_frame_equal(rescored, scorer.score_batch(TEXTS, REACTIONS, CONTEXTS))
+    assert (rescored['dict_version'] == scorer.version).all()
+    assert (old['dict_version'] == old_scorer.version).all()
+    assert rescored.loc[rescored['input_index'] == 3, 'score_text'].item() > \
+        old.loc[old['input_index'] == 3, 'score_text'].item()
+
+
+def test_store_recomputes_topics_when_topic_dictionary_changes(resource_dir, tmp_path, capsys):
+    store = ScoreStore(str(tmp_path / 'store.sqlite'))
+    make_scorer().score_batch(TEXTS, REACTIONS, CONTEXTS, store=store)
+
+    # Topic mới đứng đầu từ điển -> thắng mọi topic cũ
+    path = resource_dir / 'dictionaries' / 'topic_keywords.json'
+    data = json.loads(path.read_text(encoding='utf-8'))
+    path.write_text(json.dumps({'TOPIC_UI': ['giao diện'], **data}, ensure_ascii=False), encoding='utf-8')
+
+    scorer = make_scorer()
+    scorer.verbose = True
+    rescored = scorer.score_batch(TEXTS, REACTIONS, CONTEXTS, store=store)
+    store.close()
+
+    assert 'dùng lại 0 | chấm lại 0 | chỉ tính lại topic 5' in capsys.readouterr().out
+    scorer.verbose = False
+    pd.testing.assert_frame_equal(rescored, scorer.score_batch(TEXTS, REACTIONS, CONTEXTS))
+    assert 'TOPIC_UI' in set(rescored.loc[rescored['input_index'] == 2, 'topic_code'])
+
+
+# ==============================================================================
+# 2. CHẤM THEO CỘT == VÒNG LẶP TỪNG DÒNG
+# ==============================================================================
+def reference_score_comments(scorer, df):
+    """Bản lặp iterrows trước khi chuyển sang tách đoạn + chấm theo cột"""
+    results = []
+    for _, row in df.iterrows():
+        record_id = str(row['record_id'])
+        segments = scorer.split_text(row['processed_text'])
+        is_split = len(segments) > 1
+        for i, seg in enumerate(segments):
+            s_text = scorer.calculate_text_score(seg)
+            s_react = scorer.reaction_scores.get(row['reaction_label'], 0.0)
+            final_score = scorer.calculate_final_score(s_text, s_react, is_split)
+            topic = scorer.detect_topic(seg, row['context_content'])
+            results.append({
+                'segment_id': f"SEG_{record_id.split('_')[-1]}" + (f"_{chr(65 + i)}" if is_split else ''),
+                'original_record_id': record_id,
+                'social_user_id': row['social_user_id'],
+                'created_time': row['timestamp'],
+                'segment_content': seg,
+                'is_split': is_split,
+                'topic_code': topic,
+                'reaction_label': row['reaction_label'],
+                'score_text': s_text,
+                'score_react': s_react,
+                'final_score': final_score,
+                'sentiment_label': scorer.assign_label(final_score),
+                'priority_level': scorer.assign_priority(final_score, topic),
+            })
+    return pd.DataFrame(results)
+
+
+def test_columnar_scoring_matches_row_loop():
+    scorer = make_scorer()
+    comments = [t for t in TEXTS if t != '[POST_REACTION]'] * 3
+    df = pd.DataFrame({
+        'record_id': [f"REC_{i+1:03d}" for i in range(len(comments))],
+        'timestamp': '2024-01-01 10:00:00',
+        'social_user_id': [f"FB_{i}" for i in range(len(comments))],
+        'processed_text': comments,
+        'reaction_label': (REACTIONS * 3)[:len(comments)],
+        'context_content': (CONTEXTS * 3)[:len(comments)],
+    })
+    actual = scorer.score_frame(df).sort_values(['original_record_id', 'segment_id']).reset_index(drop=True)
+    expected = reference_score_comments(scorer, df).sort_values(['original_record_id', 'segment_id'])
+    pd.testing.assert_frame_equal(actual, expected.reset_index(drop=True), check_dtype=False)
+    assert actual['is_split'].any()
+
+
+# ==============================================================================
+# 3. score_batch: thứ tự dòng + input_index
+# ==============================================================================
+def test_score_batch_keeps_input_order_and_index():
+    scorer = make_scorer()
+    # > 10 input: input_index phải sắp theo số (IN_10 sau IN_9), không theo chuỗi
+    texts = TEXTS * 2 + [None, '  ']
+    reactions = REACTIONS * 2 + ['LIKE', 'SAD']
+    contexts = CONTEXTS * 2 + ['bài về nạp tiền', '']
+    df = scorer.score_batch(texts, reactions, contexts)
+
+    assert list(df.columns) == BATCH_COLUMNS
+    assert df['input_index'].is_monotonic_increasing
+    assert sorted(df['input_index'].unique()) == list(range(len(texts)))
+
+    # Mỗi input chấm riêng lẻ cho ra đúng các dòng của nó trong lô
+    for i, (text, reaction, context) in enumerate(zip(texts, reactions, contexts)):
+        single = scorer.score_batch([text], [reaction], [context]).drop(columns=['input_index'])
+        in_batch = df[df['input_index'] == i].drop(columns=['input_index']).reset_index(drop=True)
+        pd.testing.assert_frame_equal(in_batch, single)
+        assert (in_batch['reaction_label'] == reaction).all()
+
+    # None / chuỗi trắng -> reaction lẻ, hiển thị nội dung bài viết
+    last = df[df['input_index'] == len(texts) - 2]
+    assert list(last['segment_content']) == ['bài về nạp tiền']
+
+
+def test_score_batch_empty_input():
+    df = make_scorer().score_batch([])
+    assert df.empty
+    assert list(df.columns) == BATCH_COLUMNS
+
+
+def test_score_batch_rejects_mismatched_lengths():
+    with pytest.raises(ValueError):
+        make_scorer().score_batch(['a', 'b'], ['LIKE'])
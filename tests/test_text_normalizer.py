@@ -0,0 +1,79 @@
+import os
+import re
+import sys
+import html
+
+import pytest
+
+# ==============================================================================
+# [HEADER FIX PATH]
+# ==============================================================================
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.utils import ConfigLoader, TextNormalizer
+
+EMOJI_MAP = {'😡': '[ICON_NEG]', '❤️': '[ICON_POS]', '❤': '[ICON_POS]', '1️⃣': '[NUM]'}
+TEENCODE_MAP = {
+    'ko': 'không', 'dc': 'được', 'bt': 'bình thường',
+    'ko bt': 'không biết',           # Cụm 2 từ ưu tiên hơn 2 từ lẻ
+    'j z': 'gì vậy',
+    'mn oi ib': 'mọi người ơi inbox',  # Cụm 3 từ
+    'mn': 'mọi người',
+}
+
+
+def reference_normalize(text, emoji_map, teencode_map):
+    """Bản chuẩn hóa nhiều lượt trước khi gộp (chỉ đúng với teencode 1 từ)"""
+    if not isinstance(text, str): return ""
+    text = html.unescape(text.lower())
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'http\S+|www\.\S+', '', text)
+    for icon, token in emoji_map.items():
+        if icon in text:
+            text = text.replace(icon, f" {token} ")
+    text = ' '.join(teencode_map.get(w, w) for w in text.split())
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+# ==============================================================================
+# 1. TEENCODE NHIỀU TỪ
+# ==============================================================================
+@pytest.mark.parametrize('text, expected', [
+    ('tui ko bt luôn', 'tui không biết luôn'),
+    ('ko dc, bt thôi', 'không dc, bình thường thôi'),              # 'dc,' dính dấu câu -> không phải từ teencode
+    ('app j z', 'app gì vậy'),
+    ('mn oi ib giúp', 'mọi người ơi inbox giúp'),
+    ('mn oi', 'mọi người oi'),                                        # Cụm 3 từ chưa đủ -> lùi về cụm ngắn hơn
+    ('ko   bt', 'không biết'),                                        # Nhiều khoảng trắng vẫn là 1 cụm
+    ('ko😡bt', 'không [ICON_NEG] bình thường'),                     # Emoji tách từ nhưng không nối cụm qua token
+    ('KO BT <b>gì</b> http://x.vn', 'không biết gì'),
+])
+def test_multi_word_teencode(text, expected):
+    assert TextNormalizer(EMOJI_MAP, TEENCODE_MAP).normalize(text) == expected
+
+
+def test_phrase_replacement_is_not_reapplied():
+    # Kết quả thay thế không bị thay tiếp (VD 'mn' -> 'mọi người' không bị quét lại)
+    normalizer = TextNormalizer({}, {'a': 'b', 'b': 'c', 'x y': 'a'})
+    assert normalizer.normalize('a b x y') == 'b c a'
+
+
+# ==============================================================================
+# 2. KHỚP BẢN CŨ VỚI TỪ ĐIỂN THẬT (teencode 1 từ)
+# ==============================================================================
+SAMPLES = [
+    'App ko rút dc tiền 😡😡 mn ơi!!!',
+    'lãi suất <b>cao</b> ❤️ ❤️ xem tại https://abc.vn/x?y=1',
+    '  nạp   tiền &amp; rút tiền   thì bt  ',
+    '1️⃣ điểm trừ: hỗ trợ chậm 👎',
+    'ok😍ok', '', None, 123,
+]
+
+@pytest.mark.parametrize('text', SAMPLES)
+def test_matches_reference_on_real_dictionaries(text):
+    config = ConfigLoader.load()
+    normalizer = TextNormalizer(config.emoji_map, config.teencode)
+    assert normalizer.normalize(text) == reference_normalize(text, config.emoji_map, config.teencode)